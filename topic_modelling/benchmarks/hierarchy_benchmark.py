@@ -0,0 +1,137 @@
+"""
+Benchmark: flat vs hierarchical (two-stage) prompts.
+
+Offline, compares prompt tokens per verbatim for the flat prompt (every
+topic listed) against the hierarchical passes, both for the configured
+TAXONOMY and for a synthetic taxonomy of --subtopics child topics.
+With --live, also runs OllamaClassifier and HierarchicalOllamaClassifier on
+the sample verbatims and compares measured prompt tokens and latency.
+
+Usage (from topic_modelling/):
+    python -m benchmarks.hierarchy_benchmark
+    python -m benchmarks.hierarchy_benchmark --subtopics 250 --live --backend gpt-oss
+    python -m benchmarks.hierarchy_benchmark --output hierarchy.json
+"""
+
+import argparse
+import json
+import time
+
+from src.prompts import category_messages_for, messages_for, subset_messages_for
+from config.settings import HIERARCHY_SHORTLIST_SIZE, TAXONOMY
+
+_ASPECTS = [
+    "Quality", "Availability", "Cost", "Timeliness", "Clarity", "Accessibility", "Staff",
+    "Process", "Information", "Fairness", "Consistency", "Flexibility", "Outcomes", "Support",
+]
+
+
+def _token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode(text)), "tiktoken o200k_base"
+    except ImportError:
+        return lambda text: max(1, len(text) // 4), "~4 characters per token"
+
+
+def synthetic_taxonomy(subtopics: int) -> dict[str, list[str]]:
+    """Expand TAXONOMY to roughly *subtopics* children by adding aspects to each topic."""
+    topics = [(category, topic) for category, children in TAXONOMY.items() for topic in children]
+    per_topic = max(1, -(-subtopics // len(topics)))
+    taxonomy: dict[str, list[str]] = {category: [] for category in TAXONOMY}
+    for category, topic in topics:
+        taxonomy[category] += [f"{topic}: {aspect}" for aspect in (_ASPECTS * 4)[:per_topic]]
+    return taxonomy
+
+
+def prompt_tokens(taxonomy: dict[str, list[str]], verbatim: str, count, flat_messages=None) -> dict:
+    def size(messages: list[dict]) -> int:
+        return sum(count(m["content"]) for m in messages)
+
+    all_topics = [t for children in taxonomy.values() for t in children]
+    mean_children = len(all_topics) / len(taxonomy)
+    flat = size(flat_messages or subset_messages_for(verbatim, all_topics))
+    stage1 = size(category_messages_for(verbatim, taxonomy))
+    report = {
+        "topics": len(all_topics),
+        "categories": len(taxonomy),
+        "flat": flat,
+        "categories_stage": stage1,
+        "embeddings": size(subset_messages_for(verbatim, all_topics[:HIERARCHY_SHORTLIST_SIZE])),
+    }
+    for chosen in (1, 2):
+        subset = all_topics[:round(mean_children * chosen)]
+        report[f"hierarchical_{chosen}_category"] = stage1 + size(subset_messages_for(verbatim, subset))
+    return report
+
+
+def run_live(backend: str, verbatims: list[str]) -> dict:
+    from main import build_classifier
+
+    report = {}
+    for name, hierarchical in (("flat", None), ("categories", "categories")):
+        classifier = build_classifier(backend, hierarchical=hierarchical)
+        started = time.perf_counter()
+        classifier.classify_batch(verbatims)
+        wall = time.perf_counter() - started
+        usage = classifier.usage.snapshot()
+        requests = sum(c["requests"] for c in usage.values())
+        prompt = sum(c["prompt_tokens"] for c in usage.values())
+        report[name] = {
+            "requests": requests,
+            "prompt_tokens": prompt,
+            "prompt_tokens_per_verbatim": round(prompt / len(verbatims), 1),
+            "wall_seconds": round(wall, 2),
+            "seconds_per_verbatim": round(wall / len(verbatims), 3),
+        }
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Flat vs hierarchical prompt benchmark")
+    parser.add_argument("--subtopics", type=int, default=200, help="Size of the synthetic taxonomy (default: 200)")
+    parser.add_argument("--live", action="store_true", help="Also run both classifiers against Ollama")
+    parser.add_argument("--backend", choices=["deepseek", "gpt-oss"], default="gpt-oss")
+    parser.add_argument("--output", default=None, help="Save the results as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    from main import VERBATIMS
+
+    count, method = _token_counter()
+    verbatim = VERBATIMS[0]
+    results = {
+        "token_counting": method,
+        "configured": prompt_tokens(TAXONOMY, verbatim, count, flat_messages=messages_for(verbatim)),
+        "synthetic": prompt_tokens(synthetic_taxonomy(args.subtopics), verbatim, count),
+    }
+
+    print(f"\n--- Prompt tokens per verbatim ({method}) ---")
+    for name in ("configured", "synthetic"):
+        r = results[name]
+        print(f"  {name} taxonomy: {r['topics']} topics in {r['categories']} categories")
+        print(f"    flat prompt                  : {r['flat']}")
+        for chosen in (1, 2):
+            total = r[f"hierarchical_{chosen}_category"]
+            print(f"    hierarchical, {chosen} category(ies) : {total} ({total / r['flat'] - 1:+.0%} vs flat)")
+        print(f"    embedding shortlist ({HIERARCHY_SHORTLIST_SIZE})     : {r['embeddings']} "
+              f"({r['embeddings'] / r['flat'] - 1:+.0%} vs flat)")
+
+    if args.live:
+        results["live"] = run_live(args.backend, VERBATIMS)
+        print(f"\n--- Live run [{args.backend}, {len(VERBATIMS)} verbatims] ---")
+        for name, r in results["live"].items():
+            print(f"  {name:<10}: {r['requests']} request(s), {r['prompt_tokens_per_verbatim']} prompt tokens "
+                  f"and {r['seconds_per_verbatim']}s per verbatim")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"\nResults saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark: CLI cold-start import cost per code path.
+
+Runs each scenario in a fresh interpreter under `python -X importtime`,
+several times, and reports the median total import time and wall time, plus
+the packages that account for most of it in a typical run. "--help" runs main.py
+itself; the backend scenarios import main.py and the modules that backend
+loads, without classifying anything. An eager import of pandas or an SDK in
+a shared module shows up as every scenario getting slower.
+
+Saving the results with --output and passing them back with --compare on a
+later run prints the change per scenario.
+
+This runner is intentionally mirrored in
+web_summariser/benchmarks/import_time_benchmark.py; only the scenarios and the
+environment they need differ. The two projects share no code, so apply any
+change to the runner to both copies.
+
+Usage (from topic_modelling/):
+    python -m benchmarks.import_time_benchmark
+    python -m benchmarks.import_time_benchmark --repeat 10 --top 8
+    python -m benchmarks.import_time_benchmark --output imports.json
+    python -m benchmarks.import_time_benchmark --compare imports.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _imports(*modules: str) -> list[str]:
+    return ["-c", "; ".join(f"import {module}" for module in ("main", *modules))]
+
+
+# Scenario -> interpreter arguments, run from topic_modelling/.
+SCENARIOS = {
+    "interpreter": ["-c", "pass"],
+    "--help": ["main.py", "--help"],
+    "openai": _imports("src.classifiers.openai_classifier"),
+    "deepseek / gpt-oss": _imports("src.classifiers.ollama_classifier"),
+    "--async": _imports("src.classifiers.async_ollama_classifier"),
+    "--hierarchical": _imports("src.classifiers.hierarchical_classifier"),
+    "local": _imports("src.classifiers.local_classifier"),
+    "--cascade": _imports("src.classifiers.ollama_classifier", "src.classifiers.cascade_classifier"),
+    "--dedupe": _imports("src.classifiers.ollama_classifier", "src.classifiers.dedupe_classifier"),
+}
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """
+    Microseconds spent importing each top-level package (e.g. "pandas" for
+    pandas.core.frame), from `-X importtime` output. Self times are summed,
+    so the values add up to the total import time.
+    """
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(own)
+    return packages
+
+
+def run_once(args: list[str]) -> tuple[float, dict[str, int]]:
+    """Run one fresh interpreter; returns (wall seconds, import time per package)."""
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if process.returncode:
+        errors = [line for line in process.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"{' '.join(args)} exited with {process.returncode}: {errors[-1:] or ''}")
+    return wall, parse_importtime(process.stderr)
+
+
+def run_scenario(args: list[str], repeat: int, top: int) -> dict:
+    runs = [run_once(args) for _ in range(repeat)]
+    totals = [sum(imports.values()) for _, imports in runs]
+    # The heaviest imports are taken from the median run rather than averaged across runs.
+    median_run = sorted(range(len(runs)), key=totals.__getitem__)[len(runs) // 2]
+    imports = runs[median_run][1]
+    heaviest = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "import_ms": round(statistics.median(totals) / 1000, 1),
+        "wall_ms": round(statistics.median(wall for wall, _ in runs) * 1000, 1),
+        "packages": len(imports),
+        "heaviest": {name: round(us / 1000, 1) for name, us in heaviest},
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cold-start import time per CLI code path")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per scenario (default: 5)")
+    parser.add_argument("--top", type=int, default=3, help="Heaviest packages to show (default: 3)")
+    parser.add_argument("--output", default=None, help="Save the results as JSON")
+    parser.add_argument("--compare", default=None, help="A previous --output file to compare against")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["scenarios"]
+
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "scenarios": {},
+    }
+
+    print(f"\n--- Import time [python {platform.python_version()}, median of {args.repeat} run(s)] ---")
+    print(f"  {'scenario':<22}{'imports ms':>12}{'wall ms':>10}{'change':>10}  heaviest")
+    for name in args.scenarios:
+        result = run_scenario(SCENARIOS[name], args.repeat, args.top)
+        report["scenarios"][name] = result
+        change = ""
+        if name in previous:
+            change = f"{result['import_ms'] - previous[name]['import_ms']:+.1f}"
+        heaviest = ", ".join(f"{module} {ms:.0f}" for module, ms in result["heaviest"].items())
+        print(f"  {name:<22}{result['import_ms']:>12.1f}{result['wall_ms']:>10.1f}{change:>10}  {heaviest}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nResults saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Local stand-ins for the LLM APIs, for benchmarking without a GPU or an API key.
+
+StubOllamaServer answers POST /api/chat (and GET /api/version) like Ollama;
+StubOpenAIServer implements the parts of the OpenAI files and batches APIs
+that OpenAIBatchClassifier uses. Both answer with well-formed classifications
+(a topic picked from a hash of the verbatim), after a latency drawn from a
+configurable distribution, and fail a configurable fraction of requests.
+"""
+
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config.settings import TOPICS
+
+_PACKED_MARKER = "**New Verbatims to Classify (one JSON object per line):**"
+_SINGLE_MARKER = "**New Verbatim to Classify:**"
+
+
+class Latency:
+    """
+    A latency distribution in seconds, parsed from "<kind>:<params>":
+    constant:S, uniform:LOW:HIGH, exponential:MEAN, lognormal:MEDIAN:SIGMA.
+    """
+
+    KINDS = ("constant", "uniform", "exponential", "lognormal")
+
+    def __init__(self, spec: str):
+        kind, *params = spec.split(":")
+        if kind not in self.KINDS:
+            raise ValueError(f"latency kind must be one of {self.KINDS}")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(p) for p in params]
+
+    def sample(self) -> float:
+        if self.kind == "constant":
+            return self.params[0]
+        if self.kind == "uniform":
+            return random.uniform(*self.params)
+        if self.kind == "exponential":
+            return random.expovariate(1 / self.params[0])
+        median, sigma = self.params
+        return random.lognormvariate(0, sigma) * median
+
+
+class _StubServer:
+    """Threaded HTTP server whose requests are answered by self.handle()."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        handler = type("Handler", (_Handler,), {"stub": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_port}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name=type(self).__name__, daemon=True)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = {"requests": 0, "injected_errors": 0}
+
+    def _count(self, error: bool = False) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["injected_errors"] += error
+
+    def handle(self, method: str, path: str, headers, body: bytes) -> tuple[int, bytes, str]:
+        raise NotImplementedError
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; with Nagle on, keep-alive clients wait ~40 ms for the delayed ACK.
+    disable_nagle_algorithm = True
+    stub: _StubServer
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def do_POST(self):
+        self._respond("POST")
+
+    def _respond(self, method: str) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        status, payload, content_type = self.stub.handle(method, self.path, self.headers, body)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def _json(status: int, data) -> tuple[int, bytes, str]:
+    return status, json.dumps(data).encode("utf-8"), "application/json"
+
+
+def classify_messages(messages: list[dict], completion_tokens: int) -> tuple[str, int]:
+    """
+    Build a plausible answer for a classification prompt: single or packed,
+    full (topic names) or compact (topic numbers), with one topic per
+    verbatim chosen from a hash of its text. Returns (content, completion tokens).
+    """
+    compact = "list of integers" in messages[0]["content"]
+    user = messages[-1]["content"]
+
+    def topics_for(text: str) -> list:
+        index = int(hashlib.md5(text.encode("utf-8")).hexdigest(), 16) % len(TOPICS)
+        return [index + 1] if compact else [TOPICS[index]]
+
+    if _PACKED_MARKER in user:
+        entries = [json.loads(line) for line in user.split(_PACKED_MARKER, 1)[1].splitlines()
+                   if line.strip().startswith("{")]
+        results = [{"custom_id": e["custom_id"], "topics": topics_for(e["verbatim"])} for e in entries]
+        return json.dumps({"results": results}), completion_tokens * len(entries)
+
+    verbatim = user.split(_SINGLE_MARKER, 1)[-1].strip()
+    answer = {"topics": topics_for(verbatim)}
+    if not compact:
+        answer["verbatim_text"] = verbatim
+    return json.dumps(answer), completion_tokens
+
+
+def _prompt_tokens(messages: list[dict], prompt_tokens: int) -> int:
+    return prompt_tokens or sum(len(m["content"]) for m in messages) // 4
+
+
+class StubOllamaServer(_StubServer):
+    """
+    Fake Ollama server. Each chat request sleeps for latency.sample() seconds
+    (plus completion tokens / tokens_per_second, if set) and fails with
+    error_status (503 by default) with probability error_rate. prompt_tokens
+    of 0 reports ~4 characters per token of the prompt.
+    """
+
+    def __init__(
+        self,
+        latency: Latency,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 20,
+        tokens_per_second: float = 0.0,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.tokens_per_second = tokens_per_second
+
+    def handle(self, method, path, headers, body):
+        if path == "/api/version":
+            return _json(200, {"version": "stub"})
+        if path != "/api/chat":
+            return _json(404, {"error": f"unknown path {path}"})
+
+        request = json.loads(body)
+        content, completion = classify_messages(request["messages"], self.completion_tokens)
+        prompt = _prompt_tokens(request["messages"], self.prompt_tokens)
+        seconds = self.latency.sample()
+        if self.tokens_per_second:
+            seconds += completion / self.tokens_per_second
+        time.sleep(seconds)
+
+        if random.random() < self.error_rate:
+            self._count(error=True)
+            return _json(self.error_status, {"error": "stub: injected failure"})
+        self._count()
+        return _json(200, {
+            "model": request["model"],
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int(seconds * 1e9),
+            "prompt_eval_count": prompt,
+            "prompt_eval_duration": int(seconds * 0.2 * 1e9),
+            "eval_count": completion,
+        })
+
+
+class StubOpenAIServer(_StubServer):
+    """
+    Fake OpenAI files + batches API. A batch job stays in_progress for
+    latency.sample() seconds, then completes; each request in it lands in the
+    error file with status error_status (500 by default) with probability
+    error_rate, and in the output file otherwise.
+    """
+
+    def __init__(
+        self,
+        latency: Latency,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 20,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+        self._ids = itertools.count(1)
+
+    def handle(self, method, path, headers, body):
+        self._count()
+        if method == "POST" and path == "/v1/files":
+            return self._create_file(headers, body)
+        if method == "POST" and path == "/v1/batches":
+            return self._create_batch(json.loads(body))
+        if match := re.fullmatch(r"/v1/batches/([\w-]+)", path):
+            return self._retrieve_batch(match.group(1))
+        if match := re.fullmatch(r"/v1/files/([\w-]+)/content", path):
+            content = self.files.get(match.group(1))
+            if content is None:
+                return _json(404, {"error": {"message": "no such file"}})
+            return 200, content, "application/octet-stream"
+        return _json(404, {"error": {"message": f"unknown path {path}"}})
+
+    def _create_file(self, headers, body):
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode("utf-8") + body
+        )
+        content = next(
+            part.get_payload(decode=True) for part in message.iter_parts()
+            if part.get_param("name", header="content-disposition") == "file"
+        )
+        file_id = f"file-{next(self._ids)}"
+        self.files[file_id] = content
+        return _json(200, {
+            "id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+            "filename": "batch.jsonl", "purpose": "batch", "status": "processed",
+        })
+
+    def _create_batch(self, request: dict):
+        batch_id = f"batch-{next(self._ids)}"
+        self.batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": request["endpoint"],
+            "input_file_id": request["input_file_id"],
+            "completion_window": request["completion_window"],
+            "status": "in_progress",
+            "created_at": int(time.time()),
+            "in_progress_at": int(time.time()),
+            "completed_at": None,
+            "output_file_id": None,
+            "error_file_id": None,
+            "_ready_at": time.monotonic() + self.latency.sample(),
+        }
+        return self._retrieve_batch(batch_id)
+
+    def _retrieve_batch(self, batch_id: str):
+        batch = self.batches.get(batch_id)
+        if batch is None:
+            return _json(404, {"error": {"message": "no such batch"}})
+        with self._lock:
+            if batch["status"] == "in_progress" and time.monotonic() >= batch["_ready_at"]:
+                self._complete(batch)
+        return _json(200, {k: v for k, v in batch.items() if not k.startswith("_")})
+
+    def _complete(self, batch: dict) -> None:
+        """Write the output and error files for *batch*; called with self._lock held."""
+        output, errors = [], []
+        for line in self.files[batch["input_file_id"]].decode("utf-8").splitlines():
+            request = json.loads(line)
+            if random.random() < self.error_rate:
+                self.stats["injected_errors"] += 1
+                errors.append({
+                    "id": f"req-{next(self._ids)}",
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": self.error_status,
+                                 "body": {"error": {"message": "stub: injected failure", "code": "server_error"}}},
+                    "error": None,
+                })
+                continue
+            messages = request["body"]["messages"]
+            content, completion = classify_messages(messages, self.completion_tokens)
+            prompt = _prompt_tokens(messages, self.prompt_tokens)
+            output.append({
+                "id": f"req-{next(self._ids)}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": {
+                    "object": "chat.completion",
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": prompt, "completion_tokens": completion,
+                              "total_tokens": prompt + completion},
+                }},
+                "error": None,
+            })
+
+        for key, records in (("output_file_id", output), ("error_file_id", errors)):
+            if records:
+                file_id = f"file-{next(self._ids)}"
+                self.files[file_id] = "".join(json.dumps(r) + "\n" for r in records).encode("utf-8")
+                batch[key] = file_id
+        batch["status"] = "completed"
+        batch["completed_at"] = int(time.time())
+        batch["request_counts"] = {"total": len(output) + len(errors), "completed": len(output),
+                                   "failed": len(errors)}
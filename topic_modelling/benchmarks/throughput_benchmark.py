@@ -0,0 +1,231 @@
+"""
+Benchmark: classifier throughput and latency against local stub servers.
+
+Starts a fake Ollama server and a fake OpenAI files/batches server (see
+benchmarks/stub_servers.py) and drives OllamaClassifier and
+OpenAIBatchClassifier through classify_iter at each combination of input
+size and concurrency. For OpenAIBatchClassifier, concurrency is the number
+of shards submitted in parallel. Every case runs in a fresh process so its
+peak RSS is its own.
+
+Reports items/s, p50/p95/p99 per-item latency (from the item being read to
+its result being yielded), errors and peak RSS, and saves everything as JSON
+so runs can be compared.
+
+Usage (from topic_modelling/):
+    python -m benchmarks.throughput_benchmark
+    python -m benchmarks.throughput_benchmark --backends ollama --sizes 500 2000 --concurrency 1 8 32
+    python -m benchmarks.throughput_benchmark --latency lognormal:0.3:0.6 --error-rate 0.02 --output bench.json
+    python -m benchmarks.throughput_benchmark --backends openai --batch-latency uniform:1:3 --pack-size 10
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from benchmarks.stub_servers import Latency, StubOllamaServer, StubOpenAIServer
+from config.settings import RETRY_BASE_DELAY
+
+
+def synthetic_items(size: int) -> list[dict]:
+    from main import VERBATIMS
+    from src.classifiers.base import make_items
+
+    return make_items([f"{VERBATIMS[i % len(VERBATIMS)]} (respondent {i})" for i in range(size)])
+
+
+def peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def build_classifier(case: dict, workdir: str):
+    from src.utils.rate_limit import RequestScheduler
+
+    scheduler = RequestScheduler(max_retries=case["max_retries"], base_delay=case["retry_base_delay"])
+    if case["backend"] == "ollama":
+        from src.classifiers.ollama_classifier import OllamaClassifier
+        return OllamaClassifier(
+            model="stub",
+            hosts=[case["url"]],
+            max_workers=case["concurrency"],
+            pack_size=case["pack_size"],
+            output_mode=case["output_mode"],
+            scheduler=scheduler,
+        )
+
+    from openai import OpenAI
+    import src.classifiers.openai_classifier as openai_classifier
+    # Keep the stub's batch input/output files out of the repository.
+    openai_classifier.INPUT_DIR = openai_classifier.OUTPUT_DIR = workdir
+    requests = math.ceil(case["size"] / case["pack_size"])
+    return openai_classifier.OpenAIBatchClassifier(
+        model="stub",
+        client=OpenAI(base_url=f"{case['url']}/v1", api_key="stub", max_retries=0),
+        poll_interval=0.05,
+        max_poll_interval=0.5,
+        pack_size=case["pack_size"],
+        output_mode=case["output_mode"],
+        max_requests_per_file=math.ceil(requests / case["concurrency"]),
+        max_parallel_submissions=case["concurrency"],
+        scheduler=scheduler,
+    )
+
+
+def run_case(case: dict) -> dict:
+    """Classify case['size'] synthetic items and measure them; runs in its own process."""
+    from src.utils.journal import is_error_result
+
+    items = synthetic_items(case["size"])
+    read_at: dict[str, float] = {}
+
+    def feed():
+        for item in items:
+            read_at[item["custom_id"]] = time.perf_counter()
+            yield item
+
+    latencies, errors = [], 0
+    with tempfile.TemporaryDirectory() as workdir:
+        log = io.StringIO()
+        with contextlib.redirect_stdout(sys.stdout if case["verbose"] else log):
+            classifier = build_classifier(case, workdir)
+            started = time.perf_counter()
+            for result in classifier.classify_iter(feed()):
+                latencies.append(time.perf_counter() - read_at[result["custom_id"]])
+                errors += is_error_result(result)
+            wall = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "results": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "items_per_second": round(len(latencies) / wall, 2),
+        "latency_seconds": {
+            "p50": round(quantiles[49], 4),
+            "p95": round(quantiles[94], 4),
+            "p99": round(quantiles[98], 4),
+            "max": round(max(latencies), 4),
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "scheduler": classifier.scheduler.stats,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Classifier throughput benchmark against stub LLM servers")
+    parser.add_argument("--backends", nargs="+", choices=["ollama", "openai"], default=["ollama", "openai"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[200, 1000], help="Input sizes (default: 200 1000)")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16],
+                        help="Ollama workers / OpenAI parallel shards (default: 1 4 16)")
+    parser.add_argument("--pack-size", type=int, default=1)
+    parser.add_argument("--output-mode", choices=["full", "compact"], default="full")
+    parser.add_argument("--latency", default="lognormal:0.05:0.5",
+                        help="Stub Ollama latency per request (default: lognormal:0.05:0.5, "
+                             "i.e. median 50 ms); kinds: " + ", ".join(Latency.KINDS))
+    parser.add_argument("--batch-latency", default="uniform:0.5:1.5",
+                        help="Time a stub OpenAI batch job stays in progress (default: uniform:0.5:1.5)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests that fail")
+    parser.add_argument("--prompt-tokens", type=int, default=0,
+                        help="Prompt tokens reported per request (default: ~4 characters per token)")
+    parser.add_argument("--completion-tokens", type=int, default=20, help="Completion tokens per verbatim")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Stub Ollama generation speed added to the latency (default: off)")
+    parser.add_argument("--max-retries", type=int, default=4)
+    parser.add_argument("--retry-base-delay", type=float, default=RETRY_BASE_DELAY)
+    parser.add_argument("--output", default=None, help="Save the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Show the classifiers' own output")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    stubs = {
+        "ollama": StubOllamaServer(
+            Latency(args.latency),
+            error_rate=args.error_rate,
+            prompt_tokens=args.prompt_tokens,
+            completion_tokens=args.completion_tokens,
+            tokens_per_second=args.tokens_per_second,
+        ),
+        "openai": StubOpenAIServer(
+            Latency(args.batch_latency),
+            error_rate=args.error_rate,
+            prompt_tokens=args.prompt_tokens,
+            completion_tokens=args.completion_tokens,
+        ),
+    }
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": vars(args),
+        "cases": [],
+    }
+
+    print(f"\n--- Throughput benchmark [latency={args.latency}, batch={args.batch_latency}, "
+          f"errors={args.error_rate:.0%}, pack_size={args.pack_size}, output={args.output_mode}] ---")
+    print(f"  {'backend':<8}{'size':>7}{'conc':>6}{'items/s':>10}{'p50 s':>9}{'p95 s':>9}"
+          f"{'p99 s':>9}{'errors':>8}{'RSS MB':>9}")
+    for backend in args.backends:
+        with stubs[backend] as stub:
+            for size in args.sizes:
+                for concurrency in args.concurrency:
+                    case = {
+                        "backend": backend,
+                        "size": size,
+                        "concurrency": concurrency,
+                        "pack_size": args.pack_size,
+                        "output_mode": args.output_mode,
+                        "max_retries": args.max_retries,
+                        "retry_base_delay": args.retry_base_delay,
+                        "url": stub.url,
+                        "verbose": args.verbose,
+                    }
+                    stub.reset_stats()
+                    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                        result = pool.submit(run_case, case).result()
+                    result["server"] = dict(stub.stats)
+                    del case["url"], case["verbose"]
+                    report["cases"].append({**case, **result})
+
+                    latency = result["latency_seconds"]
+                    print(f"  {backend:<8}{size:>7}{concurrency:>6}{result['items_per_second']:>10.1f}"
+                          f"{latency['p50']:>9.3f}{latency['p95']:>9.3f}{latency['p99']:>9.3f}"
+                          f"{result['errors']:>8}{result['peak_rss_mb'] or 0:>9.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nResults saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,142 @@
+import json
 import os
-from dotenv import load_dotenv
 
-load_dotenv(override=True)
+
+def _load_dotenv() -> None:
+    """
+    Load the nearest .env, searching upwards from this directory as
+    python-dotenv's load_dotenv() does. python-dotenv is only imported when
+    there is a file to load, which keeps CLI startup cheap without one.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+
+            load_dotenv(path, override=True)
+            return
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return
+        directory = parent
+
+
+_load_dotenv()
 
 # --- OpenAI ---
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-nano-2025-04-14")
+# Batch API input files are split into shards under the per-file limits
+# (50,000 requests / 200 MB) and submitted in parallel.
+OPENAI_BATCH_MAX_REQUESTS = int(os.getenv("OPENAI_BATCH_MAX_REQUESTS", "50000"))
+OPENAI_BATCH_MAX_BYTES = int(os.getenv("OPENAI_BATCH_MAX_BYTES", str(190 * 1024 * 1024)))
+OPENAI_BATCH_PARALLELISM = int(os.getenv("OPENAI_BATCH_PARALLELISM", "4"))
+# Polling starts at the initial interval and backs off (with jitter) while no job changes state.
+OPENAI_POLL_INTERVAL = float(os.getenv("OPENAI_POLL_INTERVAL", "10"))
+OPENAI_MAX_POLL_INTERVAL = float(os.getenv("OPENAI_MAX_POLL_INTERVAL", "300"))
 
 # --- Ollama ---
-OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+# OLLAMA_HOST may list several servers, comma-separated; requests are then
+# routed across them by src.utils.host_pool.HostPool.
+OLLAMA_HOSTS = [h.strip() for h in os.getenv("OLLAMA_HOST", "http://localhost:11434").split(",") if h.strip()]
+OLLAMA_HOST = OLLAMA_HOSTS[0]
+OLLAMA_PROBE_INTERVAL = float(os.getenv("OLLAMA_PROBE_INTERVAL", "15"))
+OLLAMA_MAX_HOST_FAILURES = int(os.getenv("OLLAMA_MAX_HOST_FAILURES", "3"))
+# Re-issue a request to a second host once it runs past this latency percentile (empty = off).
+OLLAMA_HEDGE_PERCENTILE = float(os.getenv("OLLAMA_HEDGE_PERCENTILE") or 0) or None
 OLLAMA_MODEL_DEEPSEEK = os.getenv("OLLAMA_MODEL_DEEPSEEK", "deepseek-r1:8b")
 OLLAMA_MODEL_GPT_OSS = os.getenv("OLLAMA_MODEL_GPT_OSS", "gpt-oss:20b")
 
+
+def _think_setting(name: str, default: str) -> bool | str | None:
+    """Parse a reasoning setting: true/false, low/medium/high, or empty for the model default."""
+    value = os.getenv(name, default).strip().lower()
+    if value in ("", "default"):
+        return None
+    if value in ("true", "false"):
+        return value == "true"
+    return value
+
+
+# Reasoning control per backend. deepseek-r1 can switch thinking off entirely;
+# gpt-oss always reasons, so the lowest effort level is the closest equivalent.
+OLLAMA_THINK_DEEPSEEK = _think_setting("OLLAMA_THINK_DEEPSEEK", "false")
+OLLAMA_THINK_GPT_OSS = _think_setting("OLLAMA_THINK_GPT_OSS", "low")
+
 # --- Concurrency ---
 MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "4"))
+# Bounds for the adaptive (--async) Ollama classifier; it starts at MAX_CONCURRENT_REQUESTS.
+ADAPTIVE_MIN_CONCURRENCY = int(os.getenv("ADAPTIVE_MIN_CONCURRENCY", "1"))
+ADAPTIVE_MAX_CONCURRENCY = int(os.getenv("ADAPTIVE_MAX_CONCURRENCY", "32"))
+
+# --- Rate limits and retries (src.utils.rate_limit.RequestScheduler; 0 = unlimited) ---
+# Requests and tokens per minute. For the OpenAI Batch API these apply to the
+# file/batch control calls; batched requests are throttled by OpenAI itself.
+OLLAMA_RPM = float(os.getenv("OLLAMA_RPM", "0"))
+OLLAMA_TPM = float(os.getenv("OLLAMA_TPM", "0"))
+OPENAI_RPM = float(os.getenv("OPENAI_RPM", "0"))
+OPENAI_TPM = float(os.getenv("OPENAI_TPM", "0"))
+# Retries per item for transient failures (429, 5xx, timeouts), with jittered
+# exponential backoff between RETRY_BASE_DELAY and RETRY_MAX_DELAY seconds.
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", "4"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1.0"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "60"))
+
+# --- Request telemetry (src.utils.metrics.RequestTelemetry) ---
+# Directory for per-request JSONL records and a Prometheus textfile of the
+# aggregates (empty = report at the end of the run only).
+TELEMETRY_DIR = os.getenv("TELEMETRY_DIR", "")
+
+# --- Packing (verbatims per LLM request; 1 disables packing) ---
+PACK_SIZE = int(os.getenv("PACK_SIZE", "1"))
+
+# --- Output mode ("full" echoes the verbatim back, "compact" returns topic numbers only) ---
+OUTPUT_MODE = os.getenv("OUTPUT_MODE", "full")
 
 # --- Paths ---
 INPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "input", "topic_model_batch_inputs")
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "output", "topic_model_batch_outputs")
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "cache")
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "..", "models")
+
+# --- Classification cache ---
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_PATH = os.getenv("CACHE_PATH", os.path.join(CACHE_DIR, "classifications.sqlite3"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "500000"))
+CACHE_MAX_AGE_DAYS = float(os.getenv("CACHE_MAX_AGE_DAYS", "90"))
+
+# --- Local embeddings (cascade classifier) ---
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+# A topic scoring >= ACCEPT is assigned, < REJECT is ruled out; any score in
+# between sends the verbatim to the LLM.
+CASCADE_ACCEPT_THRESHOLD = float(os.getenv("CASCADE_ACCEPT_THRESHOLD", "0.55"))
+CASCADE_REJECT_THRESHOLD = float(os.getenv("CASCADE_REJECT_THRESHOLD", "0.30"))
+# Share of locally answered verbatims also sent to the LLM to measure agreement.
+CASCADE_AUDIT_FRACTION = float(os.getenv("CASCADE_AUDIT_FRACTION", "0.05"))
+
+# --- Near-duplicate collapsing (MinHash/LSH) ---
+DEDUPE_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", "0.85"))
+DEDUPE_NUM_PERM = int(os.getenv("DEDUPE_NUM_PERM", "64"))
+# Groups remembered at once (LRU); bounds memory on very large inputs.
+DEDUPE_MAX_REPRESENTATIVES = int(os.getenv("DEDUPE_MAX_REPRESENTATIVES", "200000"))
+
+# --- Local (distilled) classifier; empty = newest model trained on the current TOPICS ---
+LOCAL_MODEL_PATH = os.getenv("LOCAL_MODEL_PATH") or None
+
+# --- Run journal (checkpoint/resume) ---
+RUN_JOURNAL_PATH = os.getenv("RUN_JOURNAL_PATH", os.path.join(CACHE_DIR, "runs.sqlite3"))
+# Runs older than this are dropped from the journal (and can no longer be resumed).
+RUN_JOURNAL_MAX_AGE_DAYS = float(os.getenv("RUN_JOURNAL_MAX_AGE_DAYS", "30"))
+
+# --- Distributed work queue (main.py --coordinator / --worker) ---
+# Items leased to a worker at a time, and how long a lease lasts without
+# progress before the items are handed to another worker.
+QUEUE_LEASE_SIZE = int(os.getenv("QUEUE_LEASE_SIZE", "16"))
+QUEUE_LEASE_SECONDS = float(os.getenv("QUEUE_LEASE_SECONDS", "300"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_POLL_INTERVAL = float(os.getenv("QUEUE_POLL_INTERVAL", "5"))
 
 # --- Topic list ---
 TOPICS = [
@@ -38,3 +157,45 @@ TOPICS = [
     "Work Placement",
     "Graduation and Completion",
 ]
+
+# --- Topic taxonomy (coarse category -> child topics) ---
+# Used by the hierarchical classifier: a first pass picks categories, a
+# second pass only shows their child topics. TAXONOMY_PATH may point to a
+# JSON file of the same shape; TOPICS is then its flattened child list.
+TAXONOMY = {
+    "Admissions and Enrolment": [
+        "Enrolment Process",
+        "Recognition of Prior Learning (RPL)",
+        "Course Fees and Payments",
+    ],
+    "Teaching and Learning": [
+        "Course Content and Relevance",
+        "Trainer Quality and Engagement",
+        "Assessment and Feedback",
+        "Online Learning Platform",
+    ],
+    "Campus and Resources": [
+        "Facilities and Campus Environment",
+        "Technology and Equipment",
+        "Timetable and Scheduling",
+    ],
+    "Student Services": [
+        "Student Support Services",
+        "Student Welfare and Wellbeing",
+        "Communication and Information",
+    ],
+    "Careers and Outcomes": [
+        "Career and Employment Services",
+        "Work Placement",
+        "Graduation and Completion",
+    ],
+}
+
+TAXONOMY_PATH = os.getenv("TAXONOMY_PATH") or None
+if TAXONOMY_PATH:
+    with open(TAXONOMY_PATH) as f:
+        TAXONOMY = json.load(f)
+    TOPICS = [topic for children in TAXONOMY.values() for topic in children]
+
+# Hierarchical classifier: topics kept per verbatim by the embedding shortlist.
+HIERARCHY_SHORTLIST_SIZE = int(os.getenv("HIERARCHY_SHORTLIST_SIZE", "12"))
@@ -5,17 +5,55 @@ Usage:
     python main.py --backend openai
     python main.py --backend deepseek
     python main.py --backend gpt-oss
+    python main.py --backend local
+    python main.py --backend openai --no-cache
+    python main.py --backend deepseek --pack-size 20
+    python main.py --backend gpt-oss --output-mode compact
+    python main.py --backend gpt-oss --json-strategy schema
+    python main.py --backend deepseek --async
+    python main.py --backend gpt-oss --hierarchical categories
+    python main.py --backend deepseek --input survey.csv --output results.parquet
+    python main.py --backend gpt-oss --input survey.csv --ordered
+    python main.py --backend deepseek --cascade --cascade-examples labelled.json
+    python main.py --backend openai --input survey.csv --dedupe --dedupe-threshold 0.8
+    python main.py --resume <run-id printed at the start of a run>
+    python main.py --backend gpt-oss --input survey.csv --coordinator /shared/survey_queue.sqlite3
+    python main.py --worker /shared/survey_queue.sqlite3
 """
 
 import argparse
+import os
 import sys
+import time
+from itertools import chain
 
 from config.settings import (
+    CACHE_ENABLED,
+    DEDUPE_THRESHOLD,
     OPENAI_MODEL,
     OLLAMA_MODEL_DEEPSEEK,
     OLLAMA_MODEL_GPT_OSS,
+    OLLAMA_THINK_DEEPSEEK,
+    OLLAMA_THINK_GPT_OSS,
+    OUTPUT_DIR,
+    OUTPUT_MODE,
+    PACK_SIZE,
+    QUEUE_LEASE_SIZE,
+    QUEUE_POLL_INTERVAL,
+    TELEMETRY_DIR,
 )
-from src.utils.io import print_results, results_to_dataframe
+from src.classifiers.base import make_items
+from src.utils.io import (
+    iter_verbatims,
+    load_results,
+    open_sink,
+    print_results,
+    results_to_dataframe,
+    topic_frequencies,
+    topic_matrix,
+)
+from src.utils.journal import RunJournal
+from src.utils.work_queue import WorkQueue, default_worker_id
 
 # ---------------------------------------------------------------------------
 # Sample verbatims (replace with your real data source)
@@ -43,50 +81,448 @@ VERBATIMS = [
 # Backend factory
 # ---------------------------------------------------------------------------
 
-def build_classifier(backend: str):
+def build_classifier(
+    backend: str,
+    cache=None,
+    pack_size: int = PACK_SIZE,
+    output_mode: str = OUTPUT_MODE,
+    json_strategy: str | None = None,
+    asynchronous: bool = False,
+    journal: RunJournal | None = None,
+    hierarchical: str | None = None,
+    telemetry_dir: str | None = TELEMETRY_DIR,
+):
+    if hierarchical and (backend not in ("deepseek", "gpt-oss") or asynchronous):
+        print("--hierarchical is only available for the deepseek and gpt-oss backends without --async")
+        sys.exit(1)
+
     if backend == "openai":
         from src.classifiers.openai_classifier import OpenAIBatchClassifier
-        return OpenAIBatchClassifier(model=OPENAI_MODEL)
+        return OpenAIBatchClassifier(
+            model=OPENAI_MODEL,
+            cache=cache,
+            pack_size=pack_size,
+            output_mode=output_mode,
+            journal=journal,
+            telemetry_dir=telemetry_dir,
+        )
+
+    if backend in ("deepseek", "gpt-oss"):
+        if asynchronous:
+            from src.classifiers.async_ollama_classifier import AsyncOllamaClassifier as ollama_cls
+        elif hierarchical:
+            from functools import partial
+            from src.classifiers.hierarchical_classifier import HierarchicalOllamaClassifier
+            ollama_cls = partial(HierarchicalOllamaClassifier, shortlist=hierarchical)
+        else:
+            from src.classifiers.ollama_classifier import OllamaClassifier as ollama_cls
 
     if backend == "deepseek":
-        from src.classifiers.ollama_classifier import OllamaClassifier
-        return OllamaClassifier(
+        return ollama_cls(
             model=OLLAMA_MODEL_DEEPSEEK,
-            json_strategy="json_mode",
+            json_strategy=json_strategy or "json_mode",
+            think=OLLAMA_THINK_DEEPSEEK,
+            cache=cache,
+            pack_size=pack_size,
+            output_mode=output_mode,
+            telemetry_dir=telemetry_dir,
         )
 
     if backend == "gpt-oss":
-        from src.classifiers.ollama_classifier import OllamaClassifier
-        return OllamaClassifier(
+        return ollama_cls(
             model=OLLAMA_MODEL_GPT_OSS,
-            json_strategy="regex",
+            json_strategy=json_strategy or "regex",
+            think=OLLAMA_THINK_GPT_OSS,
+            cache=cache,
+            pack_size=pack_size,
+            output_mode=output_mode,
+            telemetry_dir=telemetry_dir,
         )
 
-    print(f"Unknown backend: '{backend}'. Choose from: openai, deepseek, gpt-oss")
+    if backend == "local":
+        from src.classifiers.local_classifier import LocalClassifier
+        return LocalClassifier.load()
+
+    print(f"Unknown backend: '{backend}'. Choose from: openai, deepseek, gpt-oss, local")
     sys.exit(1)
 
 
+# ---------------------------------------------------------------------------
+# Distributed mode
+# ---------------------------------------------------------------------------
+
+# Options the coordinator stores in the queue; every worker builds its classifier from them.
+QUEUE_OPTIONS = ("backend", "pack_size", "output_mode", "json_strategy", "hierarchical")
+
+
+def run_coordinator(args: argparse.Namespace) -> None:
+    """Enqueue the job, report progress while workers drain the queue, then write the results."""
+    if args.backend not in ("deepseek", "gpt-oss"):
+        print("--coordinator is only available for the deepseek and gpt-oss backends")
+        sys.exit(1)
+
+    queue = WorkQueue(args.coordinator)
+    queue.set_options({name: getattr(args, name) for name in QUEUE_OPTIONS})
+    if args.input:
+        items = iter_verbatims(args.input, text_column=args.text_column, id_column=args.id_column)
+    else:
+        items = make_items(VERBATIMS)
+    added = queue.enqueue(items)
+    counts = queue.counts()
+    total = sum(counts.values())
+    print(f"Queue {args.coordinator}: {added} new verbatim(s) enqueued, {total} in total.")
+    print(f"Start workers with: python main.py --worker {args.coordinator}")
+
+    started = time.time()
+    baseline = counts["done"] + counts["error"]
+    while not queue.finished():
+        time.sleep(QUEUE_POLL_INTERVAL)
+        counts = queue.counts()
+        finished = counts["done"] + counts["error"]
+        live = sum(w["alive"] for w in queue.workers())
+        print(f"  {finished}/{total} finished ({counts['error']} failed), {counts['leased']} leased, "
+              f"{counts['pending']} pending | {(finished - baseline) / (time.time() - started):.1f} "
+              f"verbatims/s across {live} live worker(s)...", end="\r")
+
+    elapsed = time.time() - started
+    counts = queue.counts()
+    finished = counts["done"] + counts["error"]
+    print(f"\n\n--- Distributed run [{args.coordinator}] ---")
+    print(f"  {counts['done']} done, {counts['error']} failed; {finished - baseline} finished in "
+          f"{elapsed:.1f}s ({(finished - baseline) / max(elapsed, 1e-9):.1f} verbatims/s aggregate)")
+    for w in queue.workers():
+        print(f"  {w['worker_id']:<30}: {w['done']} done, {w['errors']} error(s), "
+              f"{w['items_per_second']:.2f} verbatims/s{'' if w['alive'] else ' (gone)'}")
+
+    queue_name = os.path.splitext(os.path.basename(args.coordinator))[0]
+    output = args.output or os.path.join(OUTPUT_DIR, f"results_{queue_name}.jsonl")
+    with open_sink(output, append=False) as sink:
+        for result in queue.results():
+            sink.write(result)
+    print(f"{sink.count} results written to: {output}")
+    queue.close()
+
+
+def run_worker(args: argparse.Namespace, cache=None) -> None:
+    """Lease and classify verbatims until the coordinator's queue is finished."""
+    queue = WorkQueue(args.worker)
+    while True:
+        try:
+            options = queue.options()
+            break
+        except KeyError:
+            print(f"Waiting for a coordinator to set up {args.worker}...")
+            time.sleep(QUEUE_POLL_INTERVAL)
+
+    classifier = build_classifier(
+        options["backend"],
+        cache=cache,
+        pack_size=options["pack_size"],
+        output_mode=options["output_mode"],
+        json_strategy=options["json_strategy"],
+        hierarchical=options["hierarchical"],
+        telemetry_dir=args.telemetry,
+    )
+    worker_id = default_worker_id()
+    print(f"Worker {worker_id} on queue {args.worker} [backend={options['backend']}]")
+
+    written = 0
+    while True:
+        leased = queue.lease(worker_id, QUEUE_LEASE_SIZE)
+        if not leased:
+            if queue.finished():
+                break
+            time.sleep(QUEUE_POLL_INTERVAL)
+            continue
+        # Keep leasing as the classifier pulls items; results go back in small batches,
+        # which also renews the leases this worker still holds.
+        items = chain(leased, queue.iter_leases(worker_id, QUEUE_LEASE_SIZE))
+        batch, flushed = [], time.monotonic()
+        for result in classifier.classify_iter(items):
+            batch.append(result)
+            if len(batch) >= QUEUE_LEASE_SIZE or time.monotonic() - flushed > 1:
+                queue.complete(worker_id, batch)
+                written += len(batch)
+                batch, flushed = [], time.monotonic()
+        if batch:
+            queue.complete(worker_id, batch)
+            written += len(batch)
+
+    print(f"\nWorker {worker_id} finished: {written} result(s) written to {args.worker}.")
+    classifier.close()
+    queue.close()
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
+# Options stored in the run journal and restored by --resume.
+RESUMABLE_OPTIONS = (
+    "backend",
+    "pack_size",
+    "output_mode",
+    "json_strategy",
+    "asynchronous",
+    "hierarchical",
+    "cascade",
+    "cascade_examples",
+    "dedupe",
+    "dedupe_threshold",
+    "input",
+    "output",
+    "text_column",
+    "id_column",
+    "ordered",
+)
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Topic Modelling for student verbatims")
     parser.add_argument(
         "--backend",
-        choices=["openai", "deepseek", "gpt-oss"],
+        choices=["openai", "deepseek", "gpt-oss", "local"],
         default="openai",
-        help="LLM backend to use (default: openai)",
+        help="Backend to use; 'local' is a model distilled with train_local.py (default: openai)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the on-disk classification cache for this run",
+    )
+    parser.add_argument(
+        "--pack-size",
+        type=int,
+        default=PACK_SIZE,
+        help=f"Verbatims per LLM request; 1 disables packing (default: {PACK_SIZE})",
+    )
+    parser.add_argument(
+        "--output-mode",
+        choices=["full", "compact"],
+        default=OUTPUT_MODE,
+        help="'compact' returns topic numbers only instead of echoing the verbatim "
+             f"(default: {OUTPUT_MODE})",
+    )
+    parser.add_argument(
+        "--json-strategy",
+        choices=["json_mode", "regex", "schema"],
+        default=None,
+        help="Override the Ollama backend's JSON extraction strategy; 'schema' uses "
+             "structured-output decoding (default: json_mode for deepseek, regex for gpt-oss)",
+    )
+    parser.add_argument(
+        "--async",
+        dest="asynchronous",
+        action="store_true",
+        help="Ollama backends only: use asyncio with adaptive (AIMD) concurrency "
+             "instead of a fixed thread pool",
+    )
+    parser.add_argument(
+        "--hierarchical",
+        choices=["categories", "embeddings"],
+        default=None,
+        help="Ollama backends only: two-stage classification that shows the model a "
+             "shortlist of topics, chosen by a first category pass or by embedding similarity",
+    )
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="Classify confident verbatims locally with embeddings and send only "
+             "uncertain ones to the chosen backend",
+    )
+    parser.add_argument(
+        "--cascade-examples",
+        default=None,
+        help="Saved results (JSON) whose labels refine the cascade's topic prototypes",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Classify one representative per group of near-duplicate verbatims "
+             "and copy its topics to the rest",
+    )
+    parser.add_argument(
+        "--dedupe-threshold",
+        type=float,
+        default=DEDUPE_THRESHOLD,
+        help=f"Estimated Jaccard similarity for two verbatims to count as near-duplicates "
+             f"(default: {DEDUPE_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--input",
+        default=None,
+        help="CSV, JSONL or Parquet file of verbatims to classify, streamed row by row "
+             "(default: the built-in sample verbatims)",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="JSONL or Parquet file that results are written to as they complete; an existing file "
+             "is rewritten (default with --input: output/topic_model_batch_outputs/results_<timestamp>.jsonl)",
+    )
+    parser.add_argument(
+        "--text-column",
+        default="verbatim_text",
+        help="Input column holding the verbatim text (default: verbatim_text)",
+    )
+    parser.add_argument(
+        "--id-column",
+        default=None,
+        help="Input column to use as custom_id (default: verbatim_<row number>)",
+    )
+    parser.add_argument(
+        "--ordered",
+        action="store_true",
+        help="Write --input results in input order instead of as they complete",
+    )
+    parser.add_argument(
+        "--telemetry",
+        metavar="DIR",
+        default=TELEMETRY_DIR,
+        help="Write a JSONL record per LLM request and a Prometheus textfile of latency, token "
+             "and throughput metrics to DIR (default: TELEMETRY_DIR; summary printed either way)",
+    )
+    parser.add_argument(
+        "--coordinator",
+        metavar="QUEUE",
+        default=None,
+        help="Distributed mode: enqueue the verbatims into the SQLite queue file QUEUE (on storage "
+             "every worker can reach), report aggregate throughput until all are finished, then "
+             "write --output",
+    )
+    parser.add_argument(
+        "--worker",
+        metavar="QUEUE",
+        default=None,
+        help="Distributed mode: lease verbatims from QUEUE and classify them with this machine's "
+             "Ollama, using the backend options stored by the coordinator",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        default=None,
+        help="Resume an interrupted run: its stored options are restored, completed "
+             "verbatims are skipped and missing or errored ones are retried",
     )
     return parser.parse_args()
 
 
+def classify_to_sink(
+    classifier, items, output_path: str, journal: RunJournal, resume: bool = False, ordered: bool = False
+) -> int:
+    """
+    Stream *items* through the classifier, journalling and writing each result
+    as soon as it is ready (in input order if *ordered*). The output is
+    always rewritten; on resume it starts with the results the journal
+    already holds. Items the journal has already completed are skipped.
+    """
+    with open_sink(output_path, append=False) as sink:
+        if resume:
+            for result in journal.results(status="done"):
+                sink.write(result)
+        for result in classifier.classify_iter(items, ordered=ordered, pending=journal.pending):
+            journal.record(result)
+            sink.write(result)
+    print(f"{sink.count} results written to: {output_path}")
+    return sink.count
+
+
+def open_journal(args: argparse.Namespace) -> RunJournal:
+    """Start a new run journal, or reopen an existing one and restore its options into *args*."""
+    journal = RunJournal(args.resume)
+    if args.resume:
+        try:
+            options = journal.options()
+        except KeyError as e:
+            print(e.args[0])
+            sys.exit(1)
+        for name in RESUMABLE_OPTIONS:
+            if name in options:
+                setattr(args, name, options[name])
+        counts = journal.counts()
+        print(f"Resuming run {journal.run_id}: {counts['done']} verbatim(s) already done, "
+              f"{counts['error']} errored verbatim(s) to retry.")
+        return journal
+
+    if args.input and not args.output:
+        args.output = os.path.join(OUTPUT_DIR, f"results_{journal.run_id}.jsonl")
+    journal.start({name: getattr(args, name) for name in RESUMABLE_OPTIONS})
+    print(f"Run id: {journal.run_id} (continue an interrupted run with --resume {journal.run_id})")
+    return journal
+
+
 def main() -> None:
     args = parse_args()
-    classifier = build_classifier(args.backend)
+    if args.coordinator:
+        run_coordinator(args)
+        return
+
+    cache = None
+    if CACHE_ENABLED and not args.no_cache:
+        from src.utils.cache import ClassificationCache
+        cache = ClassificationCache()
+
+    if args.worker:
+        run_worker(args, cache)
+        if cache is not None:
+            cache.close()
+        return
+
+    journal = open_journal(args)
+
+    classifier = build_classifier(
+        args.backend,
+        cache=cache,
+        pack_size=args.pack_size,
+        output_mode=args.output_mode,
+        json_strategy=args.json_strategy,
+        asynchronous=args.asynchronous,
+        journal=journal,
+        hierarchical=args.hierarchical,
+        telemetry_dir=args.telemetry,
+    )
+    if args.cascade:
+        from src.classifiers.cascade_classifier import CascadeClassifier
+        examples = load_results(args.cascade_examples) if args.cascade_examples else None
+        classifier = CascadeClassifier(classifier, examples=examples)
+    if args.dedupe:
+        from src.classifiers.dedupe_classifier import DedupeClassifier
+        classifier = DedupeClassifier(classifier, threshold=args.dedupe_threshold)
 
     print(f"\n--- Running with backend: {args.backend} ---\n")
-    results = classifier.classify_batch(VERBATIMS)
+    if args.input:
+        items = iter_verbatims(args.input, text_column=args.text_column, id_column=args.id_column)
+        classify_to_sink(
+            classifier, items, args.output, journal, resume=bool(args.resume), ordered=args.ordered
+        )
+        results = None
+    else:
+        items = make_items(VERBATIMS)
+        for result in classifier.classify_iter(items, pending=journal.pending):
+            journal.record(result)
+        order = {item["custom_id"]: i for i, item in enumerate(items)}
+        results = sorted(journal.results(), key=lambda r: order[r["custom_id"]])
+        if args.output:
+            # The journal holds the whole run (resumed items included), so rewrite rather than append.
+            with open_sink(args.output, append=False) as sink:
+                for result in results:
+                    sink.write(result)
+            print(f"{sink.count} results written to: {args.output}")
+    classifier.close()
+
+    if cache is not None:
+        stats = cache.stats()
+        print(f"\nCache: {stats['hits']} hit(s), {stats['misses']} miss(es) "
+              f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries on disk.")
+        cache.close()
+
+    counts = journal.counts()
+    journal.close()
+    if counts["error"]:
+        print(f"\n{counts['error']} verbatim(s) failed; retry them with --resume {journal.run_id}")
+
+    if results is None:
+        return
 
     print_results(results)
 
@@ -94,6 +530,10 @@ def main() -> None:
     print("\n--- Final Results DataFrame ---")
     print(df[["verbatim_text", "topics"]].to_string(index=False))
 
+    frequencies = topic_frequencies(topic_matrix(results))
+    print("\n--- Topic frequencies ---")
+    print(frequencies[frequencies["count"] > 0].to_string(formatters={"share": "{:.0%}".format}))
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,161 @@
+import asyncio
+import time
+from collections.abc import Callable, Iterable, Iterator
+
+from ollama import AsyncClient
+
+from src.classifiers.base import BaseClassifier, fill_missing, iter_chunks
+from src.utils.journal import is_error_result
+from src.classifiers.ollama_classifier import OllamaClassifier, _tokens_used
+from src.utils.concurrency import AIMDLimiter
+from src.utils.host_pool import HostPool
+from config.settings import ADAPTIVE_MIN_CONCURRENCY, ADAPTIVE_MAX_CONCURRENCY
+
+
+class AsyncOllamaClassifier(OllamaClassifier):
+    """
+    asyncio variant of OllamaClassifier built on ollama.AsyncClient.
+
+    Instead of a fixed worker pool, the number of concurrent requests is
+    chosen at run time by an AIMDLimiter: it starts at max_workers, grows
+    while throughput keeps improving and backs off when latency or errors
+    rise. The level in use is exposed as self.concurrency and every
+    adjustment as self.concurrency_history.
+
+    Accepts every OllamaClassifier option (packing, output mode, JSON
+    strategy, cache, think).
+    """
+
+    def __init__(
+        self,
+        model: str,
+        min_concurrency: int = ADAPTIVE_MIN_CONCURRENCY,
+        max_concurrency: int = ADAPTIVE_MAX_CONCURRENCY,
+        **kwargs,
+    ):
+        super().__init__(model, **kwargs)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.concurrency = min(max(self.max_workers, min_concurrency), max_concurrency)
+        self.concurrency_history: list[dict] = []
+
+    # ------------------------------------------------------------------
+    # Public interface
+    # ------------------------------------------------------------------
+
+    def classify_items(self, items: list[dict]) -> list[dict]:
+        return asyncio.run(self.aclassify_items(items))
+
+    def classify_iter(
+        self,
+        items: Iterable[dict],
+        ordered: bool = False,
+        max_in_flight: int | None = None,
+        pending: Callable[[Iterable[dict]], Iterable[dict]] | None = None,
+    ) -> Iterator[dict]:
+        """
+        Stream through the async path a chunk at a time (BaseClassifier's
+        chunking, not OllamaClassifier's thread pool). Each chunk of
+        max_in_flight items (default: stream_chunk_size) is classified by
+        aclassify_items; the AIMD limit reached in one chunk is where the
+        next one starts.
+        """
+        return BaseClassifier.classify_iter(self, items, ordered, max_in_flight, pending)
+
+    async def aclassify_items(self, items: list[dict]) -> list[dict]:
+        limiter = AIMDLimiter(
+            initial=self.concurrency,
+            min_limit=self.min_concurrency,
+            max_limit=self.max_concurrency,
+        )
+        if isinstance(self.client, HostPool):
+            self._async_chat = self.client.achat
+        else:
+            self._async_chat = AsyncClient(host=self.hosts[0]).chat
+        self._limiter = limiter
+
+        print(f"Starting async batch processing with adaptive concurrency "
+              f"{limiter.limit} [{self.min_concurrency}-{self.max_concurrency}] "
+              f"[model={self.model}, strategy={self.json_strategy}, "
+              f"pack_size={self.pack_size}, output={self.output_mode}]...")
+        started = self._start_run()
+
+        results = []
+        tasks = [asyncio.create_task(self._aclassify_pack(pack)) for pack in iter_chunks(items, self.pack_size)]
+        for task in asyncio.as_completed(tasks):
+            results.extend(await task)
+            print(f"  Processed {len(results)}/{len(items)} (concurrency {limiter.limit})...", end="\r")
+
+        self.concurrency = limiter.limit
+        self.concurrency_history = limiter.history
+        self._finish_run(len(results), started)
+        self._print_concurrency_report()
+        return fill_missing(items, results)
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    async def _achat(self, kwargs: dict, sample: dict | None = None):
+        """
+        Send one chat request through the scheduler. Time spent waiting for
+        the first concurrency slot is added to *sample* as queue wait, the
+        rest (including retries) as latency.
+        """
+        opened = time.perf_counter()
+        started = None
+
+        async def send():
+            nonlocal started
+            async with self._limiter.slot():
+                if started is None:
+                    started = time.perf_counter()
+                return await self._async_chat(**kwargs)
+
+        response = None
+        try:
+            response = await self.scheduler.acall(send, self._estimate_tokens(kwargs), _tokens_used, record=sample)
+            return response
+        finally:
+            if sample is not None:
+                started = started or time.perf_counter()
+                sample["queue_wait_seconds"] += started - opened
+                self._observe(sample, response, time.perf_counter() - started)
+
+    async def _arequest_one(self, item: dict) -> dict:
+        sample = self.telemetry.start("single", [item])
+        try:
+            response = await self._achat(self._single_request(item), sample)
+            started = time.perf_counter()
+            result = self._handle_single(item, response)
+            sample["parse_seconds"] += time.perf_counter() - started
+        except Exception as e:
+            result = self._single_error(item, e)
+        self.telemetry.record(sample, ok=not is_error_result(result))
+        return result
+
+    async def _aclassify_pack(self, items: list[dict]) -> list[dict]:
+        results, pending = self._split_cached(items)
+        if len(pending) <= 1:
+            return results + [await self._arequest_one(item) for item in pending]
+
+        sample = self.telemetry.start("pack", pending)
+        try:
+            response = await self._achat(self._pack_request(pending), sample)
+            started = time.perf_counter()
+            parsed = self._handle_pack(pending, response)
+            sample["parse_seconds"] += time.perf_counter() - started
+        except Exception as e:
+            parsed = self._pack_error(pending, e)
+        self.telemetry.record(sample, ok=len(parsed) == len(pending))
+
+        fallback = self._merge_pack(pending, parsed, results)
+        results.extend(await asyncio.gather(*(self._arequest_one(item) for item in fallback)))
+        return results
+
+    def _print_concurrency_report(self) -> None:
+        print(f"\n--- Adaptive concurrency [final={self.concurrency}] ---")
+        for step in self.concurrency_history:
+            print(f"  t={step['elapsed_s']:>8.2f}s  {step['limit']:>3} -> {step['new_limit']:<3} "
+                  f"{step['action']:<8} {step['throughput_rps']:.2f} req/s, "
+                  f"{step['mean_latency_s']:.2f}s mean latency, {step['errors']} error(s)")
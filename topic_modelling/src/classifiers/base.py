@@ -1,10 +1,44 @@
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+
+NO_RESULT = "Error: No Result"
+
+
+def make_items(verbatims: list[str], start: int = 0) -> list[dict]:
+    """Wrap raw verbatims as items with sequential custom_ids (verbatim_1, verbatim_2, ...)."""
+    return [
+        {"custom_id": f"verbatim_{start + i + 1}", "verbatim_text": v}
+        for i, v in enumerate(verbatims)
+    ]
+
+
+def iter_chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    """Lazily split *iterable* into lists of at most *size* elements."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def fill_missing(items: list[dict], results: Iterable[dict | None]) -> list[dict]:
+    """
+    Match *results* to *items* by custom_id and return them in input order.
+    An item with no result (or a None result) gets a NO_RESULT error record
+    instead of silently disappearing from the output.
+    """
+    by_id = {r["custom_id"]: r for r in results if r is not None}
+    missing = sum(item["custom_id"] not in by_id for item in items)
+    if missing:
+        print(f"\nWarning: {missing} item(s) returned no result; marked as {NO_RESULT!r}.")
+    return [by_id.get(item["custom_id"]) or {**item, "topics": [NO_RESULT]} for item in items]
 
 
 class BaseClassifier(ABC):
     """Abstract base class for all topic classifiers."""
 
-    @abstractmethod
+    # Items handed to classify_items at a time when streaming with classify_iter.
+    stream_chunk_size = 1000
+
     def classify_batch(self, verbatims: list[str]) -> list[dict]:
         """
         Classify a list of verbatims into topics.
@@ -12,7 +46,56 @@ class BaseClassifier(ABC):
         Args:
             verbatims: List of raw student feedback strings.
 
+        Returns:
+            List of dicts with keys: 'custom_id', 'verbatim_text', 'topics'.
+        """
+        return self.classify_items(make_items(verbatims))
+
+    @abstractmethod
+    def classify_items(self, items: list[dict]) -> list[dict]:
+        """
+        Classify items that already carry their own ids.
+
+        Args:
+            items: Dicts with keys 'custom_id' and 'verbatim_text'.
+
         Returns:
             List of dicts with keys: 'custom_id', 'verbatim_text', 'topics'.
         """
         ...
+
+    def classify_iter(
+        self,
+        items: Iterable[dict],
+        ordered: bool = False,
+        max_in_flight: int | None = None,
+        pending: Callable[[Iterable[dict]], Iterable[dict]] | None = None,
+    ) -> Iterator[dict]:
+        """
+        Classify a (possibly unbounded) stream of items, yielding one result
+        per item as results become available.
+
+        Items are pulled from *items* only as the consumer asks for results,
+        so a slow consumer applies backpressure and at most max_in_flight
+        items (default: stream_chunk_size) are held at once.
+
+        Args:
+            items:         Dicts with keys 'custom_id' and 'verbatim_text'.
+            ordered:       Yield results in input order. Otherwise they are
+                           yielded as they complete; classifiers that work a
+                           chunk at a time (this default) finish each chunk
+                           whole, so both modes yield chunks in input order.
+            max_in_flight: Maximum number of items read but not yet yielded.
+            pending:       Filter applied to each chunk after it is cut from
+                           *items* (e.g. RunJournal.pending). Chunks, and the
+                           batch jobs built from them, then do not move when
+                           a resumed run skips items an earlier run finished.
+        """
+        for chunk in iter_chunks(items, max_in_flight or self.stream_chunk_size):
+            if pending is not None:
+                chunk = list(pending(chunk))
+            if chunk:
+                yield from fill_missing(chunk, self.classify_items(chunk))
+
+    def close(self) -> None:
+        """Release anything held between runs (e.g. background threads); call once classification is done."""
@@ -0,0 +1,179 @@
+import hashlib
+
+import numpy as np
+
+from src.classifiers.base import BaseClassifier, fill_missing
+from src.prompts import NO_MATCH
+from src.utils.embeddings import Embedder, topic_prototypes
+from src.utils.journal import is_error_result
+from config.settings import (
+    CASCADE_ACCEPT_THRESHOLD,
+    CASCADE_AUDIT_FRACTION,
+    CASCADE_REJECT_THRESHOLD,
+    TOPICS,
+)
+
+
+def _jaccard(a: list[str], b: list[str]) -> float:
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+class CascadeClassifier(BaseClassifier):
+    """
+    Classifies the easy verbatims locally and sends only the uncertain ones
+    to an LLM classifier.
+
+    Verbatims are embedded on CPU and scored (cosine similarity) against one
+    prototype per topic, built from the topic name plus any labelled
+    examples. For each topic a score >= accept_threshold assigns it and a
+    score < reject_threshold rules it out; a verbatim with every topic on
+    one side or the other is answered locally, anything in between is
+    routed to the wrapped classifier.
+
+    To measure how well the two paths agree, audit_fraction of the locally
+    answered verbatims are also sent to the LLM (chosen by a hash of the
+    custom_id, so the sample is stable across runs); those items keep the
+    LLM's label. The routed fraction and agreement figures are printed after
+    every run and kept in self.stats.
+    """
+
+    def __init__(
+        self,
+        llm: BaseClassifier,
+        embedder: Embedder | None = None,
+        examples: list[dict] | None = None,
+        accept_threshold: float = CASCADE_ACCEPT_THRESHOLD,
+        reject_threshold: float = CASCADE_REJECT_THRESHOLD,
+        audit_fraction: float = CASCADE_AUDIT_FRACTION,
+        topics: list[str] = TOPICS,
+    ):
+        if not reject_threshold <= accept_threshold:
+            raise ValueError("reject_threshold must not exceed accept_threshold")
+        if not 0.0 <= audit_fraction <= 1.0:
+            raise ValueError("audit_fraction must be between 0 and 1")
+        self.llm = llm
+        self.embedder = embedder or Embedder()
+        self.topics = topics
+        self.accept_threshold = accept_threshold
+        self.reject_threshold = reject_threshold
+        self.audit_fraction = audit_fraction
+        self.prototypes = topic_prototypes(self.embedder, topics, examples)
+        # Stream in chunks the wrapped backend is efficient with (e.g. one batch job).
+        self.stream_chunk_size = llm.stream_chunk_size
+        self.stats = self._empty_stats()
+
+    # ------------------------------------------------------------------
+    # Public interface
+    # ------------------------------------------------------------------
+
+    def classify_items(self, items: list[dict]) -> list[dict]:
+        self.stats = self._empty_stats()
+        if not items:
+            return []
+
+        scores = self.score([item["verbatim_text"] for item in items])
+        local, routed, audited = {}, [], []
+        for item, row in zip(items, scores):
+            guess = self._topics_for(row)
+            if self._is_confident(row):
+                local[item["custom_id"]] = {**item, "topics": guess}
+                if self._in_audit(item["custom_id"]):
+                    audited.append(item)
+            else:
+                routed.append((item, guess))
+
+        print(f"Cascade: {len(local)} verbatim(s) answered locally, {len(routed)} routed to the LLM, "
+              f"{len(audited)} audited.")
+        llm_results = {}
+        if routed or audited:
+            for result in self.llm.classify_items([item for item, _ in routed] + audited):
+                llm_results[result["custom_id"]] = result
+
+        self._record(items, local, routed, audited, llm_results)
+        self.print_report()
+
+        return fill_missing(
+            items, [llm_results.get(item["custom_id"]) or local.get(item["custom_id"]) for item in items]
+        )
+
+    def score(self, texts: list[str]) -> np.ndarray:
+        """Cosine similarity of each text to each topic prototype, shape (len(texts), len(topics))."""
+        return self.embedder.encode(texts) @ self.prototypes.T
+
+    def print_report(self) -> None:
+        s = self.stats
+        print("\n--- Cascade report ---")
+        print(f"  Verbatims          : {s['items']}")
+        print(f"  Answered locally   : {s['local']} ({1 - s['routed_fraction']:.0%})")
+        print(f"  Routed to the LLM  : {s['routed']} ({s['routed_fraction']:.0%})")
+        for path in ("audited", "routed"):
+            agreement = s[f"{path}_agreement"]
+            if agreement["compared"]:
+                print(f"  Agreement ({path:<7}): {agreement['exact']:.0%} exact, "
+                      f"{agreement['jaccard']:.2f} mean Jaccard over {agreement['compared']} verbatim(s)")
+
+    def close(self) -> None:
+        self.llm.close()
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _topics_for(self, row: np.ndarray) -> list[str]:
+        return [self.topics[i] for i in np.flatnonzero(row >= self.accept_threshold)] or [NO_MATCH]
+
+    def _is_confident(self, row: np.ndarray) -> bool:
+        return not np.any((row >= self.reject_threshold) & (row < self.accept_threshold))
+
+    def _in_audit(self, custom_id: str) -> bool:
+        if self.audit_fraction <= 0:
+            return False
+        bucket = int(hashlib.sha256(custom_id.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+        return bucket < self.audit_fraction
+
+    @staticmethod
+    def _empty_stats() -> dict:
+        empty = {"compared": 0, "exact": 0.0, "jaccard": 0.0}
+        return {
+            "items": 0,
+            "local": 0,
+            "routed": 0,
+            "routed_fraction": 0.0,
+            "audited_agreement": dict(empty),
+            "routed_agreement": dict(empty),
+        }
+
+    def _record(self, items, local, routed, audited, llm_results) -> None:
+        def agreement(pairs: list[tuple[list[str], list[str]]]) -> dict:
+            if not pairs:
+                return {"compared": 0, "exact": 0.0, "jaccard": 0.0}
+            return {
+                "compared": len(pairs),
+                "exact": sum(set(a) == set(b) for a, b in pairs) / len(pairs),
+                "jaccard": sum(_jaccard(a, b) for a, b in pairs) / len(pairs),
+            }
+
+        def usable(custom_id: str) -> bool:
+            result = llm_results.get(custom_id)
+            return result is not None and not is_error_result(result)
+
+        audited_pairs = [
+            (local[item["custom_id"]]["topics"], llm_results[item["custom_id"]]["topics"])
+            for item in audited
+            if usable(item["custom_id"])
+        ]
+        # For routed items, compare the local best guess with what the LLM decided.
+        routed_pairs = [
+            (guess, llm_results[item["custom_id"]]["topics"])
+            for item, guess in routed
+            if usable(item["custom_id"])
+        ]
+        self.stats = {
+            "items": len(items),
+            "local": len(local),
+            "routed": len(routed),
+            "routed_fraction": len(routed) / len(items),
+            "audited_agreement": agreement(audited_pairs),
+            "routed_agreement": agreement(routed_pairs),
+        }
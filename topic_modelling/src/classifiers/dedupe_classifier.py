@@ -0,0 +1,78 @@
+from src.classifiers.base import BaseClassifier, fill_missing
+from src.utils.dedupe import NearDuplicateIndex
+from src.utils.journal import is_error_result
+from config.settings import DEDUPE_MAX_REPRESENTATIVES, DEDUPE_NUM_PERM, DEDUPE_THRESHOLD
+
+
+class DedupeClassifier(BaseClassifier):
+    """
+    Collapses near-duplicate verbatims before they reach the wrapped
+    classifier.
+
+    Each item is assigned to a group by a NearDuplicateIndex (MinHash/LSH,
+    estimated Jaccard >= threshold); only one representative per group is
+    classified and its topics are fanned out to every member. Groups persist
+    across classify_items calls, so when streaming with classify_iter a
+    template reply seen in the first chunk is never sent again. A group whose
+    representative fails is forgotten so that later members are retried.
+    """
+
+    def __init__(
+        self,
+        inner: BaseClassifier,
+        threshold: float = DEDUPE_THRESHOLD,
+        num_perm: int = DEDUPE_NUM_PERM,
+        max_representatives: int = DEDUPE_MAX_REPRESENTATIVES,
+    ):
+        self.inner = inner
+        self.index = NearDuplicateIndex(
+            threshold=threshold,
+            num_perm=num_perm,
+            max_representatives=max_representatives,
+        )
+        self.stream_chunk_size = inner.stream_chunk_size
+        self.stats = {"items": 0, "classified": 0, "collapsed": 0}
+
+    def classify_items(self, items: list[dict]) -> list[dict]:
+        assignments = self.index.assign(items)
+        chunk_ids = {item["custom_id"] for item in items}
+
+        to_classify, known = [], {}
+        for item, rep_id in zip(items, assignments):
+            if rep_id == item["custom_id"]:
+                to_classify.append(item)
+            elif rep_id not in chunk_ids:
+                topics = self.index.topics_for(rep_id)
+                if topics is None:
+                    to_classify.append(item)
+                else:
+                    known[item["custom_id"]] = topics
+
+        classified = {r["custom_id"]: r for r in self.inner.classify_items(to_classify)} if to_classify else {}
+        for custom_id, result in classified.items():
+            if is_error_result(result):
+                self.index.discard(custom_id)
+            else:
+                self.index.set_topics(custom_id, result["topics"])
+
+        results = []
+        for item, rep_id in zip(items, assignments):
+            if item["custom_id"] in classified:
+                results.append(classified[item["custom_id"]])
+            elif item["custom_id"] in known:
+                results.append({**item, "topics": known[item["custom_id"]]})
+            elif rep_id in classified:
+                results.append({**item, "topics": classified[rep_id]["topics"]})
+
+        collapsed = len(items) - len(to_classify)
+        self.stats["items"] += len(items)
+        self.stats["classified"] += len(to_classify)
+        self.stats["collapsed"] += collapsed
+        print(f"\nDedupe: {len(items)} verbatim(s) -> {len(to_classify)} classified, "
+              f"{collapsed} near-duplicate(s) labelled from their group "
+              f"({self.stats['collapsed']} LLM call(s) saved so far, "
+              f"{self.stats['collapsed'] / self.stats['items']:.0%} of items).")
+        return fill_missing(items, results)
+
+    def close(self) -> None:
+        self.inner.close()
@@ -0,0 +1,164 @@
+import json
+import threading
+import time
+
+from src.classifiers.ollama_classifier import OllamaClassifier
+from src.prompts import (
+    NO_MATCH,
+    category_messages_for,
+    category_schema,
+    hierarchical_fingerprint,
+    response_schema,
+    subset_messages_for,
+)
+from src.utils.journal import is_error_result
+from src.utils.metrics import UsageCounters
+from config.settings import HIERARCHY_SHORTLIST_SIZE, TAXONOMY, TOPICS
+
+
+class HierarchicalOllamaClassifier(OllamaClassifier):
+    """
+    Two-stage OllamaClassifier for large taxonomies: the second request only
+    lists a shortlist of topics instead of every entry of TOPICS.
+
+    shortlist="categories": a first request picks coarse categories from
+    TAXONOMY and the second request shows only their child topics.
+    shortlist="embeddings": no first request; the verbatim is embedded
+    locally and the shortlist_size most similar topics are shown.
+
+    Prompt tokens and latency are reported per stage. Single-item, full
+    output mode only (pack_size must be 1). Cache entries are scoped by
+    hierarchical_fingerprint(), so they never mix with flat runs.
+    """
+
+    SHORTLISTS = ("categories", "embeddings")
+
+    def __init__(
+        self,
+        model: str,
+        shortlist: str = "categories",
+        taxonomy: dict[str, list[str]] = TAXONOMY,
+        shortlist_size: int = HIERARCHY_SHORTLIST_SIZE,
+        **kwargs,
+    ):
+        if shortlist not in self.SHORTLISTS:
+            raise ValueError(f"shortlist must be one of {self.SHORTLISTS}")
+        if kwargs.get("pack_size", 1) != 1 or kwargs.get("output_mode", "full") != "full":
+            raise ValueError("hierarchical classification supports pack_size=1 and output_mode='full' only")
+        super().__init__(model, **kwargs)
+        self.shortlist = shortlist
+        self.taxonomy = taxonomy
+        self.shortlist_size = shortlist_size
+        self.cache_scope = f"{model}:hierarchical:{hierarchical_fingerprint(taxonomy, shortlist, shortlist_size)}"
+        self.stage_usage = UsageCounters()
+        self.stage_seconds: dict[str, float] = {}
+        self._stage_lock = threading.Lock()
+
+        if shortlist == "embeddings":
+            from src.utils.embeddings import Embedder, topic_prototypes
+            self._embedder = Embedder()
+            self._prototypes = topic_prototypes(self._embedder, TOPICS)
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _start_run(self) -> float:
+        self.stage_usage = UsageCounters()
+        self.stage_seconds = {}
+        return super()._start_run()
+
+    def _finish_run(self, count: int, started: float) -> None:
+        super()._finish_run(count, started)
+        self.stage_usage.print_report(f"Usage by stage [shortlist={self.shortlist}]")
+        print("  Per request:")
+        for stage, c in self.stage_usage.snapshot().items():
+            seconds = self.stage_seconds.get(stage, 0.0)
+            print(f"    {stage:<10}: {seconds / max(c['requests'], 1):.3f}s mean latency, "
+                  f"{c['prompt_tokens'] / max(c['requests'], 1):.0f} prompt tokens per request")
+
+    def _request_one(self, item: dict, queued_at: float | None = None) -> dict:
+        sample = self.telemetry.start("hierarchical", [item], queued_at)
+        try:
+            candidates = self._candidates(item, sample)
+            if candidates is None:
+                result = {**item, "topics": ["Error: Invalid categories"]}
+            elif not candidates:
+                result = {**item, "topics": [NO_MATCH]}
+            else:
+                response = self._timed_chat("topics", self._subset_request(item, candidates), sample)
+                started = time.perf_counter()
+                result = self._handle_subset(item, response, candidates)
+                sample["parse_seconds"] += time.perf_counter() - started
+            if self.cache is not None and not is_error_result(result):
+                self.cache.put(self.cache_scope, item["verbatim_text"], result["topics"])
+        except Exception as e:
+            result = self._single_error(item, e)
+        self.telemetry.record(sample, ok=not is_error_result(result))
+        return result
+
+    def _candidates(self, item: dict, sample: dict | None = None) -> list[str] | None:
+        """Shortlisted topics; [] when no category applies, None when the category answer is unusable."""
+        if self.shortlist == "embeddings":
+            started = time.perf_counter()
+            scores = self._embedder.encode([item["verbatim_text"]])[0] @ self._prototypes.T
+            ranked = scores.argsort()[::-1][:self.shortlist_size]
+            self._record_stage("shortlist", {}, time.perf_counter() - started)
+            return [TOPICS[i] for i in sorted(ranked)]
+
+        kwargs = dict(
+            model=self.model,
+            messages=category_messages_for(item["verbatim_text"], self.taxonomy),
+            options=self.ollama_options,
+        )
+        if self.json_strategy == "json_mode":
+            kwargs["format"] = "json"
+        elif self.json_strategy == "schema":
+            kwargs["format"] = category_schema(self.taxonomy)
+        response = self._timed_chat("categories", self._with_think(kwargs), sample)
+        self._record_usage(response)
+        try:
+            data = self._decode_json(self._answer_text(response, f"{item['custom_id']}:categories"))
+        except json.JSONDecodeError:
+            data = None
+        categories = data.get("categories") if isinstance(data, dict) else None
+        if not isinstance(categories, list) or not all(isinstance(c, str) for c in categories):
+            self.usage.record_parse_failure(self.json_strategy)
+            print(f"\nWarning: invalid category answer for {item['custom_id']}: {data!r}")
+            return None
+        return [topic for c in categories if c in self.taxonomy for topic in self.taxonomy[c]]
+
+    def _subset_request(self, item: dict, candidates: list[str]) -> dict:
+        kwargs = dict(
+            model=self.model,
+            messages=subset_messages_for(item["verbatim_text"], candidates),
+            options=self.ollama_options,
+        )
+        if self.json_strategy == "json_mode":
+            kwargs["format"] = "json"
+        elif self.json_strategy == "schema":
+            kwargs["format"] = response_schema(topics=candidates)
+        return self._with_think(kwargs)
+
+    def _handle_subset(self, item: dict, response, candidates: list[str]) -> dict:
+        self._record_usage(response)
+        raw = self._answer_text(response, item["custom_id"])
+        result = self._parse_response(raw, item["custom_id"], item["verbatim_text"])
+        if not is_error_result(result):
+            result["topics"] = [t for t in result["topics"] if t in candidates] or [NO_MATCH]
+        return result
+
+    def _timed_chat(self, stage: str, kwargs: dict, sample: dict | None = None):
+        started = time.perf_counter()
+        response = self._chat(kwargs, sample)
+        self._record_stage(stage, response, time.perf_counter() - started)
+        return response
+
+    def _record_stage(self, stage: str, response, seconds: float) -> None:
+        self.stage_usage.record(
+            stage,
+            prompt_tokens=response.get("prompt_eval_count") or 0,
+            completion_tokens=response.get("eval_count") or 0,
+        )
+        with self._stage_lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
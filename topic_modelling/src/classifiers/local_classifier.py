@@ -0,0 +1,301 @@
+import glob
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+from src.classifiers.base import BaseClassifier
+from src.prompts import NO_MATCH
+from src.utils.journal import is_error_result
+from config.settings import LOCAL_MODEL_PATH, MODELS_DIR, TOPICS
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def topics_version(topics: list[str] = TOPICS) -> str:
+    """Short hash of the topic list; a model only serves the TOPICS it was trained on."""
+    return hashlib.sha256(json.dumps(topics).encode("utf-8")).hexdigest()[:12]
+
+
+# ---------------------------------------------------------------------------
+# Features
+# ---------------------------------------------------------------------------
+
+class TfidfFeatures:
+    """
+    Word unigram + bigram TF-IDF (sublinear tf, smoothed idf, L2-normalised),
+    implemented in NumPy so it can be saved alongside the weights.
+    """
+
+    def __init__(self, vocabulary: list[str], idf: np.ndarray):
+        self.vocabulary = vocabulary
+        self.index = {term: i for i, term in enumerate(vocabulary)}
+        self.idf = idf.astype(np.float32)
+
+    @staticmethod
+    def terms(text: str) -> list[str]:
+        tokens = _TOKEN.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    @classmethod
+    def fit(cls, texts: list[str], max_features: int = 20_000, min_df: int = 2) -> "TfidfFeatures":
+        df = Counter()
+        for text in texts:
+            df.update(set(cls.terms(text)))
+        kept = [(term, n) for term, n in df.items() if n >= min_df]
+        kept.sort(key=lambda pair: (-pair[1], pair[0]))
+        kept = kept[:max_features]
+        vocabulary = [term for term, _ in kept]
+        counts = np.array([n for _, n in kept], dtype=np.float32)
+        idf = np.log((1 + len(texts)) / (1 + counts)) + 1
+        return cls(vocabulary, idf)
+
+    def sparse(self, texts: list[str]) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Per-text (column indices, weights); the compact form used during training."""
+        rows = []
+        for text in texts:
+            counts = Counter(t for t in self.terms(text) if t in self.index)
+            columns = np.fromiter((self.index[t] for t in counts), dtype=np.int64, count=len(counts))
+            weights = np.fromiter((1 + math.log(n) for n in counts.values()), dtype=np.float32, count=len(counts))
+            weights *= self.idf[columns]
+            norm = np.linalg.norm(weights)
+            rows.append((columns, weights / norm if norm else weights))
+        return rows
+
+    def densify(self, rows: list[tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        matrix = np.zeros((len(rows), len(self.vocabulary)), dtype=np.float32)
+        for i, (columns, weights) in enumerate(rows):
+            matrix[i, columns] = weights
+        return matrix
+
+    def transform(self, texts: list[str]) -> np.ndarray:
+        return self.densify(self.sparse(texts))
+
+
+# ---------------------------------------------------------------------------
+# Classifier
+# ---------------------------------------------------------------------------
+
+class LocalClassifier(BaseClassifier):
+    """
+    Multi-label topic classifier distilled from LLM labels: TF-IDF features
+    and one logistic output per topic, all stored as NumPy arrays.
+
+    Train it from saved LLM results with train_local.py; each model is saved
+    as models/local_<topics version>_<timestamp>.npz, and load() only accepts
+    a model trained on the current TOPICS. Runs entirely on CPU, thousands
+    of verbatims per second.
+    """
+
+    stream_chunk_size = 4096
+
+    def __init__(
+        self,
+        features: TfidfFeatures,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        topics: list[str] = TOPICS,
+        threshold: float = 0.5,
+        metadata: dict | None = None,
+    ):
+        self.features = features
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.topics = topics
+        self.threshold = threshold
+        self.metadata = metadata or {}
+
+    # ------------------------------------------------------------------
+    # Public interface
+    # ------------------------------------------------------------------
+
+    def classify_items(self, items: list[dict]) -> list[dict]:
+        results = []
+        for start in range(0, len(items), self.stream_chunk_size):
+            chunk = items[start:start + self.stream_chunk_size]
+            probabilities = self.predict_proba([item["verbatim_text"] for item in chunk])
+            for item, row in zip(chunk, probabilities):
+                topics = [self.topics[i] for i in np.flatnonzero(row >= self.threshold)]
+                results.append({**item, "topics": topics or [NO_MATCH]})
+        return results
+
+    def predict_proba(self, texts: list[str]) -> np.ndarray:
+        logits = self.features.transform(texts) @ self.weights + self.bias
+        return 1 / (1 + np.exp(-logits))
+
+    def evaluate(self, examples: list[dict]) -> dict:
+        """
+        Compare predictions with the reference (LLM) labels of *examples*.
+
+        Returns:
+            Dict with exact-match accuracy, micro/macro precision, recall and
+            F1, and per-topic figures.
+        """
+        predicted = self.classify_items(
+            [{"custom_id": str(i), "verbatim_text": e["verbatim_text"]} for i, e in enumerate(examples)]
+        )
+        counts = {topic: {"tp": 0, "fp": 0, "fn": 0} for topic in (*self.topics, NO_MATCH)}
+        exact = 0
+        for example, prediction in zip(examples, predicted):
+            expected = set(_label_set(example["topics"], self.topics))
+            got = set(prediction["topics"])
+            exact += expected == got
+            for topic in counts:
+                counts[topic]["tp"] += topic in expected and topic in got
+                counts[topic]["fp"] += topic not in expected and topic in got
+                counts[topic]["fn"] += topic in expected and topic not in got
+
+        def prf(tp: int, fp: int, fn: int) -> dict:
+            precision = tp / (tp + fp) if tp + fp else 0.0
+            recall = tp / (tp + fn) if tp + fn else 0.0
+            f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+            return {"precision": round(precision, 4), "recall": round(recall, 4), "f1": round(f1, 4), "support": tp + fn}
+
+        per_topic = {topic: prf(**c) for topic, c in counts.items()}
+        supported = [s for s in per_topic.values() if s["support"]]
+        total = {k: sum(c[k] for c in counts.values()) for k in ("tp", "fp", "fn")}
+        return {
+            "examples": len(examples),
+            "exact_match": round(exact / len(examples), 4) if examples else 0.0,
+            "micro": prf(**total),
+            "macro_f1": round(sum(s["f1"] for s in supported) / len(supported), 4) if supported else 0.0,
+            "per_topic": per_topic,
+        }
+
+    # ------------------------------------------------------------------
+    # Training and persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def train(
+        cls,
+        examples: list[dict],
+        topics: list[str] = TOPICS,
+        epochs: int = 30,
+        learning_rate: float = 0.05,
+        l2: float = 1e-5,
+        batch_size: int = 256,
+        max_features: int = 20_000,
+        min_df: int = 2,
+        seed: int = 0,
+    ) -> "LocalClassifier":
+        """
+        Fit TF-IDF features and a logistic head (Adam, binary cross-entropy)
+        on results-style dicts ('verbatim_text', 'topics'). Error results
+        are skipped; 'No Match' means no topic.
+        """
+        examples = [e for e in examples if not is_error_result(e)]
+        if not examples:
+            raise ValueError("No usable labelled examples to train on")
+
+        texts = [e["verbatim_text"] for e in examples]
+        features = TfidfFeatures.fit(texts, max_features=max_features, min_df=min_df)
+        rows = features.sparse(texts)
+        index = {topic: i for i, topic in enumerate(topics)}
+        labels = np.zeros((len(examples), len(topics)), dtype=np.float32)
+        for i, example in enumerate(examples):
+            for topic in example["topics"]:
+                if topic in index:
+                    labels[i, index[topic]] = 1.0
+
+        prior = labels.mean(axis=0).clip(1e-3, 1 - 1e-3)
+        weights = np.zeros((len(features.vocabulary), len(topics)), dtype=np.float32)
+        bias = np.log(prior / (1 - prior)).astype(np.float32)
+        params = [weights, bias]
+        moments = [(np.zeros_like(p), np.zeros_like(p)) for p in params]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+        rng = np.random.default_rng(seed)
+        step = 0
+        for _ in range(epochs):
+            order = rng.permutation(len(rows))
+            for start in range(0, len(rows), batch_size):
+                batch = order[start:start + batch_size]
+                x = features.densify([rows[i] for i in batch])
+                error = (1 / (1 + np.exp(-(x @ weights + bias))) - labels[batch]) / len(batch)
+                grads = [x.T @ error + l2 * weights, error.sum(axis=0)]
+
+                step += 1
+                for param, grad, (m, v) in zip(params, grads, moments):
+                    m *= beta1
+                    m += (1 - beta1) * grad
+                    v *= beta2
+                    v += (1 - beta2) * grad * grad
+                    m_hat = m / (1 - beta1 ** step)
+                    v_hat = v / (1 - beta2 ** step)
+                    param -= learning_rate * m_hat / (np.sqrt(v_hat) + eps)
+
+        metadata = {
+            "topics_version": topics_version(topics),
+            "trained_at": datetime.now().isoformat(timespec="seconds"),
+            "examples": len(examples),
+            "epochs": epochs,
+            "vocabulary_size": len(features.vocabulary),
+        }
+        return cls(features, weights, bias, topics=topics, metadata=metadata)
+
+    def save(self, path: str | None = None) -> str:
+        if path is None:
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(MODELS_DIR, f"local_{topics_version(self.topics)}_{stamp}.npz")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            idf=self.features.idf,
+            vocabulary=np.array(self.features.vocabulary, dtype=str),
+            topics=np.array(self.topics, dtype=str),
+            threshold=np.array(self.threshold, dtype=np.float32),
+            metadata=np.array(json.dumps(self.metadata)),
+        )
+        print(f"Local model saved to: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: str | None = LOCAL_MODEL_PATH, topics: list[str] = TOPICS) -> "LocalClassifier":
+        """
+        Load a saved model; without *path*, the newest one trained on *topics*.
+
+        Raises:
+            FileNotFoundError: If no model exists for the current topic list.
+            ValueError: If the model was trained on a different topic list.
+        """
+        version = topics_version(topics)
+        if path is None:
+            candidates = sorted(glob.glob(os.path.join(MODELS_DIR, f"local_{version}_*.npz")))
+            if not candidates:
+                raise FileNotFoundError(
+                    f"No local model trained for the current TOPICS (version {version}); "
+                    f"train one with: python train_local.py <results file>"
+                )
+            path = candidates[-1]
+
+        with np.load(path, allow_pickle=False) as data:
+            saved_topics = [str(t) for t in data["topics"]]
+            if saved_topics != list(topics):
+                raise ValueError(
+                    f"{path} was trained on a different topic list (version "
+                    f"{topics_version(saved_topics)}, current {version}); retrain it"
+                )
+            features = TfidfFeatures([str(t) for t in data["vocabulary"]], data["idf"])
+            return cls(
+                features,
+                data["weights"],
+                data["bias"],
+                topics=saved_topics,
+                threshold=float(data["threshold"]),
+                metadata=json.loads(str(data["metadata"])),
+            )
+
+
+def _label_set(topics: list[str], known: list[str]) -> list[str]:
+    """Reference labels restricted to *known* topics, with 'No Match' for none."""
+    labels = [t for t in topics if t in known]
+    return labels or [NO_MATCH]
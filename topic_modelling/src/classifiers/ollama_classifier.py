@@ -1,25 +1,115 @@
 import json
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 
 from ollama import Client
 
-from src.classifiers.base import BaseClassifier
-from src.prompts import messages_for
-from config.settings import OLLAMA_HOST, MAX_CONCURRENT_REQUESTS
+from src.classifiers.base import BaseClassifier, fill_missing, iter_chunks
+from src.classifiers.packing import PackingStats, parse_packed
+from src.prompts import (
+    OUTPUT_MODES,
+    decode_topics,
+    messages_for,
+    packed_messages_for,
+    response_schema,
+    validate_topics,
+)
+from src.utils.cache import ClassificationCache
+from src.utils.host_pool import HostPool
+from src.utils.journal import is_error_result
+from src.utils.metrics import RequestTelemetry, UsageCounters
+from src.utils.rate_limit import RequestScheduler, RetryExhaustedError
+from config.settings import (
+    MAX_RETRIES,
+    OLLAMA_HOSTS,
+    OLLAMA_PROBE_INTERVAL,
+    OLLAMA_MAX_HOST_FAILURES,
+    OLLAMA_HEDGE_PERCENTILE,
+    OLLAMA_RPM,
+    OLLAMA_TPM,
+    MAX_CONCURRENT_REQUESTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    TELEMETRY_DIR,
+)
+
+_THINK_BLOCK = re.compile(r"<think>(.*?)</think>", re.DOTALL)
+
+
+def strip_thinking(raw: str) -> tuple[str, str]:
+    """
+    Split inline reasoning from the answer.
+
+    Removes every <think>...</think> block, plus anything before a stray
+    closing </think> (some models omit the opening tag).
+
+    Returns:
+        (answer, thinking) text.
+    """
+    thinking = "".join(_THINK_BLOCK.findall(raw))
+    answer = _THINK_BLOCK.sub("", raw)
+    if "</think>" in answer:
+        head, _, answer = answer.rpartition("</think>")
+        thinking += head
+    return answer.strip(), thinking
+
+
+def _tokens_used(response) -> int:
+    return (response.get("prompt_eval_count") or 0) + (response.get("eval_count") or 0)
 
 
 class OllamaClassifier(BaseClassifier):
     """
     Classifies student verbatims using a locally running Ollama model.
 
-    Two JSON extraction strategies are supported:
+    Three JSON extraction strategies are supported:
     - "json_mode": passes format="json" to Ollama (works with models that
       support native JSON mode, e.g. deepseek-r1:8b).
     - "regex": extracts the first JSON object from the raw text response
       (fallback for models that ignore the format flag, e.g. gpt-oss:20b).
+    - "schema": passes a JSON schema, with the topic enum built from TOPICS,
+      to Ollama's structured-output format parameter so decoding can only
+      produce a valid response.
+
+    Requests, parse failures and tokens are counted per strategy in
+    self.usage.
+
+    For reasoning models, think=False disables thinking and "low"/"medium"/
+    "high" caps it (passed to Ollama's think option; None leaves the model
+    default). Inline <think> blocks are stripped before parsing, and the
+    thinking vs answer tokens of every request are totalled in
+    self.reasoning_totals, with the most recent reasoning_log_size requests
+    kept individually in self.reasoning_usage.
+
+    If a ClassificationCache is supplied, verbatims seen before are answered
+    from disk without calling the model.
+
+    With pack_size > 1, verbatims are sent pack_size at a time in one request
+    so the system prompt and few-shot examples are paid for once per pack.
+    Any verbatim missing from, or malformed in, the packed response is retried
+    with a single-item request.
+
+    output_mode="compact" asks the model for topic numbers only instead of
+    echoing the verbatim back; the full record is rebuilt locally.
+
+    Every request goes through a RequestScheduler (built from OLLAMA_RPM,
+    OLLAMA_TPM and MAX_RETRIES unless one is passed in), so transient
+    failures are retried with backoff and only terminal errors or an
+    exhausted retry budget produce an "Error: ..." result.
+
+    Every request's queue wait, latency, tokens, output tokens/s, parse
+    time and retries are collected in self.telemetry (a RequestTelemetry),
+    which also exports them as JSONL and Prometheus text under
+    telemetry_dir when one is set.
     """
 
+    JSON_STRATEGIES = ("json_mode", "regex", "schema")
+    reasoning_log_size = 1000
+
     def __init__(
         self,
         model: str,
@@ -28,13 +118,55 @@ class OllamaClassifier(BaseClassifier):
         temperature: float = 0.0,
         top_p: float = 0.9,
         num_predict: int = 200,
+        cache: ClassificationCache | None = None,
+        pack_size: int = 1,
+        output_mode: str = "full",
+        think: bool | str | None = None,
+        hosts: list[str] | None = None,
+        hedge_percentile: float | None = OLLAMA_HEDGE_PERCENTILE,
+        scheduler: RequestScheduler | None = None,
+        telemetry_dir: str | None = TELEMETRY_DIR,
     ):
-        if json_strategy not in ("json_mode", "regex"):
-            raise ValueError("json_strategy must be 'json_mode' or 'regex'")
-        self.client = Client(host=OLLAMA_HOST)
+        if json_strategy not in self.JSON_STRATEGIES:
+            raise ValueError(f"json_strategy must be one of {self.JSON_STRATEGIES}")
+        if pack_size < 1:
+            raise ValueError("pack_size must be at least 1")
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"output_mode must be one of {OUTPUT_MODES}")
+        if think not in (None, True, False, "low", "medium", "high"):
+            raise ValueError("think must be None, a bool, or 'low', 'medium' or 'high'")
+        self.hosts = hosts or OLLAMA_HOSTS
+        if len(self.hosts) > 1:
+            self.client = HostPool(
+                self.hosts,
+                probe_interval=OLLAMA_PROBE_INTERVAL,
+                max_failures=OLLAMA_MAX_HOST_FAILURES,
+                hedge_percentile=hedge_percentile,
+            )
+        else:
+            self.client = Client(host=self.hosts[0])
+        self.scheduler = scheduler or RequestScheduler(
+            requests_per_minute=OLLAMA_RPM,
+            tokens_per_minute=OLLAMA_TPM,
+            max_retries=MAX_RETRIES,
+            base_delay=RETRY_BASE_DELAY,
+            max_delay=RETRY_MAX_DELAY,
+        )
+        self.telemetry = RequestTelemetry("ollama", model, telemetry_dir)
         self.model = model
         self.json_strategy = json_strategy
         self.max_workers = max_workers
+        self.cache = cache
+        # Name that cache entries are stored under; subclasses whose prompts differ extend it.
+        self.cache_scope = model
+        self.pack_size = pack_size
+        self.output_mode = output_mode
+        self.packing_stats = PackingStats(output_mode)
+        self.usage = UsageCounters()
+        self.think = think
+        self.reasoning_usage: OrderedDict[str, dict] = OrderedDict()
+        self.reasoning_totals = {"thinking_tokens": 0, "answer_tokens": 0}
+        self._reasoning_lock = threading.Lock()
         self.ollama_options = {
             "temperature": temperature,
             "top_p": top_p,
@@ -45,69 +177,381 @@ class OllamaClassifier(BaseClassifier):
     # Public interface
     # ------------------------------------------------------------------
 
-    def classify_batch(self, verbatims: list[str]) -> list[dict]:
-        items = [
-            {"custom_id": f"verbatim_{i + 1}", "verbatim_text": v}
-            for i, v in enumerate(verbatims)
-        ]
+    def classify_items(self, items: list[dict]) -> list[dict]:
+        return fill_missing(items, self._stream(items, total=len(items)))
 
-        print(f"Starting batch processing with {self.max_workers} concurrent workers "
-              f"[model={self.model}, strategy={self.json_strategy}]...")
+    def classify_iter(
+        self,
+        items: Iterable[dict],
+        ordered: bool = False,
+        max_in_flight: int | None = None,
+        pending: Callable[[Iterable[dict]], Iterable[dict]] | None = None,
+    ) -> Iterator[dict]:
+        """
+        Yield one result per item, either as each request completes or, with
+        ordered=True, in input order. Items are read only as slots free up;
+        at most max_in_flight items (default: 2 x max_workers packs) are
+        submitted or waiting to be yielded at once. In ordered mode a slow
+        request holds back the results behind it but never grows the buffer.
+        Items are not chunked, so *pending* simply filters the stream.
+        """
+        if pending is not None:
+            items = pending(items)
+        return self._stream(items, ordered=ordered, max_in_flight=max_in_flight)
 
-        results = []
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {executor.submit(self._classify_one, item): item for item in items}
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    results.append(result)
-                print(f"  Processed {len(results)}/{len(items)}...", end="\r")
-
-        print(f"\nBatch processing complete. {len(results)} results returned.")
-        return results
+    def close(self) -> None:
+        """Stop the host pool's probe thread and hedge executor, and close the telemetry file."""
+        if isinstance(self.client, HostPool):
+            self.client.close()
+        self.telemetry.close()
 
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
 
+    def _stream(
+        self,
+        items: Iterable[dict],
+        total: int | None = None,
+        ordered: bool = False,
+        max_in_flight: int | None = None,
+    ) -> Iterator[dict]:
+        print(f"Starting batch processing with {self.max_workers} concurrent workers "
+              f"[model={self.model}, strategy={self.json_strategy}, "
+              f"pack_size={self.pack_size}, output={self.output_mode}]...")
+        started = self._start_run()
+        of_total = f"/{total}" if total is not None else ""
+        max_packs = max(1, max_in_flight // self.pack_size) if max_in_flight else 2 * self.max_workers
+
+        count = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Insertion-ordered, so the oldest pack is always first.
+            in_flight: dict[Future, list[dict]] = {}
+            for pack in iter_chunks(items, self.pack_size):
+                in_flight[executor.submit(self._classify_pack, pack, time.perf_counter())] = pack
+                if len(in_flight) >= max_packs:
+                    for result in self._next_done(in_flight, ordered):
+                        count += 1
+                        yield result
+                    print(f"  Processed {count}{of_total}...", end="\r")
+
+            while in_flight:
+                for result in self._next_done(in_flight, ordered):
+                    count += 1
+                    yield result
+                print(f"  Processed {count}{of_total}...", end="\r")
+
+        self._finish_run(count, started)
+
+    def _next_done(self, in_flight: dict[Future, list[dict]], ordered: bool) -> list[dict]:
+        """
+        Remove finished packs from *in_flight* and return one result per item:
+        the oldest pack when ordered (waiting for it), otherwise every pack
+        that has completed (waiting for at least one).
+        """
+        if ordered:
+            done = [next(iter(in_flight))]
+        else:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+        results = []
+        for future in done:
+            pack = in_flight.pop(future)
+            try:
+                pack_results = future.result()
+            except Exception as e:
+                pack_results = [self._single_error(item, e) for item in pack]
+            results += fill_missing(pack, pack_results)
+        return results
+
+    def _start_run(self) -> float:
+        """Reset per-run statistics; returns the run's start time."""
+        self.packing_stats = PackingStats(self.output_mode)
+        self.usage = UsageCounters()
+        self.reasoning_usage = OrderedDict()
+        self.reasoning_totals = {"thinking_tokens": 0, "answer_tokens": 0}
+        self.scheduler.reset_stats()
+        return time.perf_counter()
+
+    def _finish_run(self, count: int, started: float) -> None:
+        print(f"\nBatch processing complete. {count} results returned.")
+        self.usage.print_report(f"Usage by JSON strategy [model={self.model}]")
+        self._print_reasoning_report()
+        self.scheduler.print_report()
+        self.telemetry.print_report()
+        if isinstance(self.client, HostPool):
+            self.client.print_report()
+        if self.pack_size > 1:
+            self.packing_stats.print_report(time.perf_counter() - started)
+
     def _classify_one(self, item: dict) -> dict | None:
         verbatim = item["verbatim_text"]
         custom_id = item["custom_id"]
 
+        if self.cache is not None:
+            topics = self.cache.get(self.cache_scope, verbatim)
+            if topics is not None:
+                return {"custom_id": custom_id, "verbatim_text": verbatim, "topics": topics}
+        return self._request_one(item)
+
+    def _request_one(self, item: dict, queued_at: float | None = None) -> dict:
+        sample = self.telemetry.start("single", [item], queued_at)
         try:
-            kwargs = dict(
-                model=self.model,
-                messages=messages_for(verbatim),
-                options=self.ollama_options,
+            response = self._chat(self._single_request(item), sample)
+            started = time.perf_counter()
+            result = self._handle_single(item, response)
+            sample["parse_seconds"] += time.perf_counter() - started
+        except Exception as e:
+            result = self._single_error(item, e)
+        self.telemetry.record(sample, ok=not is_error_result(result))
+        return result
+
+    def _classify_pack(self, items: list[dict], queued_at: float | None = None) -> list[dict]:
+        """Classify up to pack_size verbatims in one request, falling back to single calls."""
+        results, pending = self._split_cached(items)
+        if len(pending) <= 1:
+            return results + [self._request_one(item, queued_at) for item in pending]
+
+        sample = self.telemetry.start("pack", pending, queued_at)
+        try:
+            response = self._chat(self._pack_request(pending), sample)
+            started = time.perf_counter()
+            parsed = self._handle_pack(pending, response)
+            sample["parse_seconds"] += time.perf_counter() - started
+        except Exception as e:
+            parsed = self._pack_error(pending, e)
+        self.telemetry.record(sample, ok=len(parsed) == len(pending))
+
+        fallback = self._merge_pack(pending, parsed, results)
+        results.extend(self._request_one(item) for item in fallback)
+        return results
+
+    def _chat(self, kwargs: dict, sample: dict | None = None):
+        """Send one chat request through the scheduler, adding its latency and tokens to *sample*."""
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self.scheduler.call(
+                lambda: self.client.chat(**kwargs), self._estimate_tokens(kwargs), _tokens_used, record=sample
             )
-            if self.json_strategy == "json_mode":
-                kwargs["format"] = "json"
+            return response
+        finally:
+            if sample is not None:
+                self._observe(sample, response, time.perf_counter() - started)
+
+    # -- request building and response handling, shared with the async variant --
 
-            response = self.client.chat(**kwargs)
-            raw = response["message"]["content"]
+    def _observe(self, sample: dict, response, seconds: float) -> None:
+        response = response or {}
+        self.telemetry.observe(
+            sample,
+            seconds,
+            prompt_tokens=response.get("prompt_eval_count") or 0,
+            completion_tokens=response.get("eval_count") or 0,
+            generation_seconds=(response.get("eval_duration") or 0) / 1e9,
+        )
 
-            classification = self._parse_response(raw, custom_id, verbatim)
-            return classification
+    def _estimate_tokens(self, kwargs: dict) -> int:
+        """Rough prompt + completion tokens for the TPM bucket (~4 characters per token)."""
+        prompt_chars = sum(len(m["content"]) for m in kwargs["messages"])
+        return prompt_chars // 4 + kwargs["options"]["num_predict"]
 
-        except json.JSONDecodeError as e:
-            print(f"\nJSON decode error for {custom_id}: {e}")
+    def _split_cached(self, items: list[dict]) -> tuple[list[dict], list[dict]]:
+        """Return (results served from cache, items still needing a request)."""
+        results, pending = [], []
+        for item in items:
+            topics = self.cache.get(self.cache_scope, item["verbatim_text"]) if self.cache is not None else None
+            if topics is None:
+                pending.append(item)
+            else:
+                results.append({**item, "topics": topics})
+        return results, pending
+
+    def _single_request(self, item: dict) -> dict:
+        kwargs = dict(
+            model=self.model,
+            messages=messages_for(item["verbatim_text"], self.output_mode),
+            options=self.ollama_options,
+        )
+        response_format = self._response_format()
+        if response_format is not None:
+            kwargs["format"] = response_format
+        return self._with_think(kwargs)
+
+    def _pack_request(self, pending: list[dict]) -> dict:
+        options = dict(self.ollama_options)
+        options["num_predict"] = self.ollama_options["num_predict"] * len(pending)
+        kwargs = dict(
+            model=self.model,
+            messages=packed_messages_for(pending, self.output_mode),
+            options=options,
+        )
+        response_format = self._response_format(pending)
+        if response_format is not None:
+            kwargs["format"] = response_format
+        return self._with_think(kwargs)
+
+    def _handle_single(self, item: dict, response) -> dict:
+        verbatim = item["verbatim_text"]
+        custom_id = item["custom_id"]
+
+        self._record_usage(response)
+        raw = self._answer_text(response, custom_id)
+
+        classification = self._parse_response(raw, custom_id, verbatim)
+        if self.cache is not None:
+            self.cache.put(self.cache_scope, verbatim, classification["topics"])
+        return classification
+
+    def _single_error(self, item: dict, error: Exception) -> dict:
+        verbatim = item["verbatim_text"]
+        custom_id = item["custom_id"]
+
+        if isinstance(error, json.JSONDecodeError):
+            self.usage.record_parse_failure(self.json_strategy)
+            print(f"\nJSON decode error for {custom_id}: {error}")
             return {"custom_id": custom_id, "verbatim_text": verbatim, "topics": ["Error: JSON Decode Error"]}
-        except Exception as e:
-            print(f"\nError processing {custom_id}: {e}")
-            return {"custom_id": custom_id, "verbatim_text": verbatim, "topics": ["Error: API Call Failed"]}
+        if isinstance(error, RetryExhaustedError):
+            print(f"\nRetries exhausted for {custom_id}: {error}")
+            return {"custom_id": custom_id, "verbatim_text": verbatim, "topics": ["Error: Retries Exhausted"]}
+        print(f"\nError processing {custom_id}: {error}")
+        return {"custom_id": custom_id, "verbatim_text": verbatim, "topics": ["Error: API Call Failed"]}
 
-    def _parse_response(self, raw: str, custom_id: str, verbatim: str) -> dict:
-        if self.json_strategy == "json_mode":
-            data = json.loads(raw)
+    def _handle_pack(self, pending: list[dict], response) -> dict[str, list[str]]:
+        self._record_usage(response)
+        self.packing_stats.record_request(
+            pending,
+            prompt_tokens=response.get("prompt_eval_count") or 0,
+            completion_tokens=response.get("eval_count") or 0,
+            prefill_seconds=(response.get("prompt_eval_duration") or 0) / 1e9,
+        )
+        data = self._decode_json(
+            self._answer_text(response, f"{pending[0]['custom_id']}..{pending[-1]['custom_id']}")
+        )
+        parsed = parse_packed(data, pending, self.output_mode) if data is not None else {}
+        if len(parsed) < len(pending):
+            self.usage.record_parse_failure(self.json_strategy)
+        return parsed
+
+    def _pack_error(self, pending: list[dict], error: Exception) -> dict:
+        if isinstance(error, json.JSONDecodeError):
+            self.usage.record_parse_failure(self.json_strategy)
+            print(f"\nJSON decode error for pack starting at {pending[0]['custom_id']}: {error}")
         else:
-            match = re.search(r"\{.*\}", raw, re.DOTALL)
-            if not match:
-                print(f"\nWarning: no JSON found for {custom_id}.")
-                return {"custom_id": custom_id, "verbatim_text": verbatim, "topics": ["No Match"]}
-            data = json.loads(match.group(0))
+            print(f"\nError processing pack starting at {pending[0]['custom_id']}: {error}")
+        return {}
+
+    def _merge_pack(self, pending: list[dict], parsed: dict, results: list[dict]) -> list[dict]:
+        """Append parsed pack entries to *results*; return the items that need a single-item retry."""
+        fallback = []
+        for item in pending:
+            topics = parsed.get(item["custom_id"])
+            if topics is None:
+                self.packing_stats.record_fallback()
+                fallback.append(item)
+                continue
+            if self.cache is not None:
+                self.cache.put(self.cache_scope, item["verbatim_text"], topics)
+            results.append({**item, "topics": topics})
+        return fallback
+
+    def _response_format(self, pack: list[dict] | None = None):
+        """Value for Ollama's format parameter, or None to leave the output unconstrained."""
+        if self.json_strategy == "json_mode":
+            return "json"
+        if self.json_strategy == "schema":
+            if pack is None:
+                return response_schema(self.output_mode)
+            return response_schema(self.output_mode, packed=True, custom_ids=[i["custom_id"] for i in pack])
+        return None
+
+    def _with_think(self, kwargs: dict) -> dict:
+        if self.think is not None:
+            kwargs["think"] = self.think
+        return kwargs
+
+    def _answer_text(self, response, key: str) -> str:
+        """
+        Return the answer with any reasoning removed, recording thinking vs
+        answer tokens for *key*. Ollama reports a single eval_count, so it is
+        split in proportion to the characters of each part.
+        """
+        message = response["message"]
+        answer, inline_thinking = strip_thinking(message.get("content") or "")
+        thinking = (message.get("thinking") or "") + inline_thinking
 
+        eval_count = response.get("eval_count") or 0
+        total_chars = len(thinking) + len(answer)
+        thinking_tokens = round(eval_count * len(thinking) / total_chars) if total_chars else 0
+        with self._reasoning_lock:
+            self.reasoning_usage[key] = {
+                "thinking_tokens": thinking_tokens,
+                "answer_tokens": eval_count - thinking_tokens,
+            }
+            if len(self.reasoning_usage) > self.reasoning_log_size:
+                self.reasoning_usage.popitem(last=False)
+            self.reasoning_totals["thinking_tokens"] += thinking_tokens
+            self.reasoning_totals["answer_tokens"] += eval_count - thinking_tokens
+        return answer
+
+    def _print_reasoning_report(self) -> None:
+        with self._reasoning_lock:
+            usage = dict(self.reasoning_usage)
+            thinking = self.reasoning_totals["thinking_tokens"]
+            answer = self.reasoning_totals["answer_tokens"]
+        if not thinking:
+            return
+        print(f"\n--- Reasoning tokens [think={self.think}] ---")
+        for key, u in usage.items():
+            print(f"  {key}: {u['thinking_tokens']} thinking, {u['answer_tokens']} answer")
+        print(f"  Total: {thinking} thinking ({thinking / (thinking + answer):.0%}), {answer} answer")
+
+    def _record_usage(self, response) -> None:
+        self.usage.record(
+            self.json_strategy,
+            prompt_tokens=response.get("prompt_eval_count") or 0,
+            completion_tokens=response.get("eval_count") or 0,
+        )
+
+    def _decode_json(self, raw: str):
+        """Decode the model output according to the JSON strategy; None if no JSON was found."""
+        if self.json_strategy in ("json_mode", "schema"):
+            return json.loads(raw)
+        match = re.search(r"\{.*\}", raw, re.DOTALL)
+        if not match:
+            return None
+        return json.loads(match.group(0))
+
+    def _parse_response(self, raw: str, custom_id: str, verbatim: str) -> dict:
+        data = self._decode_json(raw)
+        if data is None:
+            self.usage.record_parse_failure(self.json_strategy)
+            print(f"\nWarning: no JSON found for {custom_id}.")
+            # An error, not "No Match": it must not be cached or journalled as a classification.
+            return {"custom_id": custom_id, "verbatim_text": verbatim, "topics": ["Error: No JSON in response"]}
+
+        if not isinstance(data, dict):
+            self.usage.record_parse_failure(self.json_strategy)
+            print(f"\nWarning: expected a JSON object for {custom_id}, got {type(data).__name__}.")
+            return {"custom_id": custom_id, "verbatim_text": verbatim, "topics": ["Error: Invalid JSON shape"]}
+
+        if self.output_mode == "compact":
+            try:
+                topics = decode_topics(data.get("topics", []))
+            except ValueError as e:
+                self.usage.record_parse_failure(self.json_strategy)
+                print(f"\nInvalid topic codes for {custom_id}: {e}")
+                topics = ["Error: Invalid topic codes"]
+            return {"custom_id": custom_id, "verbatim_text": verbatim, "topics": topics}
+
+        try:
+            topics = validate_topics(data.get("topics"))
+        except ValueError as e:
+            self.usage.record_parse_failure(self.json_strategy)
+            print(f"\nInvalid topics for {custom_id}: {e}")
+            topics = ["Error: Invalid topics"]
         return {
-            "custom_id": data.get("custom_id", custom_id),
+            "custom_id": custom_id,
             "verbatim_text": data.get("verbatim_text", verbatim),
-            "topics": data.get("topics", ["Error: No topics"]),
+            "topics": topics,
         }
@@ -1,131 +1,607 @@
 import json
-import time
 import os
+import random
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 
 from openai import OpenAI
 
-from src.classifiers.base import BaseClassifier
-from src.prompts import SYSTEM_PROMPT, user_prompt_for
-from config.settings import OPENAI_MODEL, INPUT_DIR, OUTPUT_DIR
+from src.classifiers.base import BaseClassifier, fill_missing, iter_chunks
+from src.classifiers.packing import PackingStats, parse_packed
+from src.prompts import OUTPUT_MODES, decode_topics, messages_for, packed_messages_for, validate_topics
+from src.utils.cache import ClassificationCache
+from src.utils.io import SINK_FORMATS, JsonlSink, iter_results, open_sink
+from src.utils.journal import RunJournal
+from src.utils.metrics import RequestTelemetry
+from src.utils.rate_limit import RETRYABLE_STATUSES, RequestScheduler
+from config.settings import (
+    INPUT_DIR,
+    MAX_RETRIES,
+    OPENAI_BATCH_MAX_BYTES,
+    OPENAI_BATCH_MAX_REQUESTS,
+    OPENAI_BATCH_PARALLELISM,
+    OPENAI_MAX_POLL_INTERVAL,
+    OPENAI_MODEL,
+    OPENAI_POLL_INTERVAL,
+    OPENAI_RPM,
+    OPENAI_TPM,
+    OUTPUT_DIR,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    TELEMETRY_DIR,
+)
+
+_TERMINAL_STATUSES = ("completed", "failed", "cancelled", "expired")
+
+
+def _job_timing(job) -> dict:
+    """Queue wait (created to in progress) and latency (in progress to done) of a batch job, in seconds."""
+    created = getattr(job, "created_at", None)
+    in_progress = getattr(job, "in_progress_at", None) or created
+    done = next((t for t in (getattr(job, name, None) for name in
+                             ("completed_at", "failed_at", "expired_at", "cancelled_at")) if t), None)
+    return {
+        "queue_wait_seconds": float(in_progress - created) if created and in_progress else 0.0,
+        "latency_seconds": float(done - in_progress) if done and in_progress else 0.0,
+    }
+
+
+def _request_failure(line: str) -> dict:
+    """Flatten one line of a batch error file into a failure-report record."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return {"custom_id": None, "stage": "request", "message": line}
+    response = record.get("response") or {}
+    error = record.get("error") or ((response.get("body") or {}).get("error")) or {}
+    return {
+        "custom_id": record.get("custom_id"),
+        "stage": "request",
+        "status_code": response.get("status_code"),
+        "code": error.get("code"),
+        "message": error.get("message"),
+    }
+
+
+class _FailureReport:
+    """
+    JSONL report of failed requests and unparseable output, created on the
+    first failure. Requests that failed with a retryable status are also
+    collected in self.retryable.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.retryable: set[str] = set()
+        self._sink = None
+
+    def write(self, record: dict) -> None:
+        if self._sink is None:
+            self._sink = JsonlSink(self.path, append=False)
+        self._sink.write(record)
+        self.count += 1
+        if record.get("stage") == "request" and record.get("status_code") in RETRYABLE_STATUSES:
+            self.retryable.add(record["custom_id"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._sink is not None:
+            self._sink.close()
+            print(f"{self.count} failure(s) written to: {self.path}")
+
+
+class _Shard:
+    """One batch input file and the job created from it."""
+
+    def __init__(self, number: int, path: str):
+        self.number = number
+        self.path = path
+        self.items: list[dict] = []
+        self.packs: dict[str, list[dict]] = {}
+        self.requests = 0
+        self.size = 0
+        self.job_key = ""
+        self.batch_job_id = ""
+        self.job = None
+        self.status = None
+        self.retries = 0
+        self.retryable: set[str] = set()
+        self.output_path: str | None = None
+        self._file = open(path, "wb")
+
+    def add(self, request_id: str, chunk: list[dict], line: bytes, packed: bool) -> None:
+        self._file.write(line)
+        self.items += chunk
+        if packed:
+            self.packs[request_id] = chunk
+        self.requests += 1
+        self.size += len(line)
+
+    def close(self) -> None:
+        self._file.close()
 
 
 class OpenAIBatchClassifier(BaseClassifier):
     """
     Classifies student verbatims using the OpenAI Batch API.
-    Submits a JSONL batch job, polls until complete, then downloads results.
+    Writes the requests as JSONL, split into shards that stay under the
+    per-file request and byte limits, uploads the shards and creates their
+    batch jobs in parallel, polls all jobs together, then downloads the
+    results. classify_items merges them in input order.
+
+    Output and error files are streamed line by line: results are written to
+    a per-shard JSONL (or Parquet, via results_format) file as they are
+    parsed, and failed requests or unparseable lines to a JSONL failure
+    report next to it. classify_iter reads each shard's results file back
+    and yields from it, so results are not held in memory.
+
+    If a ClassificationCache is supplied, cached verbatims are left out of the
+    batch job entirely and merged back into the results afterwards.
+
+    With pack_size > 1, each batch request carries pack_size verbatims. Any
+    verbatim missing from, or malformed in, a packed response is resubmitted
+    in a follow-up batch job of single-item requests.
+
+    When streaming with classify_iter, each chunk of stream_chunk_size items
+    is submitted (as one or more shards) before the next chunk is read.
+
+    output_mode="compact" asks the model for topic numbers only instead of
+    echoing the verbatim back; the full record is rebuilt from the custom_id.
+
+    If a RunJournal is supplied, every submitted batch job id is recorded in
+    it; a resumed run that builds the same job reattaches to it instead of
+    uploading and paying for it again. Pass the journal's pending filter to
+    classify_iter (rather than pre-filtering the items) so chunks are cut
+    from the full input and a resumed run rebuilds the same jobs.
+
+    File and batch API calls go through a RequestScheduler, so 429s and 5xx
+    responses are retried with backoff. Requests that fail inside a batch
+    with a retryable status are resubmitted in follow-up jobs, up to the
+    scheduler's max_retries times per item.
+
+    Every batch request (output or error file line) is recorded in
+    self.telemetry with its job's queue wait and processing time, its
+    tokens, parse time and resubmission count, and exported as JSONL and
+    Prometheus text under telemetry_dir when one is set.
     """
 
-    def __init__(self, model: str = OPENAI_MODEL, poll_interval: int = 30):
-        self.client = OpenAI()
+    stream_chunk_size = 200_000
+
+    def __init__(
+        self,
+        model: str = OPENAI_MODEL,
+        poll_interval: float = OPENAI_POLL_INTERVAL,
+        cache: ClassificationCache | None = None,
+        pack_size: int = 1,
+        output_mode: str = "full",
+        journal: RunJournal | None = None,
+        max_poll_interval: float = OPENAI_MAX_POLL_INTERVAL,
+        max_requests_per_file: int = OPENAI_BATCH_MAX_REQUESTS,
+        max_bytes_per_file: int = OPENAI_BATCH_MAX_BYTES,
+        max_parallel_submissions: int = OPENAI_BATCH_PARALLELISM,
+        results_format: str = "jsonl",
+        client=None,
+        scheduler: RequestScheduler | None = None,
+        telemetry_dir: str | None = TELEMETRY_DIR,
+    ):
+        if pack_size < 1:
+            raise ValueError("pack_size must be at least 1")
+        if f".{results_format}" not in SINK_FORMATS:
+            raise ValueError(f"results_format must be one of {[f[1:] for f in SINK_FORMATS]}")
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"output_mode must be one of {OUTPUT_MODES}")
+        # Any object exposing the files/batches API of openai.OpenAI works here,
+        # e.g. a client pointed at a local fake via base_url. Retries are left to
+        # the scheduler rather than the SDK.
+        self.client = client or OpenAI(max_retries=0)
+        self.scheduler = scheduler or RequestScheduler(
+            requests_per_minute=OPENAI_RPM,
+            tokens_per_minute=OPENAI_TPM,
+            max_retries=MAX_RETRIES,
+            base_delay=RETRY_BASE_DELAY,
+            max_delay=RETRY_MAX_DELAY,
+        )
+        self.telemetry = RequestTelemetry("openai", model, telemetry_dir)
         self.model = model
         self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.max_requests_per_file = max_requests_per_file
+        self.max_bytes_per_file = max_bytes_per_file
+        self.max_parallel_submissions = max_parallel_submissions
+        self.results_format = results_format
+        self.cache = cache
+        self.pack_size = pack_size
+        self.output_mode = output_mode
+        self.journal = journal
+        self.packing_stats = PackingStats(output_mode)
 
     # ------------------------------------------------------------------
     # Public interface
     # ------------------------------------------------------------------
 
-    def classify_batch(self, verbatims: list[str]) -> list[dict]:
-        from datetime import datetime
-
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        input_filename = f"batch_in_{timestamp}.jsonl"
-        output_filename = f"batch_out_{timestamp}.json"
+    def classify_items(self, items: list[dict]) -> list[dict]:
+        order = {item["custom_id"]: i for i, item in enumerate(items)}
+        return sorted(self._classify_stream(items), key=lambda r: order.get(r["custom_id"], len(order)))
 
-        input_path = self._create_batch_input(verbatims, input_filename)
-        input_file_id = self._upload_file(input_path)
-        batch_job_id = self._create_batch_job(input_file_id)
-        retrieved_job, status = self._poll_until_done(batch_job_id)
-        results = self._download_results(retrieved_job, status, output_filename)
-        return results
+    def classify_iter(
+        self,
+        items: Iterable[dict],
+        ordered: bool = False,
+        max_in_flight: int | None = None,
+        pending: Callable[[Iterable[dict]], Iterable[dict]] | None = None,
+    ) -> Iterator[dict]:
+        """
+        As BaseClassifier.classify_iter, but unordered results are yielded
+        shard by shard as each job's results file is read back, so a chunk's
+        results are never held in memory together. With ordered=True each
+        chunk is sorted as in the base class.
+        """
+        if ordered:
+            yield from super().classify_iter(items, ordered, max_in_flight, pending)
+            return
+        for chunk in iter_chunks(items, max_in_flight or self.stream_chunk_size):
+            if pending is not None:
+                chunk = list(pending(chunk))
+            seen = set()
+            for result in self._classify_stream(chunk) if chunk else ():
+                seen.add(result["custom_id"])
+                yield result
+            yield from fill_missing([item for item in chunk if item["custom_id"] not in seen], [])
 
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
 
-    def _create_batch_input(self, verbatims: list[str], filename: str) -> str:
+    def _classify_stream(self, items: list[dict]) -> Iterator[dict]:
+        """Yield cached results, then each shard's results as its batch job is downloaded."""
+        from datetime import datetime
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.packing_stats = PackingStats(self.output_mode)
+        self.scheduler.reset_stats()
+        started = time.perf_counter()
+
+        cached, pending = self._split_cached(items)
+        yield from cached
+        if not pending:
+            print("All verbatims served from cache; no batch job submitted.")
+            return
+
+        done: set[str] = set()
+        shards = self._run_batch_jobs(pending, timestamp, self.pack_size)
+        yield from self._iter_shard_results(shards, done)
+        completed = [item for shard in shards if shard.status == "completed" for item in shard.items]
+        retry = self._retry_items(shards)
+        for attempt in range(1, self.scheduler.max_retries + 1):
+            if not retry:
+                break
+            print(f"{len(retry)} verbatim(s) failed with a retryable error; "
+                  f"resubmitting (retry {attempt}/{self.scheduler.max_retries}).")
+            shards = self._run_batch_jobs(retry, f"{timestamp}_retry{attempt}", pack_size=1, retries=attempt)
+            yield from self._iter_shard_results(shards, done)
+            retry = self._retry_items(shards)
+        if retry:
+            print(f"{len(retry)} verbatim(s) still failing after {self.scheduler.max_retries} retries.")
+        if self.pack_size > 1:
+            given_up = {item["custom_id"] for item in retry}
+            missing = [item for item in completed if item["custom_id"] not in done | given_up]
+            if missing:
+                print(f"{len(missing)} verbatim(s) missing from packed responses; "
+                      f"resubmitting as single-item requests.")
+                self.packing_stats.record_fallback(len(missing))
+                shards = self._run_batch_jobs(missing, f"{timestamp}_fallback", pack_size=1)
+                yield from self._iter_shard_results(shards, done)
+        self.scheduler.print_report()
+        self.telemetry.print_report()
+        if self.pack_size > 1:
+            self.packing_stats.print_report(time.perf_counter() - started)
+
+    def _split_cached(self, items: list[dict]) -> tuple[list[dict], list[dict]]:
+        if self.cache is None:
+            return [], items
+
+        cached, pending = [], []
+        for item in items:
+            topics = self.cache.get(self.model, item["verbatim_text"])
+            if topics is None:
+                pending.append(item)
+            else:
+                cached.append({**item, "topics": topics})
+        print(f"Cache: {len(cached)} hit(s), {len(pending)} verbatim(s) to submit.")
+        return cached, pending
+
+    def _iter_shard_results(self, shards: list[_Shard], done: set[str]) -> Iterator[dict]:
+        """
+        Read each completed shard's results file back one result at a time,
+        caching it and adding its custom_id to *done*.
+        """
+        for shard in shards:
+            if shard.output_path is None:
+                continue
+            verbatims = {item["custom_id"]: item["verbatim_text"] for item in shard.items}
+            for result in iter_results(shard.output_path):
+                done.add(result["custom_id"])
+                if self.cache is not None and result["custom_id"] in verbatims:
+                    self.cache.put(self.model, verbatims[result["custom_id"]], result["topics"])
+                yield result
+
+    @staticmethod
+    def _retry_items(shards: list[_Shard]) -> list[dict]:
+        """Items whose request failed with a retryable status."""
+        retry = []
+        for shard in shards:
+            for request_id in shard.retryable:
+                retry += shard.packs.get(request_id) or [i for i in shard.items if i["custom_id"] == request_id]
+        return retry
+
+    def _run_batch_jobs(
+        self, items: list[dict], tag: str, pack_size: int, retries: int = 0
+    ) -> list[_Shard]:
+        """
+        Shard *items* into batch input files, submit them in parallel, poll
+        them together and download each job's results to its shard's
+        output_path. *retries* is the resubmission round, for telemetry.
+        """
+        shards = self._create_batch_inputs(items, tag, pack_size, retries)
+        with ThreadPoolExecutor(max_workers=self.max_parallel_submissions) as pool:
+            list(pool.map(self._submit_shard, shards))
+        self._poll_until_done(shards)
+
+        for shard in shards:
+            if self.journal:
+                self.journal.record_batch_job(shard.job_key, shard.batch_job_id, shard.status)
+            self._download_results(
+                shard.job, shard.status, f"{tag}_{shard.number}", shard.items, shard.packs, shard
+            )
+        return shards
+
+    def _create_batch_inputs(
+        self, items: list[dict], tag: str, pack_size: int = 1, retries: int = 0
+    ) -> list[_Shard]:
+        """
+        Write the batch JSONL, starting a new shard file whenever the next
+        request would exceed max_requests_per_file or max_bytes_per_file.
+
+        Each shard's journal key covers its request ids, the request options,
+        the resubmission round and when its items last got a journalled
+        result, so a resumed run reattaches only to jobs whose results were
+        never recorded.
+        """
         os.makedirs(INPUT_DIR, exist_ok=True)
-        path = os.path.join(INPUT_DIR, filename)
-
-        with open(path, "w") as f:
-            for i, verbatim in enumerate(verbatims):
-                request_body = {
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": SYSTEM_PROMPT},
-                        {"role": "user", "content": user_prompt_for(verbatim)},
-                    ],
-                    "response_format": {"type": "json_object"},
-                }
-                batch_request = {
-                    "custom_id": f"verbatim_{i + 1}",
-                    "method": "POST",
-                    "url": "/v1/chat/completions",
-                    "body": request_body,
-                }
-                f.write(json.dumps(batch_request) + "\n")
-
-        print(f"Batch input file created: {path}")
-        return path
+        shards: list[_Shard] = []
+        shard = None
+
+        for n, chunk in enumerate(iter_chunks(items, pack_size), 1):
+            if pack_size > 1:
+                request_id = f"pack_{n}"
+                messages = packed_messages_for(chunk, self.output_mode)
+            else:
+                request_id = chunk[0]["custom_id"]
+                messages = messages_for(chunk[0]["verbatim_text"], self.output_mode)
+
+            request_body = {
+                "model": self.model,
+                "messages": messages,
+                "response_format": {"type": "json_object"},
+            }
+            batch_request = {
+                "custom_id": request_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": request_body,
+            }
+            line = (json.dumps(batch_request) + "\n").encode("utf-8")
+
+            if shard is None or (
+                shard.requests
+                and (shard.requests >= self.max_requests_per_file or shard.size + len(line) > self.max_bytes_per_file)
+            ):
+                if shard is not None:
+                    shard.close()
+                shard = _Shard(len(shards) + 1, os.path.join(INPUT_DIR, f"batch_in_{tag}_{len(shards) + 1}.jsonl"))
+                shards.append(shard)
+            shard.add(request_id, chunk, line, packed=pack_size > 1)
+
+        shard.close()
+        for shard in shards:
+            ids = [item["custom_id"] for item in shard.items]
+            last_recorded = self.journal.last_recorded(ids) if self.journal else 0.0
+            shard.job_key = RunJournal.job_key(
+                ids, self.model, pack_size, self.output_mode, retries, last_recorded
+            )
+            shard.retries = retries
+            print(f"Batch input file created: {shard.path} "
+                  f"({shard.requests} request(s), {shard.size / 1e6:.1f} MB)")
+        return shards
+
+    def _submit_shard(self, shard: _Shard) -> None:
+        batch_job_id = self.journal.batch_job(shard.job_key) if self.journal else None
+        if batch_job_id:
+            print(f"Reattaching to batch job {batch_job_id} from run {self.journal.run_id}.")
+        else:
+            input_file_id = self._upload_file(shard.path)
+            batch_job_id = self._create_batch_job(input_file_id)
+            if self.journal:
+                self.journal.record_batch_job(shard.job_key, batch_job_id)
+        shard.batch_job_id = batch_job_id
 
     def _upload_file(self, path: str) -> str:
-        batch_input_file = self.client.files.create(
-            file=open(path, "rb"), purpose="batch"
-        )
+        def upload():
+            with open(path, "rb") as f:
+                return self.client.files.create(file=f, purpose="batch")
+
+        batch_input_file = self.scheduler.call(upload)
         print(f"File uploaded with ID: {batch_input_file.id}")
         return batch_input_file.id
 
     def _create_batch_job(self, input_file_id: str) -> str:
-        batch_job = self.client.batches.create(
+        batch_job = self.scheduler.call(lambda: self.client.batches.create(
             input_file_id=input_file_id,
             endpoint="/v1/chat/completions",
             completion_window="24h",
-        )
+        ))
         print(f"Batch job created with ID: {batch_job.id}")
         return batch_job.id
 
-    def _poll_until_done(self, batch_job_id: str):
-        print(f"Polling batch job {batch_job_id}...")
+    def _poll_until_done(self, shards: list[_Shard]) -> None:
+        """
+        Poll every shard's job until all reach a terminal status. The wait
+        doubles (up to max_poll_interval) while no job changes state, resets
+        to poll_interval when one does, and is jittered so parallel runs do
+        not poll in lockstep.
+        """
+        print(f"Polling {len(shards)} batch job(s)...")
+        pending = list(shards)
+        delay = self.poll_interval
         attempt = 1
         while True:
-            job = self.client.batches.retrieve(batch_job_id)
-            status = job.status
-            print(f"  Attempt {attempt}: {status}")
-            if status in ("completed", "failed", "cancelled", "expired"):
-                return job, status
-            time.sleep(self.poll_interval)
+            changed = False
+            for shard in pending:
+                job = self.scheduler.call(lambda: self.client.batches.retrieve(shard.batch_job_id))
+                changed |= job.status != shard.status
+                shard.job, shard.status = job, job.status
+            pending = [shard for shard in pending if shard.status not in _TERMINAL_STATUSES]
+
+            statuses = Counter(shard.status for shard in shards)
+            print(f"  Attempt {attempt}: " + ", ".join(f"{n} {status}" for status, n in sorted(statuses.items())))
+            if not pending:
+                return
+
+            delay = self.poll_interval if changed else min(delay * 2, self.max_poll_interval)
+            time.sleep(random.uniform(delay / 2, delay))
             attempt += 1
 
-    def _download_results(self, retrieved_job, status: str, output_filename: str) -> list[dict]:
-        if status != "completed":
-            print(f"Batch job ended with status: {status}")
-            if retrieved_job.error_file_id:
-                errors = self.client.files.content(retrieved_job.error_file_id).text
-                print("--- Error Log ---\n", errors)
-            return []
+    def _iter_file_lines(self, file_id: str) -> Iterator[str]:
+        """Stream a Files API object line by line without holding it in memory."""
+        with self.client.files.with_streaming_response.content(file_id) as response:
+            for line in response.iter_lines():
+                if line.strip():
+                    yield line
 
-        output_content = self.client.files.content(retrieved_job.output_file_id).text
-        parsed_results = []
+    def _parse_output(
+        self,
+        lines: Iterable[str],
+        items: list[dict],
+        packs: dict[str, list[dict]],
+        failures: _FailureReport,
+        shard: _Shard | None = None,
+    ) -> Iterator[dict]:
+        """
+        Turn batch output lines into results; lines that cannot be parsed go
+        to *failures*. Each line is recorded in self.telemetry.
+        """
+        verbatims = {item["custom_id"]: item["verbatim_text"] for item in items}
 
-        for line in output_content.strip().split("\n"):
+        for line in lines:
+            started = time.perf_counter()
+            custom_id = None
+            usage = {}
+            parsed = []
             try:
                 batch_result = json.loads(line)
                 custom_id = batch_result.get("custom_id")
-                response_content = batch_result["response"]["body"]["choices"][0]["message"]["content"]
+                body = batch_result["response"]["body"]
+                usage = body.get("usage") or {}
+                response_content = body["choices"][0]["message"]["content"]
                 classification_data = json.loads(response_content)
-                parsed_results.append(
-                    {
+
+                if packs and custom_id in packs:
+                    pack = packs[custom_id]
+                    self.packing_stats.record_request(
+                        pack,
+                        prompt_tokens=usage.get("prompt_tokens", 0),
+                        completion_tokens=usage.get("completion_tokens", 0),
+                    )
+                    topics_by_id = parse_packed(classification_data, pack, self.output_mode)
+                    parsed = [{**item, "topics": topics_by_id[item["custom_id"]]}
+                              for item in pack if item["custom_id"] in topics_by_id]
+                elif self.output_mode == "compact":
+                    parsed = [{
+                        "custom_id": custom_id,
+                        "verbatim_text": verbatims[custom_id],
+                        "topics": decode_topics(classification_data.get("topics", [])),
+                    }]
+                else:
+                    parsed = [{
                         "custom_id": custom_id,
                         "verbatim_text": classification_data["verbatim_text"],
-                        "topics": classification_data["topics"],
-                    }
-                )
-            except (json.JSONDecodeError, KeyError) as e:
-                print(f"Error parsing line: {e}")
-
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-        output_path = os.path.join(OUTPUT_DIR, output_filename)
-        with open(output_path, "w") as f:
-            json.dump(parsed_results, f, indent=4)
-
-        print(f"Results saved to: {output_path}")
-        return parsed_results
+                        "topics": validate_topics(classification_data.get("topics")),
+                    }]
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                failures.write({"custom_id": custom_id, "stage": "parse", "message": f"{type(e).__name__}: {e}"})
+
+            request_items = packs.get(custom_id) or [{"custom_id": custom_id}]
+            self._record_request(
+                shard, request_items, usage, time.perf_counter() - started, ok=len(parsed) == len(request_items)
+            )
+            yield from parsed
+
+    def _record_request(
+        self, shard: _Shard | None, items: list[dict], usage: dict, parse_seconds: float, ok: bool
+    ) -> None:
+        """Record one batch request in self.telemetry, timed by its shard's job."""
+        sample = self.telemetry.start("batch", items)
+        timing = _job_timing(shard.job) if shard is not None else {}
+        sample["queue_wait_seconds"] = timing.get("queue_wait_seconds", 0.0)
+        sample["parse_seconds"] = parse_seconds
+        sample["retries"] = shard.retries if shard is not None else 0
+        self.telemetry.observe(
+            sample,
+            timing.get("latency_seconds", 0.0),
+            prompt_tokens=usage.get("prompt_tokens") or 0,
+            completion_tokens=usage.get("completion_tokens") or 0,
+        )
+        self.telemetry.record(sample, ok=ok)
+
+    def _download_results(
+        self,
+        retrieved_job,
+        status: str,
+        tag: str,
+        items: list[dict],
+        packs: dict[str, list[dict]] | None = None,
+        shard: _Shard | None = None,
+    ) -> int:
+        """
+        Stream the job's output file into a results sink and its error file
+        into a JSONL failure report, both under OUTPUT_DIR, and return the
+        number of results written. Request ids that failed with a retryable
+        status, and the results file's path, are stored on *shard*.
+        """
+        with _FailureReport(os.path.join(OUTPUT_DIR, f"batch_errors_{tag}.jsonl")) as failures:
+            if status != "completed":
+                print(f"Batch job ended with status: {status}")
+                errors = getattr(getattr(retrieved_job, "errors", None), "data", None) or []
+                for error in errors:
+                    failures.write({"custom_id": None, "stage": "job", "status": status,
+                                    "code": error.code, "message": error.message})
+                if not errors:
+                    failures.write({"custom_id": None, "stage": "job", "status": status})
+
+            if retrieved_job.error_file_id:
+                for line in self._iter_file_lines(retrieved_job.error_file_id):
+                    failure = _request_failure(line)
+                    failures.write(failure)
+                    request_items = (packs or {}).get(failure["custom_id"]) or [{"custom_id": failure["custom_id"]}]
+                    self._record_request(shard, request_items, {}, 0.0, ok=False)
+                if shard is not None:
+                    shard.retryable = failures.retryable
+
+            if status != "completed":
+                return 0
+
+            output_path = os.path.join(OUTPUT_DIR, f"batch_out_{tag}.{self.results_format}")
+            with open_sink(output_path, append=False) as sink:
+                lines = self._iter_file_lines(retrieved_job.output_file_id)
+                for result in self._parse_output(lines, items, packs or {}, failures, shard):
+                    sink.write(result)
+
+        if shard is not None:
+            shard.output_path = output_path
+        print(f"{sink.count} result(s) saved to: {output_path}")
+        return sink.count
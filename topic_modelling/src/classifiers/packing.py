@@ -0,0 +1,126 @@
+"""Helpers shared by the classifiers' packed (N verbatims per request) mode."""
+
+import threading
+
+from src.prompts import decode_topics, messages_for, packed_messages_for, validate_topics
+
+
+def parse_packed(data, items: list[dict], output_mode: str = "full") -> dict[str, list[str]]:
+    """
+    Extract per-verbatim topics from a decoded packed response.
+
+    Accepts either {"results": [...]} or a bare list of entries. Entries with
+    an unknown custom_id or a malformed 'topics' value are skipped, so the
+    caller can fall back to single-item requests for whatever is missing.
+    In compact mode, topic codes are mapped back to topic names. An empty
+    topic list means 'No Match'.
+
+    Returns:
+        Mapping of custom_id -> topics for every well-formed entry.
+    """
+    entries = data.get("results", []) if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        return {}
+
+    expected = {item["custom_id"] for item in items}
+    parsed = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        custom_id = entry.get("custom_id")
+        topics = entry.get("topics")
+        if custom_id not in expected or not isinstance(topics, list):
+            continue
+        try:
+            topics = decode_topics(topics) if output_mode == "compact" else validate_topics(topics)
+        except ValueError:
+            continue
+        parsed[custom_id] = topics
+    return parsed
+
+
+def _prompt_chars(messages: list[dict]) -> int:
+    return sum(len(m["content"]) for m in messages)
+
+
+class PackingStats:
+    """
+    Thread-safe accumulator for the token and latency savings of a packed run.
+
+    Unpacked prompt tokens are estimated per request by scaling the measured
+    prompt tokens by the ratio of single-item prompt characters to packed
+    prompt characters. Prefill time saved is estimated the same way from the
+    measured prompt evaluation time, when the backend reports it.
+    """
+
+    def __init__(self, output_mode: str = "full"):
+        self.output_mode = output_mode
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.items = 0
+        self.fallback_items = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.estimated_unpacked_prompt_tokens = 0.0
+        self.prefill_seconds = 0.0
+        self.estimated_unpacked_prefill_seconds = 0.0
+
+    def record_request(
+        self,
+        items: list[dict],
+        prompt_tokens: int,
+        completion_tokens: int,
+        prefill_seconds: float = 0.0,
+    ) -> None:
+        packed_chars = _prompt_chars(packed_messages_for(items, self.output_mode))
+        single_chars = sum(
+            _prompt_chars(messages_for(item["verbatim_text"], self.output_mode)) for item in items
+        )
+        ratio = single_chars / packed_chars if packed_chars else 1.0
+
+        with self._lock:
+            self.requests += 1
+            self.items += len(items)
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.estimated_unpacked_prompt_tokens += prompt_tokens * ratio
+            self.prefill_seconds += prefill_seconds
+            self.estimated_unpacked_prefill_seconds += prefill_seconds * ratio
+
+    def record_fallback(self, count: int = 1) -> None:
+        with self._lock:
+            self.fallback_items += count
+
+    def summary(self, wall_seconds: float) -> dict:
+        with self._lock:
+            saved_tokens = self.estimated_unpacked_prompt_tokens - self.prompt_tokens
+            saved_prefill = self.estimated_unpacked_prefill_seconds - self.prefill_seconds
+            return {
+                "packed_requests": self.requests,
+                "packed_items": self.items,
+                "fallback_items": self.fallback_items,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "estimated_unpacked_prompt_tokens": round(self.estimated_unpacked_prompt_tokens),
+                "estimated_prompt_tokens_saved": round(saved_tokens),
+                "estimated_prompt_token_saving": (
+                    saved_tokens / self.estimated_unpacked_prompt_tokens
+                    if self.estimated_unpacked_prompt_tokens else 0.0
+                ),
+                "estimated_prefill_seconds_saved": round(saved_prefill, 2),
+                "wall_seconds": round(wall_seconds, 2),
+                "seconds_per_item": round(wall_seconds / self.items, 3) if self.items else 0.0,
+            }
+
+    def print_report(self, wall_seconds: float) -> None:
+        s = self.summary(wall_seconds)
+        print("\n--- Packing report ---")
+        print(f"  Requests          : {s['packed_requests']} for {s['packed_items']} verbatims "
+              f"({s['fallback_items']} fell back to single-item calls)")
+        print(f"  Prompt tokens     : {s['prompt_tokens']} "
+              f"(~{s['estimated_unpacked_prompt_tokens']} unpacked, "
+              f"{s['estimated_prompt_token_saving']:.0%} saved)")
+        print(f"  Completion tokens : {s['completion_tokens']}")
+        if s["estimated_prefill_seconds_saved"]:
+            print(f"  Prefill time saved: ~{s['estimated_prefill_seconds_saved']}s")
+        print(f"  Wall time         : {s['wall_seconds']}s ({s['seconds_per_item']}s per verbatim)")
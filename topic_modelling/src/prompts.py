@@ -1,51 +1,335 @@
-from config.settings import TOPICS
+import hashlib
+import json
+
+from config.settings import TAXONOMY, TOPICS
+
+OUTPUT_MODES = ("full", "compact")
+NO_MATCH = "No Match"
 
 _TOPIC_LIST = "\n".join(f"- {t}" for t in TOPICS)
+_NUMBERED_TOPIC_LIST = "\n".join(f"{i}. {t}" for i, t in enumerate(TOPICS, 1))
 
-SYSTEM_PROMPT = f"""You are an expert topic classifier for student feedback from a vocational education and training institution.
+_INSTRUCTIONS = """You are an expert topic classifier for student feedback from a vocational education and training institution.
 Your task is to analyze student verbatims and assign one or more topics from a predefined list.You must adhere to the following rules:
 1.  Match the verbatim to the most relevant topics from the provided topic list.
 2.  If the verbatim is not relevant to any topic on the list, return 'No Match'.
 3.  You can assign more than one topic if the verbatim covers multiple subjects.
-4.  Your output must be a single JSON object.
+"""
+
+_COMPACT_INSTRUCTIONS = """You are an expert topic classifier for student feedback from a vocational education and training institution.
+Your task is to analyze student verbatims and assign one or more topics from a numbered, predefined list.You must adhere to the following rules:
+1.  Match the verbatim to the most relevant topics from the provided topic list.
+2.  If the verbatim is not relevant to any topic on the list, return the number 0.
+3.  You can assign more than one topic if the verbatim covers multiple subjects.
+"""
+
+_SINGLE_OUTPUT_RULES = """4.  Your output must be a single JSON object.
 5.  The JSON object must have two keys: 'topics' and 'verbatim_text'.
 6.  The value for 'topics' should be a list of strings. Each string must be a topic from the provided list or the string 'No Match'.
 7.  The value for 'verbatim_text' should be the original verbatim you are analyzing.
+"""
+
+_PACKED_OUTPUT_RULES = """4.  You will be given several verbatims, each with a 'custom_id'. Classify each one independently.
+5.  Your output must be a single JSON object with one key, 'results', holding a list with exactly one entry per verbatim.
+6.  Each entry must be a JSON object with two keys: 'custom_id' (copied exactly from the input) and 'topics'.
+7.  The value for 'topics' should be a list of strings. Each string must be a topic from the provided list or the string 'No Match'.
+"""
+
+_COMPACT_SINGLE_OUTPUT_RULES = """4.  Your output must be a single JSON object with exactly one key: 'topics'.
+5.  The value for 'topics' should be a list of integers. Each integer must be the number of a topic in the list, or 0.
+6.  Do not repeat the verbatim or add any other keys.
+"""
 
+_COMPACT_PACKED_OUTPUT_RULES = """4.  You will be given several verbatims, each with a 'custom_id'. Classify each one independently.
+5.  Your output must be a single JSON object with one key, 'results', holding a list with exactly one entry per verbatim.
+6.  Each entry must be a JSON object with two keys: 'custom_id' (copied exactly from the input) and 'topics'.
+7.  The value for 'topics' should be a list of integers. Each integer must be the number of a topic in the list, or 0.
+8.  Do not repeat the verbatims or add any other keys.
+"""
+
+_TOPIC_SECTION = f"""
 Below is a list of predefined topics and five examples of how to classify a verbatim.
 
 **Topic List:**
 {_TOPIC_LIST}"""
 
+_COMPACT_TOPIC_SECTION = f"""
+Below is the numbered list of predefined topics and five examples of how to classify a verbatim.
 
-def user_prompt_for(verbatim: str) -> str:
+**Topic List:**
+{_NUMBERED_TOPIC_LIST}"""
+
+SYSTEM_PROMPT = _INSTRUCTIONS + _SINGLE_OUTPUT_RULES + _TOPIC_SECTION
+PACKED_SYSTEM_PROMPT = _INSTRUCTIONS + _PACKED_OUTPUT_RULES + _TOPIC_SECTION
+COMPACT_SYSTEM_PROMPT = _COMPACT_INSTRUCTIONS + _COMPACT_SINGLE_OUTPUT_RULES + _COMPACT_TOPIC_SECTION
+COMPACT_PACKED_SYSTEM_PROMPT = _COMPACT_INSTRUCTIONS + _COMPACT_PACKED_OUTPUT_RULES + _COMPACT_TOPIC_SECTION
+
+_EXAMPLES = [
+    (
+        "I'm having trouble with the login for the online portal, and the Wi-Fi on campus is really slow.",
+        ["Online Learning Platform", "Technology and Equipment"],
+    ),
+    (
+        "John is great! He explains everything clearly and is always available to help after class.",
+        ["Trainer Quality and Engagement"],
+    ),
+    (
+        "I asked about my results from last semester, but nobody has gotten back to me. I've been waiting for weeks.",
+        ["Communication and Information", "Assessment and Feedback"],
+    ),
+    (
+        "The campus cafeteria has really limited options, and the library hours are not great for students who work.",
+        ["Facilities and Campus Environment"],
+    ),
+    (
+        "I've been working as a mechanic for 10 years, and I want to see if I can get credit for my experience towards this course.",
+        ["Recognition of Prior Learning (RPL)"],
+    ),
+]
+
+
+def _few_shot_examples(output_mode: str) -> str:
+    blocks = []
+    for n, (verbatim, topics) in enumerate(_EXAMPLES, 1):
+        labels = [TOPICS.index(t) + 1 for t in topics] if output_mode == "compact" else topics
+        blocks.append(
+            f'    {n}. **Verbatim:** "{verbatim}"\n'
+            f"       **Topics:** {json.dumps(labels)}"
+        )
+    return "**Examples for Few-Shot Classification:**\n\n" + "\n\n".join(blocks)
+
+
+def system_prompt(output_mode: str = "full", packed: bool = False) -> str:
+    if output_mode == "compact":
+        return COMPACT_PACKED_SYSTEM_PROMPT if packed else COMPACT_SYSTEM_PROMPT
+    return PACKED_SYSTEM_PROMPT if packed else SYSTEM_PROMPT
+
+
+def user_prompt_for(verbatim: str, output_mode: str = "full") -> str:
     return f"""
     You are looking at a verbatim from a student. Based on the list of topics provided, below are five examples of how to classify a verbatim.
 
-    **Examples for Few-Shot Classification:**
+    {_few_shot_examples(output_mode)}
+
+    **New Verbatim to Classify:**
+    {verbatim}
+    """
+
+
+def packed_user_prompt_for(items: list[dict], output_mode: str = "full") -> str:
+    """User prompt carrying several verbatims, one JSON object per line."""
+    lines = "\n".join(
+        json.dumps({"custom_id": item["custom_id"], "verbatim": item["verbatim_text"]})
+        for item in items
+    )
+    return f"""
+    You are looking at {len(items)} verbatims from students. Based on the list of topics provided, below are five examples of how to classify a verbatim.
+
+    {_few_shot_examples(output_mode)}
+
+    **New Verbatims to Classify (one JSON object per line):**
+{lines}
+    """
 
-    1. **Verbatim:** "I'm having trouble with the login for the online portal, and the Wi-Fi on campus is really slow."
-       **Topics:** ["Online Learning Platform", "Technology and Equipment"]
 
-    2. **Verbatim:** "John is great! He explains everything clearly and is always available to help after class."
-       **Topics:** ["Trainer Quality and Engagement"]
+def messages_for(verbatim: str, output_mode: str = "full") -> list[dict]:
+    return [
+        {"role": "system", "content": system_prompt(output_mode)},
+        {"role": "user", "content": user_prompt_for(verbatim, output_mode)},
+    ]
+
 
-    3. **Verbatim:** "I asked about my results from last semester, but nobody has gotten back to me. I've been waiting for weeks."
-       **Topics:** ["Communication and Information", "Assessment and Feedback"]
+def packed_messages_for(items: list[dict], output_mode: str = "full") -> list[dict]:
+    return [
+        {"role": "system", "content": system_prompt(output_mode, packed=True)},
+        {"role": "user", "content": packed_user_prompt_for(items, output_mode)},
+    ]
 
-    4. **Verbatim:** "The campus cafeteria has really limited options, and the library hours are not great for students who work."
-       **Topics:** ["Facilities and Campus Environment"]
 
-    5. **Verbatim:** "I've been working as a mechanic for 10 years, and I want to see if I can get credit for my experience towards this course."
-       **Topics:** ["Recognition of Prior Learning (RPL)"]
+_CATEGORY_INSTRUCTIONS = """You are an expert topic classifier for student feedback from a vocational education and training institution.
+Your task is to decide which broad categories a student verbatim is about. You must adhere to the following rules:
+1.  Choose every category from the provided list that the verbatim relates to.
+2.  If the verbatim is not relevant to any category on the list, return 'No Match'.
+3.  Your output must be a single JSON object with exactly one key: 'categories'.
+4.  The value for 'categories' should be a list of strings. Each string must be a category from the provided list or the string 'No Match'.
+"""
+
+
+def category_messages_for(verbatim: str, taxonomy: dict[str, list[str]] = TAXONOMY) -> list[dict]:
+    """First pass of hierarchical classification: pick coarse categories only."""
+    categories = "\n".join(f"- {c}" for c in taxonomy)
+    return [
+        {"role": "system", "content": f"{_CATEGORY_INSTRUCTIONS}\n**Category List:**\n{categories}"},
+        {"role": "user", "content": f"**Verbatim to Classify:**\n{verbatim}"},
+    ]
+
+
+def subset_messages_for(verbatim: str, topics: list[str]) -> list[dict]:
+    """
+    Second pass of hierarchical classification: the full-mode single-item
+    prompt with the topic list cut down to *topics*. Only few-shot examples
+    whose topics all fall inside the subset are kept.
+    """
+    examples = [(v, t) for v, t in _EXAMPLES if set(t) <= set(topics)]
+    topic_list = "\n".join(f"- {t}" for t in topics)
+    system = _INSTRUCTIONS + _SINGLE_OUTPUT_RULES + f"""
+Below is a list of predefined topics.
+
+**Topic List:**
+{topic_list}"""
+
+    shots = ""
+    if examples:
+        blocks = [
+            f'    {n}. **Verbatim:** "{v}"\n       **Topics:** {json.dumps(t)}'
+            for n, (v, t) in enumerate(examples, 1)
+        ]
+        shots = "**Examples for Few-Shot Classification:**\n\n" + "\n\n".join(blocks)
+    user = f"""
+    You are looking at a verbatim from a student. Based on the list of topics provided, classify it.
+
+    {shots}
 
     **New Verbatim to Classify:**
     {verbatim}
     """
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
 
 
-def messages_for(verbatim: str) -> list[dict]:
-    return [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": user_prompt_for(verbatim)},
+def category_schema(taxonomy: dict[str, list[str]] = TAXONOMY) -> dict:
+    categories = {"type": "array", "items": {"type": "string", "enum": [*taxonomy, NO_MATCH]}, "minItems": 1}
+    return {"type": "object", "properties": {"categories": categories}, "required": ["categories"]}
+
+
+def response_schema(
+    output_mode: str = "full",
+    packed: bool = False,
+    custom_ids: list[str] | None = None,
+    topics: list[str] | None = None,
+) -> dict:
+    """
+    JSON schema for structured-output decoding, with topics restricted to TOPICS.
+
+    For packed requests, *custom_ids* (when given) restricts each entry's
+    custom_id to the ids actually sent. In full mode, *topics* narrows the
+    allowed topic names further (used by the hierarchical second pass).
+    """
+    if output_mode == "compact":
+        topic_item = {"type": "integer", "enum": list(range(len(TOPICS) + 1))}
+    else:
+        topic_item = {"type": "string", "enum": [*(topics or TOPICS), NO_MATCH]}
+    topics = {"type": "array", "items": topic_item, "minItems": 1}
+
+    if packed:
+        custom_id = {"type": "string"}
+        if custom_ids:
+            custom_id["enum"] = list(custom_ids)
+        entry = {
+            "type": "object",
+            "properties": {"custom_id": custom_id, "topics": topics},
+            "required": ["custom_id", "topics"],
+        }
+        return {
+            "type": "object",
+            "properties": {"results": {"type": "array", "items": entry}},
+            "required": ["results"],
+        }
+
+    if output_mode == "compact":
+        return {"type": "object", "properties": {"topics": topics}, "required": ["topics"]}
+    return {
+        "type": "object",
+        "properties": {"topics": topics, "verbatim_text": {"type": "string"}},
+        "required": ["topics", "verbatim_text"],
+    }
+
+
+def decode_topics(values: list) -> list[str]:
+    """
+    Map compact topic codes back to topic names.
+
+    Accepts 1-based indices into TOPICS (as ints or numeric strings), 0 for
+    'No Match', and full topic names, which pass through unchanged.
+
+    Raises:
+        ValueError: If *values* is not a list or contains an unknown code.
+    """
+    if not isinstance(values, list):
+        raise ValueError(f"topics must be a list, got {type(values).__name__}")
+
+    topics = []
+    for value in values:
+        if isinstance(value, str) and (value in TOPICS or value == NO_MATCH):
+            topic = value
+        else:
+            try:
+                index = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"unknown topic code: {value!r}") from None
+            if index == 0:
+                topic = NO_MATCH
+            elif 1 <= index <= len(TOPICS):
+                topic = TOPICS[index - 1]
+            else:
+                raise ValueError(f"topic code out of range: {value!r}")
+        if topic not in topics:
+            topics.append(topic)
+
+    if len(topics) > 1 and NO_MATCH in topics:
+        topics.remove(NO_MATCH)
+    return topics or [NO_MATCH]
+
+
+def validate_topics(values) -> list[str]:
+    """
+    Check a full-mode 'topics' value: a list of topic names, where a missing
+    or empty list means 'No Match'.
+
+    Raises:
+        ValueError: If *values* is not a list of strings.
+    """
+    if values is None or values == []:
+        return [NO_MATCH]
+    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+        raise ValueError(f"topics must be a list of strings, got {values!r}")
+    return values
+
+
+def prompt_fingerprint() -> str:
+    """Hash of the topic list and every prompt template; changes whenever any of them does."""
+    digest = hashlib.sha256()
+    templates = [
+        part
+        for mode in OUTPUT_MODES
+        for part in (
+            system_prompt(mode),
+            system_prompt(mode, packed=True),
+            user_prompt_for("{verbatim}", mode),
+            packed_user_prompt_for([{"custom_id": "{custom_id}", "verbatim_text": "{verbatim}"}], mode),
+        )
+    ]
+    for part in (*templates, *TOPICS):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def hierarchical_fingerprint(
+    taxonomy: dict[str, list[str]], shortlist: str, shortlist_size: int
+) -> str:
+    """
+    prompt_fingerprint() extended with everything that shapes a hierarchical
+    classification: the category and subset prompts, the taxonomy and the
+    shortlist settings. Keeps hierarchical cache entries apart from flat ones.
+    """
+    digest = hashlib.sha256()
+    messages = [
+        *category_messages_for("{verbatim}", taxonomy),
+        *subset_messages_for("{verbatim}", TOPICS),
     ]
+    parts = [prompt_fingerprint(), *(m["content"] for m in messages), shortlist, str(shortlist_size)]
+    parts += [f"{category}: {', '.join(topics)}" for category, topics in taxonomy.items()]
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
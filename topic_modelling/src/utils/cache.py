@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from config.settings import CACHE_PATH, CACHE_MAX_ENTRIES, CACHE_MAX_AGE_DAYS
+from src.prompts import prompt_fingerprint
+
+
+def normalise_verbatim(text: str) -> str:
+    """Canonical form used for cache keys: NFKC, lower-cased, whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFKC", text).lower().split())
+
+
+class ClassificationCache:
+    """
+    Disk-backed (SQLite) cache of verbatim classifications.
+
+    Entries are keyed by a hash of the model name, the prompt fingerprint
+    (system prompt, user prompt template and TOPICS) and the normalised
+    verbatim text. When the prompts or the topic list change, the fingerprint
+    changes and every stale entry is purged the next time the cache is opened.
+
+    Only the topic list is stored; callers rebuild the full record from their
+    own custom_id and verbatim text. Safe to share between worker threads.
+    """
+
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_age_days: float = CACHE_MAX_AGE_DAYS,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 86400
+        self.fingerprint = prompt_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS classifications (
+                key         TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                model       TEXT NOT NULL,
+                topics      TEXT NOT NULL,
+                created_at  REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_classifications_accessed ON classifications (accessed_at)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    # ------------------------------------------------------------------
+    # Public interface
+    # ------------------------------------------------------------------
+
+    def key_for(self, model: str, verbatim: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, self.fingerprint, normalise_verbatim(verbatim)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, model: str, verbatim: str) -> list[str] | None:
+        """Return the cached topics for *verbatim*, or None on a miss."""
+        key = self.key_for(model, verbatim)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT topics, created_at FROM classifications WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE classifications SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, model: str, verbatim: str, topics: list[str]) -> None:
+        """Store *topics* for *verbatim*. Error placeholders are never cached."""
+        if any(str(t).startswith("Error") for t in topics):
+            return
+        key = self.key_for(model, verbatim)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO classifications VALUES (?, ?, ?, ?, ?, ?)",
+                (key, self.fingerprint, model, json.dumps(topics), now, now),
+            )
+            self._conn.commit()
+
+    def evict(self) -> int:
+        """Drop stale-fingerprint, expired and least-recently-used overflow entries."""
+        cutoff = time.time() - self.max_age_seconds
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM classifications WHERE fingerprint != ? OR created_at < ?",
+                (self.fingerprint, cutoff),
+            ).rowcount
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM classifications").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                removed += self._conn.execute(
+                    """
+                    DELETE FROM classifications WHERE key IN (
+                        SELECT key FROM classifications ORDER BY accessed_at ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                ).rowcount
+            self._conn.commit()
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM classifications").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self) -> None:
+        self.evict()
+        with self._lock:
+            self._conn.close()
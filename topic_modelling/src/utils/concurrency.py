@@ -0,0 +1,106 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limit for asyncio (additive increase, multiplicative decrease).
+
+    Completed requests are evaluated in windows of roughly `limit` requests:
+    - any error, or a mean latency above latency_tolerance x the best window
+      seen so far, multiplies the limit by `backoff`;
+    - otherwise, if throughput beat the best window so far by more than
+      `min_gain`, the limit grows by one;
+    - otherwise the limit is held.
+
+    Every decision is appended to `history` so the chosen level can be
+    inspected after the run.
+    """
+
+    def __init__(
+        self,
+        initial: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        min_gain: float = 0.05,
+        min_window: int = 4,
+    ):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("require 1 <= min_limit <= initial <= max_limit")
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.min_gain = min_gain
+        self.min_window = min_window
+
+        self.in_flight = 0
+        self.history: list[dict] = []
+        self._condition = asyncio.Condition()
+        self._started = time.perf_counter()
+        self._window: list[tuple[float, bool]] = []
+        self._window_started = self._started
+        self._best_latency: float | None = None
+        self._best_throughput: float | None = None
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one unit of concurrency; exceptions raised inside count as errors."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            latency = time.perf_counter() - started
+            async with self._condition:
+                self.in_flight -= 1
+                self._record(latency, ok)
+                self._condition.notify_all()
+
+    def _record(self, latency: float, ok: bool) -> None:
+        self._window.append((latency, ok))
+        if len(self._window) < max(self.limit, self.min_window):
+            return
+
+        now = time.perf_counter()
+        errors = sum(1 for _, success in self._window if not success)
+        mean_latency = sum(lat for lat, _ in self._window) / len(self._window)
+        throughput = len(self._window) / max(now - self._window_started, 1e-9)
+
+        if self._best_latency is None or mean_latency < self._best_latency:
+            self._best_latency = mean_latency
+
+        if errors or mean_latency > self._best_latency * self.latency_tolerance:
+            new_limit = max(self.min_limit, int(self.limit * self.backoff))
+            action = "decrease"
+        elif self._best_throughput is None or throughput > self._best_throughput * (1 + self.min_gain):
+            new_limit = min(self.max_limit, self.limit + 1)
+            action = "increase"
+        else:
+            new_limit = self.limit
+            action = "hold"
+
+        self.history.append(
+            {
+                "elapsed_s": round(now - self._started, 3),
+                "limit": self.limit,
+                "new_limit": new_limit,
+                "action": action,
+                "throughput_rps": round(throughput, 3),
+                "mean_latency_s": round(mean_latency, 3),
+                "errors": errors,
+            }
+        )
+        self.limit = new_limit
+        self._best_throughput = max(throughput, self._best_throughput or 0.0)
+        self._window = []
+        self._window_started = now
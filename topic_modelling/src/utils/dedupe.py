@@ -0,0 +1,145 @@
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from src.utils.cache import normalise_verbatim
+
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+
+
+def lsh_params(threshold: float, num_perm: int) -> tuple[int, int]:
+    """
+    Pick (bands, rows) with bands * rows == num_perm whose LSH S-curve
+    threshold (1 / bands) ** (1 / rows) lies closest to *threshold*.
+    """
+    candidates = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(candidates, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class _Representative:
+    __slots__ = ("signature", "band_keys", "topics")
+
+    def __init__(self, signature: np.ndarray, band_keys: list[bytes]):
+        self.signature = signature
+        self.band_keys = band_keys
+        self.topics: list[str] | None = None
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index that groups near-identical verbatims.
+
+    Texts are normalised (as for the cache), split into character shingles
+    and MinHashed with num_perm hash functions; signatures for a whole batch
+    are computed in one vectorised pass. LSH bands find candidate groups and
+    a candidate is accepted only if the estimated Jaccard similarity to the
+    group's representative is at least *threshold*.
+
+    Only representatives are kept (signature, band keys and, once known,
+    topics), at most max_representatives of them in LRU order, so memory
+    stays bounded however many rows are streamed through.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 64,
+        shingle_size: int = 5,
+        max_representatives: int = 200_000,
+        seed: int = 1,
+    ):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_representatives = max_representatives
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+
+        rng = np.random.default_rng(seed)
+        # a < 2**32 keeps a * x (x is a 32-bit shingle hash) inside uint64.
+        self._a = rng.integers(1, 2**32 - 1, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self._representatives: OrderedDict[str, _Representative] = OrderedDict()
+        self._buckets: list[dict[bytes, str]] = [{} for _ in range(self.bands)]
+
+    # ------------------------------------------------------------------
+    # Public interface
+    # ------------------------------------------------------------------
+
+    def assign(self, items: list[dict], batch_size: int = 1000) -> list[str]:
+        """
+        Return, for each item, the custom_id of its group's representative.
+        Items that start a new group are their own representative.
+        """
+        assignments = []
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            signatures = self.signatures([item["verbatim_text"] for item in batch])
+            for item, signature in zip(batch, signatures):
+                assignments.append(self._assign_one(item["custom_id"], signature))
+        return assignments
+
+    def topics_for(self, representative_id: str) -> list[str] | None:
+        rep = self._representatives.get(representative_id)
+        return rep.topics if rep is not None else None
+
+    def set_topics(self, representative_id: str, topics: list[str]) -> None:
+        rep = self._representatives.get(representative_id)
+        if rep is not None:
+            rep.topics = topics
+
+    def discard(self, representative_id: str) -> None:
+        """Forget a group, e.g. because its representative could not be classified."""
+        rep = self._representatives.pop(representative_id, None)
+        if rep is not None:
+            self._unbucket(representative_id, rep)
+
+    def signatures(self, texts: list[str]) -> np.ndarray:
+        """MinHash signatures, shape (len(texts), num_perm), computed for the batch at once."""
+        hashes, offsets = [], []
+        for text in texts:
+            offsets.append(len(hashes))
+            hashes.extend(self._shingle_hashes(text))
+        x = np.asarray(hashes, dtype=np.uint64)[None, :]
+        permuted = (self._a * x % _PRIME + self._b) % _PRIME
+        return np.minimum.reduceat(permuted, offsets, axis=1).T.astype(np.uint32)
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _shingle_hashes(self, text: str) -> list[int]:
+        normalised = normalise_verbatim(text)
+        k = self.shingle_size
+        shingles = {normalised[i:i + k] for i in range(max(1, len(normalised) - k + 1))}
+        return [zlib.crc32(s.encode("utf-8")) for s in shingles]
+
+    def _assign_one(self, custom_id: str, signature: np.ndarray) -> str:
+        band_keys = [
+            signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)
+        ]
+        checked = set()
+        for band, key in enumerate(band_keys):
+            candidate = self._buckets[band].get(key)
+            if candidate is None or candidate in checked:
+                continue
+            checked.add(candidate)
+            rep = self._representatives[candidate]
+            if np.mean(rep.signature == signature) >= self.threshold:
+                self._representatives.move_to_end(candidate)
+                return candidate
+
+        self._representatives[custom_id] = _Representative(signature, band_keys)
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, custom_id)
+        while len(self._representatives) > self.max_representatives:
+            old_id, old = self._representatives.popitem(last=False)
+            self._unbucket(old_id, old)
+        return custom_id
+
+    def _unbucket(self, representative_id: str, rep: _Representative) -> None:
+        for band, key in enumerate(rep.band_keys):
+            if self._buckets[band].get(key) == representative_id:
+                del self._buckets[band][key]
@@ -0,0 +1,76 @@
+"""Local CPU sentence embeddings and topic prototypes built from them."""
+
+import numpy as np
+
+from config.settings import EMBEDDING_BATCH_SIZE, EMBEDDING_MODEL
+
+
+def _require_sentence_transformers():
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ImportError(
+            "Local embeddings require sentence-transformers: pip install sentence-transformers"
+        ) from e
+    return SentenceTransformer
+
+
+class Embedder:
+    """
+    Wraps a sentence-transformers model running on CPU. Vectors are
+    L2-normalised, so a dot product is the cosine similarity.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, batch_size: int = EMBEDDING_BATCH_SIZE):
+        SentenceTransformer = _require_sentence_transformers()
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = SentenceTransformer(model_name, device="cpu")
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Return a (len(texts), dim) float32 matrix of unit vectors."""
+        if not texts:
+            return np.zeros((0, self._model.get_sentence_embedding_dimension()), dtype=np.float32)
+        vectors = self._model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return vectors.astype(np.float32, copy=False)
+
+
+def topic_prototypes(
+    embedder: Embedder,
+    topics: list[str],
+    examples: list[dict] | None = None,
+) -> np.ndarray:
+    """
+    Build one unit vector per topic: the mean of the topic name's embedding
+    and the embeddings of any labelled examples carrying that topic.
+
+    Args:
+        embedder: Embedder used for both prototypes and verbatims.
+        topics:   Topic names, in the order of the returned rows.
+        examples: Optional results-style dicts ('verbatim_text', 'topics'),
+                  e.g. earlier LLM output loaded with load_results.
+
+    Returns:
+        A (len(topics), dim) matrix.
+    """
+    prototypes = embedder.encode(topics)
+    if examples:
+        index = {topic: i for i, topic in enumerate(topics)}
+        labelled = [e for e in examples if any(t in index for t in e.get("topics", []))]
+        vectors = embedder.encode([e["verbatim_text"] for e in labelled])
+        sums = prototypes.copy()
+        counts = np.ones(len(topics), dtype=np.float32)
+        for vector, example in zip(vectors, labelled):
+            for topic in example["topics"]:
+                if topic in index:
+                    sums[index[topic]] += vector
+                    counts[index[topic]] += 1
+        prototypes = sums / counts[:, None]
+    norms = np.linalg.norm(prototypes, axis=1, keepdims=True)
+    return prototypes / np.maximum(norms, 1e-12)
@@ -0,0 +1,258 @@
+import asyncio
+import threading
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from ollama import AsyncClient, Client
+
+
+class NoHealthyHostError(RuntimeError):
+    """Raised when every host in the pool has been evicted."""
+
+
+class _Host:
+    def __init__(self, url: str, client):
+        self.url = url.rstrip("/")
+        self.client = client
+        self.async_client = None
+        self.async_loop = None
+        self.in_flight = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.hedges = 0
+        self.latencies: deque[float] = deque(maxlen=200)
+
+    def mean_latency(self) -> float:
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+
+class HostPool:
+    """
+    Routes Ollama chat requests across several servers.
+
+    Each request goes to the healthy host with the fewest requests in
+    flight (ties broken by mean latency). A host is evicted after
+    max_failures consecutive errors; a background thread probes every host's
+    /api/version each probe_interval seconds, evicting hosts that do not
+    answer and re-admitting those that recover.
+
+    With hedge_percentile set (e.g. 95), a request still running after that
+    percentile of recent latencies is re-issued to a second host and the
+    first answer wins.
+
+    Exposes chat() and achat() with the same arguments as ollama.Client.chat,
+    so it can stand in for a client.
+    """
+
+    def __init__(
+        self,
+        hosts: list[str],
+        probe_interval: float = 15.0,
+        probe_timeout: float = 2.0,
+        max_failures: int = 3,
+        hedge_percentile: float | None = None,
+        hedge_min_samples: int = 20,
+        client_factory=Client,
+        async_client_factory=AsyncClient,
+    ):
+        if not hosts:
+            raise ValueError("HostPool needs at least one host")
+        self.hosts = [_Host(url, client_factory(host=url)) for url in hosts]
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.max_failures = max_failures
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._async_client_factory = async_client_factory
+
+        self._lock = threading.Lock()
+        self._recent_latencies: deque[float] = deque(maxlen=500)
+        self._hedge_executor = ThreadPoolExecutor(max_workers=8 * len(self.hosts)) if hedge_percentile else None
+        self._stop = threading.Event()
+        self._prober = threading.Thread(target=self._probe_loop, name="ollama-host-probe", daemon=True)
+        self._prober.start()
+
+    # ------------------------------------------------------------------
+    # Public interface
+    # ------------------------------------------------------------------
+
+    def chat(self, **kwargs):
+        primary = self._acquire()
+        threshold = self._hedge_threshold()
+        if threshold is None or self._hedge_executor is None:
+            return self._call(primary, kwargs)
+
+        first = self._hedge_executor.submit(self._call, primary, kwargs)
+        done, _ = wait([first], timeout=threshold)
+        if done:
+            return first.result()
+
+        try:
+            secondary = self._acquire(exclude=primary)
+        except NoHealthyHostError:
+            return first.result()
+        secondary.hedges += 1
+        second = self._hedge_executor.submit(self._call, secondary, kwargs)
+
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def achat(self, **kwargs):
+        primary = self._acquire()
+        threshold = self._hedge_threshold()
+        if threshold is None:
+            return await self._acall(primary, kwargs)
+
+        first = asyncio.ensure_future(self._acall(primary, kwargs))
+        done, _ = await asyncio.wait({first}, timeout=threshold)
+        if done:
+            return first.result()
+
+        try:
+            secondary = self._acquire(exclude=primary)
+        except NoHealthyHostError:
+            return await first
+        secondary.hedges += 1
+        second = asyncio.ensure_future(self._acall(secondary, kwargs))
+
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return task.result()
+                error = task.exception()
+        raise error
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    "host": h.url,
+                    "healthy": h.healthy,
+                    "in_flight": h.in_flight,
+                    "requests": h.requests,
+                    "failures": h.failures,
+                    "hedges": h.hedges,
+                    "mean_latency_s": round(h.mean_latency(), 3),
+                }
+                for h in self.hosts
+            ]
+
+    def print_report(self) -> None:
+        print("\n--- Ollama host pool ---")
+        for s in self.stats():
+            state = "healthy" if s["healthy"] else "evicted"
+            print(f"  {s['host']:<32} {state:<8} {s['requests']} request(s), {s['failures']} failure(s), "
+                  f"{s['hedges']} hedge(s), {s['mean_latency_s']}s mean latency")
+
+    def close(self) -> None:
+        """Stop the health probe thread and the hedge executor."""
+        self._stop.set()
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _acquire(self, exclude: _Host | None = None) -> _Host:
+        with self._lock:
+            candidates = [h for h in self.hosts if h.healthy and h is not exclude]
+            if not candidates:
+                raise NoHealthyHostError("No healthy Ollama hosts available")
+            host = min(candidates, key=lambda h: (h.in_flight, h.mean_latency()))
+            host.in_flight += 1
+            host.requests += 1
+            return host
+
+    def _release(self, host: _Host, latency: float, outcome: str) -> None:
+        """Return *host* to the pool; *outcome* is "ok", "error" or "cancelled"."""
+        with self._lock:
+            host.in_flight -= 1
+            if outcome == "cancelled":
+                # A hedge that lost the race says nothing about the host's health or speed.
+                return
+            if outcome == "ok":
+                host.consecutive_failures = 0
+                host.latencies.append(latency)
+                self._recent_latencies.append(latency)
+                return
+            host.failures += 1
+            host.consecutive_failures += 1
+            if host.healthy and host.consecutive_failures >= self.max_failures:
+                host.healthy = False
+                print(f"\nEvicting Ollama host {host.url} after {host.consecutive_failures} consecutive failures.")
+
+    def _call(self, host: _Host, kwargs: dict):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = host.client.chat(**kwargs)
+            outcome = "ok"
+            return response
+        finally:
+            self._release(host, time.perf_counter() - started, outcome)
+
+    async def _acall(self, host: _Host, kwargs: dict):
+        # An AsyncClient is bound to the event loop it was first used on, and
+        # streaming runs one event loop per chunk.
+        loop = asyncio.get_running_loop()
+        if host.async_client is None or host.async_loop is not loop:
+            host.async_client = self._async_client_factory(host=host.url)
+            host.async_loop = loop
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await host.async_client.chat(**kwargs)
+            outcome = "ok"
+            return response
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            self._release(host, time.perf_counter() - started, outcome)
+
+    def _hedge_threshold(self) -> float | None:
+        """Latency (seconds) after which to hedge, or None if hedging is off or not yet calibrated."""
+        if self.hedge_percentile is None:
+            return None
+        with self._lock:
+            if sum(h.healthy for h in self.hosts) < 2 or len(self._recent_latencies) < self.hedge_min_samples:
+                return None
+            ordered = sorted(self._recent_latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))
+        return ordered[index]
+
+    def _probe(self, host: _Host) -> bool:
+        try:
+            with urllib.request.urlopen(f"{host.url}/api/version", timeout=self.probe_timeout) as response:
+                return response.status == 200
+        except Exception:
+            return False
+
+    def _probe_loop(self) -> None:
+        while not self._stop.wait(self.probe_interval):
+            for host in self.hosts:
+                healthy = self._probe(host)
+                with self._lock:
+                    if healthy and not host.healthy:
+                        print(f"\nRe-admitting Ollama host {host.url}.")
+                        host.consecutive_failures = 0
+                    elif not healthy and host.healthy:
+                        print(f"\nEvicting Ollama host {host.url}: health probe failed.")
+                    host.healthy = healthy
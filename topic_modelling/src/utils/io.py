@@ -1,34 +1,60 @@
+from __future__ import annotations
+
+import csv
 import json
 import os
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+# pandas and NumPy are imported where they are used, so that streaming runs
+# and the CLI's --help do not pay for them at startup.
+if TYPE_CHECKING:
+    import pandas as pd
 
-import pandas as pd
+INPUT_FORMATS = (".csv", ".jsonl", ".parquet")
+SINK_FORMATS = (".jsonl", ".parquet")
 
 
 def save_results(results: list[dict], output_path: str) -> None:
-    """Persist classification results as a JSON file."""
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump(results, f, indent=4)
+    """Persist classification results as Parquet (by extension) or a pretty-printed JSON file."""
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if output_path.lower().endswith(".parquet"):
+        pa = _require_pyarrow()
+        pa.parquet.write_table(results_to_table(results), output_path)
+    else:
+        with open(output_path, "w") as f:
+            json.dump(results, f, indent=4)
     print(f"Results saved to: {output_path}")
 
 
 def load_results(path: str) -> list[dict]:
-    """Load previously saved classification results."""
+    """Load previously saved classification results (a JSON list, JSONL from a sink, or Parquet)."""
+    if path.lower().endswith(".parquet"):
+        return _require_pyarrow().parquet.read_table(path).to_pylist()
     with open(path) as f:
+        if path.lower().endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
         return json.load(f)
 
 
+def iter_results(path: str, batch_size: int = 10_000) -> Iterator[dict]:
+    """Lazily read results back from a sink's JSONL or Parquet file, one at a time."""
+    yield from _iter_rows(path, batch_size)
+
+
 def results_to_dataframe(results: list[dict]) -> pd.DataFrame:
     """Convert classification results to a display-ready DataFrame."""
+    import pandas as pd
+
     df = pd.DataFrame(results)
 
     if "topics" in df.columns:
-        df["topics"] = df["topics"].apply(
-            lambda x: "No Match" if isinstance(x, list) and len(x) == 0 else x
-        )
-        df["topics"] = df["topics"].apply(
-            lambda x: ", ".join(x) if isinstance(x, list) else x
-        )
+        topics = df["topics"]
+        is_list = topics.map(type).eq(list)
+        joined = topics.str.join(", ")
+        joined = joined.mask(joined.eq(""), "No Match")
+        df["topics"] = joined.where(is_list, topics)
 
     return df
 
@@ -40,3 +66,265 @@ def print_results(results: list[dict]) -> None:
         topics = result.get("topics", [])
         topic_str = ", ".join(topics) if topics else "No Match"
         print(f"Topics    : {topic_str}\n")
+
+
+# ---------------------------------------------------------------------------
+# Columnar results and topic analytics
+# ---------------------------------------------------------------------------
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet support requires pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _results_schema(pa):
+    return pa.schema(
+        [
+            ("custom_id", pa.string()),
+            ("verbatim_text", pa.string()),
+            ("topics", pa.list_(pa.string())),
+        ]
+    )
+
+
+def results_to_table(results: list[dict]):
+    """Convert classification results to a pyarrow Table with topics kept as a list<string> column."""
+    pa = _require_pyarrow()
+    schema = _results_schema(pa)
+    return pa.Table.from_pydict(
+        {name: [result.get(name) for result in results] for name in schema.names}, schema=schema
+    )
+
+
+def load_results_frame(path: str) -> pd.DataFrame:
+    """
+    Load saved results as a DataFrame with one row per verbatim and the
+    topics still as lists. Parquet is read column by column without going
+    through a dict per row.
+    """
+    import pandas as pd
+
+    if path.lower().endswith(".parquet"):
+        return _require_pyarrow().parquet.read_table(path).to_pandas()
+    return pd.DataFrame(load_results(path))
+
+
+def topic_matrix(results: list[dict] | pd.DataFrame, topics: list[str] | None = None) -> pd.DataFrame:
+    """
+    Multi-hot encode the topics of each verbatim in one vectorised pass.
+
+    Args:
+        results: Result dicts, or a DataFrame with a 'topics' list column
+                 (e.g. from load_results_frame).
+        topics:  Columns of the matrix, in order. Defaults to TOPICS followed
+                 by any other label found (e.g. "No Match" or errors); labels
+                 not listed are dropped.
+
+    Returns:
+        A bool DataFrame with one row per verbatim (indexed by custom_id when
+        present) and one column per topic.
+    """
+    import numpy as np
+    import pandas as pd
+
+    frame = results if isinstance(results, pd.DataFrame) else pd.DataFrame(results)
+    column = frame["topics"] if "topics" in frame.columns else pd.Series([], dtype=object)
+    exploded = column.reset_index(drop=True).explode().dropna()
+    labels, found = pd.factorize(exploded)
+    if topics is None:
+        from config.settings import TOPICS
+
+        topics = list(TOPICS) + [t for t in found if t not in set(TOPICS)]
+
+    position = {topic: i for i, topic in enumerate(topics)}
+    codes = np.array([position.get(label, -1) for label in found], dtype=np.int64)[labels]
+    rows = exploded.index.to_numpy()
+    known = codes >= 0
+    matrix = np.zeros((len(frame), len(topics)), dtype=bool)
+    matrix[rows[known], codes[known]] = True
+    index = pd.Index(frame["custom_id"]) if "custom_id" in frame.columns else frame.index
+    return pd.DataFrame(matrix, index=index, columns=topics)
+
+
+def topic_frequencies(matrix: pd.DataFrame) -> pd.DataFrame:
+    """Verbatims per topic and their share of all verbatims, most frequent first."""
+    import pandas as pd
+
+    counts = matrix.sum(axis=0)
+    return pd.DataFrame(
+        {"count": counts, "share": counts / max(len(matrix), 1)}
+    ).sort_values("count", ascending=False, kind="stable")
+
+
+def topic_cooccurrence(matrix: pd.DataFrame, chunk_size: int = 1 << 20) -> pd.DataFrame:
+    """
+    Topic x topic counts of verbatims tagged with both (the diagonal is each
+    topic's own count). Rows are multiplied chunk_size at a time so float32
+    products stay exact and memory stays bounded.
+    """
+    import numpy as np
+    import pandas as pd
+
+    values = matrix.to_numpy(dtype=bool)
+    counts = np.zeros((values.shape[1], values.shape[1]), dtype=np.int64)
+    for start in range(0, len(values), chunk_size):
+        block = values[start:start + chunk_size].astype(np.float32)
+        counts += (block.T @ block).astype(np.int64)
+    return pd.DataFrame(counts, index=matrix.columns, columns=matrix.columns)
+
+
+def topic_counts_by(matrix: pd.DataFrame, segment, normalize: bool = False) -> pd.DataFrame:
+    """
+    Verbatims per topic within each segment (e.g. faculty or campus).
+
+    *segment* is a Series indexed like *matrix* (by custom_id) or an array
+    of the same length. With normalize=True each row holds the share of the
+    segment's verbatims instead of counts.
+    """
+    grouped = matrix.groupby(segment, sort=True)
+    counts = grouped.sum()
+    if normalize:
+        counts = counts.div(grouped.size(), axis=0)
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Streaming input
+# ---------------------------------------------------------------------------
+
+
+def _iter_rows(path: str, batch_size: int) -> Iterator[dict]:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+    elif ext == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif ext == ".parquet":
+        pa = _require_pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Unsupported input format '{ext}'. Use one of: {', '.join(INPUT_FORMATS)}")
+
+
+def iter_verbatims(
+    path: str,
+    text_column: str = "verbatim_text",
+    id_column: str | None = None,
+    batch_size: int = 10_000,
+) -> Iterator[dict]:
+    """
+    Lazily read verbatims from a CSV, JSONL or Parquet file.
+
+    Rows are yielded one at a time (Parquet is read batch_size rows at a
+    time), so memory stays flat regardless of file size. Rows with an empty
+    text column are skipped.
+
+    Args:
+        path:        Input file; the format is chosen by extension.
+        text_column: Column holding the verbatim text.
+        id_column:   Optional column to use as custom_id; defaults to
+                     verbatim_<row number>.
+
+    Yields:
+        Dicts with keys 'custom_id' and 'verbatim_text'.
+    """
+    for n, row in enumerate(_iter_rows(path, batch_size), 1):
+        if text_column not in row:
+            raise KeyError(f"Column '{text_column}' not found in {path}; available: {sorted(row)}")
+        text = row[text_column]
+        if text is None or not str(text).strip():
+            continue
+        custom_id = str(row[id_column]) if id_column else f"verbatim_{n}"
+        yield {"custom_id": custom_id, "verbatim_text": str(text)}
+
+
+# ---------------------------------------------------------------------------
+# Incremental output
+# ---------------------------------------------------------------------------
+
+class JsonlSink:
+    """Writes one JSON result per line, flushing after every write."""
+
+    def __init__(self, path: str, append: bool = True):
+        self.path = path
+        self.count = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, result: dict) -> None:
+        self._file.write(json.dumps(result) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ParquetSink:
+    """
+    Writes results to a Parquet file one row group at a time, so at most
+    row_group_size results are buffered in memory.
+    """
+
+    def __init__(self, path: str, row_group_size: int = 10_000):
+        pa = _require_pyarrow()
+        self.path = path
+        self.count = 0
+        self.row_group_size = row_group_size
+        self._pa = pa
+        self._schema = _results_schema(pa)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._writer = pa.parquet.ParquetWriter(path, self._schema)
+        self._buffer: list[dict] = []
+
+    def write(self, result: dict) -> None:
+        self._buffer.append({name: result.get(name) for name in self._schema.names})
+        self.count += 1
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self._writer.write_table(self._pa.Table.from_pylist(self._buffer, schema=self._schema))
+            self._buffer = []
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_sink(path: str, append: bool = True):
+    """
+    Return a JsonlSink or ParquetSink for *path*, chosen by extension.
+    Parquet files are always rewritten; append only applies to JSONL.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".jsonl":
+        return JsonlSink(path, append=append)
+    if ext == ".parquet":
+        return ParquetSink(path)
+    raise ValueError(f"Unsupported output format '{ext}'. Use one of: {', '.join(SINK_FORMATS)}")
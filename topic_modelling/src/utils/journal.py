@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+
+from config.settings import RUN_JOURNAL_MAX_AGE_DAYS, RUN_JOURNAL_PATH
+
+# Batch jobs in these states cannot produce results; a resumed run resubmits them.
+_DEAD_JOB_STATUSES = ("failed", "cancelled", "expired")
+
+
+def is_error_result(result: dict) -> bool:
+    return any(str(t).startswith("Error") for t in result.get("topics", []))
+
+
+class RunJournal:
+    """
+    SQLite journal of one classification run, so it can be resumed after a
+    crash or kill.
+
+    Every finished result is written as it arrives, marked 'done' or 'error'
+    (an "Error: ..." placeholder). A resumed run skips done items and retries
+    errored and missing ones. The run's options (input, output, backend...)
+    are stored with it so that --resume <run-id> can restore them.
+
+    OpenAI batch job ids are journalled too, keyed by a digest of the
+    requests they carry, so a resumed run reattaches to a job that is still
+    running (or already finished) instead of paying for it twice.
+
+    Runs started more than max_age_days ago are pruned, with their items and
+    batch jobs, whenever a journal is opened.
+    """
+
+    def __init__(
+        self,
+        run_id: str | None = None,
+        path: str = RUN_JOURNAL_PATH,
+        max_age_days: float = RUN_JOURNAL_MAX_AGE_DAYS,
+    ):
+        self.path = path
+        self.max_age_seconds = max_age_days * 86400
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id     TEXT PRIMARY KEY,
+                options    TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS items (
+                run_id        TEXT NOT NULL,
+                custom_id     TEXT NOT NULL,
+                verbatim_text TEXT NOT NULL,
+                topics        TEXT NOT NULL,
+                status        TEXT NOT NULL,
+                updated_at    REAL NOT NULL,
+                PRIMARY KEY (run_id, custom_id)
+            );
+            CREATE TABLE IF NOT EXISTS batch_jobs (
+                run_id       TEXT NOT NULL,
+                job_key      TEXT NOT NULL,
+                batch_job_id TEXT NOT NULL,
+                status       TEXT NOT NULL,
+                updated_at   REAL NOT NULL,
+                PRIMARY KEY (run_id, job_key)
+            );
+            """
+        )
+        self._conn.commit()
+        self.prune()
+        self._done = {
+            custom_id
+            for (custom_id,) in self._conn.execute(
+                "SELECT custom_id FROM items WHERE run_id = ? AND status = 'done'", (self.run_id,)
+            )
+        }
+
+    # ------------------------------------------------------------------
+    # Runs
+    # ------------------------------------------------------------------
+
+    def start(self, options: dict) -> None:
+        """Register a new run together with the options needed to resume it."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?)", (self.run_id, json.dumps(options), time.time())
+            )
+            self._conn.commit()
+
+    def prune(self) -> int:
+        """Delete runs older than max_age_days (never the open one); returns the number removed."""
+        cutoff = time.time() - self.max_age_seconds
+        with self._lock:
+            old = [
+                run_id
+                for (run_id,) in self._conn.execute(
+                    "SELECT run_id FROM runs WHERE created_at < ? AND run_id != ?", (cutoff, self.run_id)
+                )
+            ]
+            for table in ("items", "batch_jobs", "runs"):
+                self._conn.executemany(f"DELETE FROM {table} WHERE run_id = ?", [(run_id,) for run_id in old])
+            self._conn.commit()
+        return len(old)
+
+    def options(self) -> dict:
+        """Options stored by start(); raises KeyError for an unknown run id."""
+        with self._lock:
+            row = self._conn.execute("SELECT options FROM runs WHERE run_id = ?", (self.run_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No run '{self.run_id}' in {self.path}")
+        return json.loads(row[0])
+
+    # ------------------------------------------------------------------
+    # Items
+    # ------------------------------------------------------------------
+
+    def pending(self, items: Iterable[dict]) -> Iterator[dict]:
+        """Yield only the items that have not yet been classified successfully."""
+        skipped = 0
+        for item in items:
+            if item["custom_id"] in self._done:
+                skipped += 1
+                continue
+            yield item
+        if skipped:
+            print(f"\nJournal: skipped {skipped} item(s) already completed in run {self.run_id}.")
+
+    def record(self, result: dict) -> None:
+        status = "error" if is_error_result(result) else "done"
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    self.run_id,
+                    result["custom_id"],
+                    result["verbatim_text"],
+                    json.dumps(result["topics"]),
+                    status,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+            if status == "done":
+                self._done.add(result["custom_id"])
+
+    def results(self, status: str | None = None) -> Iterator[dict]:
+        """Yield journalled results in the order they were recorded, optionally filtered by status."""
+        query = "SELECT custom_id, verbatim_text, topics FROM items WHERE run_id = ?"
+        params: tuple = (self.run_id,)
+        if status is not None:
+            query += " AND status = ?"
+            params += (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY updated_at", params).fetchall()
+        for custom_id, verbatim_text, topics in rows:
+            yield {"custom_id": custom_id, "verbatim_text": verbatim_text, "topics": json.loads(topics)}
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM items WHERE run_id = ? GROUP BY status", (self.run_id,)
+            ).fetchall()
+        return {"done": 0, "error": 0, **dict(rows)}
+
+    # ------------------------------------------------------------------
+    # OpenAI batch jobs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def job_key(request_ids: Iterable[str], *parts: object) -> str:
+        """Stable key for a batch job built from *request_ids* (plus e.g. model and pack size)."""
+        digest = hashlib.sha256()
+        for part in (*parts, *request_ids):
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def last_recorded(self, custom_ids: Iterable[str]) -> float:
+        """
+        When any of *custom_ids* last got a result in this run (0.0 if none has).
+        Part of a batch job's key: it stays the same while a job is in flight,
+        and changes once the job's results (e.g. errors) have been journalled,
+        so a resumed run resubmits those items instead of reattaching.
+        """
+        custom_ids = list(custom_ids)
+        latest = 0.0
+        with self._lock:
+            # Stay under SQLite's limit on bound parameters.
+            for start in range(0, len(custom_ids), 900):
+                chunk = custom_ids[start:start + 900]
+                (value,) = self._conn.execute(
+                    f"SELECT MAX(updated_at) FROM items WHERE run_id = ? AND custom_id IN ({','.join('?' * len(chunk))})",
+                    (self.run_id, *chunk),
+                ).fetchone()
+                latest = max(latest, value or 0.0)
+        return latest
+
+    def batch_job(self, job_key: str) -> str | None:
+        """Return the id of a live or completed batch job for *job_key*, if one was submitted."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT batch_job_id, status FROM batch_jobs WHERE run_id = ? AND job_key = ?",
+                (self.run_id, job_key),
+            ).fetchone()
+        if row is None or row[1] in _DEAD_JOB_STATUSES:
+            return None
+        return row[0]
+
+    def record_batch_job(self, job_key: str, batch_job_id: str, status: str = "submitted") -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO batch_jobs VALUES (?, ?, ?, ?, ?)",
+                (self.run_id, job_key, batch_job_id, status, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
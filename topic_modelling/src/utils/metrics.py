@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+from collections import deque
+
+
+class UsageCounters:
+    """
+    Thread-safe request, parse-failure and token counters, grouped by a key
+    such as the JSON strategy in use.
+    """
+
+    FIELDS = ("requests", "parse_failures", "prompt_tokens", "completion_tokens")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: dict[str, dict[str, int]] = {}
+
+    def record(self, key: str, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(key, dict.fromkeys(self.FIELDS, 0))
+            counts["requests"] += 1
+            counts["prompt_tokens"] += prompt_tokens
+            counts["completion_tokens"] += completion_tokens
+
+    def record_parse_failure(self, key: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(key, dict.fromkeys(self.FIELDS, 0))
+            counts["parse_failures"] += 1
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {key: dict(counts) for key, counts in self._counts.items()}
+
+    def print_report(self, title: str = "Usage") -> None:
+        print(f"\n--- {title} ---")
+        for key, c in self.snapshot().items():
+            rate = c["parse_failures"] / c["requests"] if c["requests"] else 0.0
+            print(f"  {key:<10}: {c['requests']} request(s), {c['parse_failures']} parse failure(s) "
+                  f"({rate:.1%}), {c['prompt_tokens']} prompt / {c['completion_tokens']} output tokens")
+
+
+def _quantiles(values) -> dict[str, float]:
+    ordered = sorted(values)
+    return {
+        f"p{round(q * 100)}": ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+        for q in (0.50, 0.95, 0.99)
+    }
+
+
+class RequestTelemetry:
+    """
+    Thread-safe per-request telemetry for a classifier.
+
+    Each LLM request produces one record: queue wait (handed to the worker
+    pool until picked up), latency (the request including retries and
+    backoff), prompt and output tokens, output tokens per second, parse
+    time, retries and status. Records are aggregated in memory for
+    print_report(); with a directory set they are also appended to
+    telemetry_<backend>_<timestamp>.jsonl, and the aggregates are written
+    in Prometheus text format to the matching .prom file (rewritten at most
+    every flush_interval seconds, e.g. for node_exporter's textfile
+    collector). Aggregates cover everything since the telemetry was created.
+    """
+
+    SAMPLE_SIZE = 10_000
+    TIMINGS = ("latency_seconds", "queue_wait_seconds", "parse_seconds", "output_tokens_per_second")
+
+    def __init__(self, backend: str, model: str, directory: str | None = None, flush_interval: float = 10.0):
+        self.backend = backend
+        self.model = model
+        self.flush_interval = flush_interval
+        self.jsonl_path = self.prometheus_path = None
+        self._sink = None
+        if directory:
+            from datetime import datetime
+            from src.utils.io import JsonlSink
+
+            stem = os.path.join(directory, f"telemetry_{backend}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+            self.jsonl_path, self.prometheus_path = f"{stem}.jsonl", f"{stem}.prom"
+            self._sink = JsonlSink(self.jsonl_path)
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._first = self._flushed = None
+        self._totals = {"requests": 0, "errors": 0, "items": 0, "retries": 0,
+                        "prompt_tokens": 0, "completion_tokens": 0}
+        self._sums = dict.fromkeys(self.TIMINGS, 0.0)
+        self._samples = {name: deque(maxlen=self.SAMPLE_SIZE) for name in self.TIMINGS}
+
+    def start(self, kind: str, items: list[dict], queued_at: float | None = None) -> dict:
+        """Open a record for one request about to be sent; *queued_at* is a time.perf_counter() value."""
+        now = time.perf_counter()
+        return {
+            "backend": self.backend,
+            "model": self.model,
+            "kind": kind,
+            "custom_id": items[0]["custom_id"] if items else None,
+            "items": len(items),
+            "queue_wait_seconds": now - queued_at if queued_at is not None else 0.0,
+            "latency_seconds": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "generation_seconds": 0.0,
+            "parse_seconds": 0.0,
+            "retries": 0,
+        }
+
+    def observe(
+        self,
+        sample: dict,
+        seconds: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        generation_seconds: float = 0.0,
+    ) -> None:
+        """Add one API call to *sample* (a request may make several, e.g. two-stage classification)."""
+        sample["latency_seconds"] += seconds
+        sample["prompt_tokens"] += prompt_tokens
+        sample["completion_tokens"] += completion_tokens
+        sample["generation_seconds"] += generation_seconds
+
+    def record(self, sample: dict, ok: bool = True) -> None:
+        """Close *sample*: aggregate it, append it to the JSONL file and refresh the Prometheus file if due."""
+        generation = sample.pop("generation_seconds") or sample["latency_seconds"]
+        sample["output_tokens_per_second"] = sample["completion_tokens"] / generation if generation else 0.0
+        sample["status"] = "ok" if ok else "error"
+        sample["timestamp"] = time.time()
+
+        with self._lock:
+            now = time.perf_counter()
+            self._first = self._first or now
+            totals = self._totals
+            totals["requests"] += 1
+            totals["errors"] += not ok
+            totals["items"] += sample["items"]
+            for name in ("retries", "prompt_tokens", "completion_tokens"):
+                totals[name] += sample[name]
+            for name in self.TIMINGS:
+                self._sums[name] += sample[name]
+                self._samples[name].append(sample[name])
+            if self._sink is not None:
+                self._sink.write({k: round(v, 6) if isinstance(v, float) else v for k, v in sample.items()})
+            due = self.prometheus_path and (self._flushed is None or now - self._flushed >= self.flush_interval)
+            if due:
+                self._flushed = now
+        if due:
+            self.write_prometheus()
+
+    def summary(self) -> dict:
+        with self._lock:
+            elapsed = time.perf_counter() - self._first if self._first else 0.0
+            summary = dict(self._totals)
+            summary["items_per_second"] = summary["items"] / elapsed if elapsed else 0.0
+            for name in self.TIMINGS:
+                summary[name] = {**_quantiles(self._samples[name]), "sum": self._sums[name]}
+        return summary
+
+    def print_report(self) -> None:
+        s = self.summary()
+        if not s["requests"]:
+            return
+        print(f"\n--- Request telemetry [{self.backend}, model={self.model}] ---")
+        print(f"  {s['requests']} request(s), {s['errors']} failed, {s['items']} item(s), "
+              f"{s['retries']} retries, {s['items_per_second']:.2f} items/s")
+        for name, label, unit in (
+            ("latency_seconds", "latency", "s"),
+            ("queue_wait_seconds", "queue wait", "s"),
+            ("parse_seconds", "parse", "s"),
+            ("output_tokens_per_second", "output tok/s", ""),
+        ):
+            q = s[name]
+            print(f"  {label:<12}: p50 {q['p50']:.3f}{unit}, p95 {q['p95']:.3f}{unit}, p99 {q['p99']:.3f}{unit}")
+        print(f"  tokens      : {s['prompt_tokens']} prompt / {s['completion_tokens']} output")
+        if self.jsonl_path:
+            self.write_prometheus()
+            print(f"  Records: {self.jsonl_path}")
+            print(f"  Metrics: {self.prometheus_path}")
+
+    def write_prometheus(self) -> None:
+        """Write the aggregates in Prometheus text format, atomically (write then rename)."""
+        s = self.summary()
+        labels = f'backend="{self.backend}",model="{self.model}"'
+        lines = [
+            "# HELP topic_modelling_requests_total LLM requests by outcome.",
+            "# TYPE topic_modelling_requests_total counter",
+            f'topic_modelling_requests_total{{{labels},status="ok"}} {s["requests"] - s["errors"]}',
+            f'topic_modelling_requests_total{{{labels},status="error"}} {s["errors"]}',
+        ]
+        for name, help_text in (
+            ("items", "Verbatims carried by LLM requests."),
+            ("retries", "Request retries after transient failures."),
+            ("prompt_tokens", "Prompt tokens."),
+            ("completion_tokens", "Output tokens."),
+        ):
+            lines += [
+                f"# HELP topic_modelling_{name}_total {help_text}",
+                f"# TYPE topic_modelling_{name}_total counter",
+                f"topic_modelling_{name}_total{{{labels}}} {s[name]}",
+            ]
+        lines += [
+            "# HELP topic_modelling_items_per_second Verbatims per second since the first request.",
+            "# TYPE topic_modelling_items_per_second gauge",
+            f"topic_modelling_items_per_second{{{labels}}} {s['items_per_second']:.6f}",
+        ]
+        for name in self.TIMINGS:
+            metric = f"topic_modelling_request_{name}"
+            q = s[name]
+            lines += [f"# TYPE {metric} summary"]
+            lines += [f'{metric}{{{labels},quantile="{quantile}"}} {q[p]:.6f}'
+                      for p, quantile in (("p50", "0.5"), ("p95", "0.95"), ("p99", "0.99"))]
+            lines += [f"{metric}_sum{{{labels}}} {q['sum']:.6f}", f"{metric}_count{{{labels}}} {s['requests']}"]
+
+        temporary = f"{self.prometheus_path}.tmp"
+        with self._write_lock:
+            with open(temporary, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(temporary, self.prometheus_path)
+
+    def close(self) -> None:
+        if self._sink is not None:
+            self._sink.close()
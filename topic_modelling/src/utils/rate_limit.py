@@ -0,0 +1,232 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# HTTP statuses worth retrying: timeouts, conflicts, throttling and server errors.
+RETRYABLE_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504}
+# Exception types (by name, so neither SDK has to be imported) that mean the
+# request never got a response.
+_TRANSIENT_ERRORS = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "ConnectError",
+    "ConnectTimeout",
+    "ReadTimeout",
+    "ReadError",
+    "RemoteProtocolError",
+    "PoolTimeout",
+    "NoHealthyHostError",
+}
+
+
+class RetryExhaustedError(RuntimeError):
+    """Raised when a retryable failure persists past the per-item retry budget."""
+
+
+def _parse_retry_after(headers) -> float | None:
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def classify_error(error: Exception) -> tuple[bool, float | None]:
+    """
+    Decide whether *error* is worth retrying.
+
+    Returns:
+        (retryable, retry_after) where retry_after is the server's requested
+        wait in seconds (Retry-After / retry-after-ms), if it sent one.
+    """
+    status = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    retry_after = _parse_retry_after(getattr(response, "headers", None))
+    if status is not None:
+        return status in RETRYABLE_STATUSES, retry_after
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True, None
+    return any(cls.__name__ in _TRANSIENT_ERRORS for cls in type(error).__mro__), retry_after
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at *per_minute* units per
+    minute, holding at most *capacity* (default: one minute's worth). The
+    balance may go negative when a debit is corrected upwards afterwards.
+    """
+
+    def __init__(self, per_minute: float, capacity: float | None = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Debit *amount*; return how long the caller must wait before using it."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def adjust(self, delta: float) -> None:
+        """Correct an earlier debit, e.g. once the real token usage is known."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - delta)
+
+
+class RequestScheduler:
+    """
+    Shared request scheduler for the classifier backends.
+
+    Every call first takes one unit from a requests-per-minute bucket and an
+    estimate of its tokens from a tokens-per-minute bucket (either limit may
+    be 0 = unlimited); once the response arrives the token bucket is
+    corrected with the real usage. Retryable failures (429, 408/409, 5xx,
+    connection errors and timeouts) are retried up to max_retries times with
+    exponential backoff and full jitter, waiting at least as long as the
+    server's Retry-After. A Retry-After also pauses every other caller, so a
+    throttled provider does not get a burst of retries. Terminal failures
+    (other 4xx, bad requests) are raised at once.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.reset_stats()
+
+    # ------------------------------------------------------------------
+    # Public interface
+    # ------------------------------------------------------------------
+
+    def call(self, fn, estimated_tokens: int = 0, usage=None, record: dict | None = None):
+        """
+        Run fn() under the limits, retrying transient failures.
+
+        Args:
+            fn:               Zero-argument callable performing the request.
+            estimated_tokens: Tokens to reserve before the call.
+            usage:            Optional callable mapping the response to the
+                              tokens actually used.
+            record:           Optional telemetry record whose 'retries'
+                              count is incremented on every retry.
+        """
+        attempt = 0
+        while True:
+            time.sleep(self._admit(estimated_tokens))
+            try:
+                response = fn()
+            except Exception as error:
+                delay = self._on_error(error, attempt, estimated_tokens)
+                attempt += 1
+                if record is not None:
+                    record["retries"] += 1
+                time.sleep(delay)
+                continue
+            self._on_success(response, estimated_tokens, usage)
+            return response
+
+    async def acall(self, fn, estimated_tokens: int = 0, usage=None, record: dict | None = None):
+        """Async twin of call(); *fn* returns an awaitable."""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._admit(estimated_tokens))
+            try:
+                response = await fn()
+            except Exception as error:
+                delay = self._on_error(error, attempt, estimated_tokens)
+                attempt += 1
+                if record is not None:
+                    record["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            self._on_success(response, estimated_tokens, usage)
+            return response
+
+    def reset_stats(self) -> None:
+        self.stats = {"calls": 0, "retries": 0, "terminal": 0, "exhausted": 0, "throttled_seconds": 0.0}
+
+    def print_report(self) -> None:
+        s = self.stats
+        if not (s["retries"] or s["terminal"] or s["exhausted"] or s["throttled_seconds"]):
+            return
+        print("\n--- Request scheduler ---")
+        print(f"  {s['calls']} call(s), {s['retries']} retried, {s['terminal']} terminal failure(s), "
+              f"{s['exhausted']} out of retries, {s['throttled_seconds']:.1f}s waiting on rate limits")
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _admit(self, estimated_tokens: int) -> float:
+        """Reserve capacity for one call; return the seconds to wait before sending it."""
+        wait = max(0.0, self._paused_until - time.monotonic())
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None and estimated_tokens:
+            wait = max(wait, self.tokens.reserve(estimated_tokens))
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["throttled_seconds"] += wait
+        return wait
+
+    def _on_success(self, response, estimated_tokens: int, usage) -> None:
+        if self.tokens is not None and usage is not None:
+            self.tokens.adjust(usage(response) - estimated_tokens)
+
+    def _on_error(self, error: Exception, attempt: int, estimated_tokens: int) -> float:
+        """Return the backoff before the next attempt, or raise if there should not be one."""
+        if self.tokens is not None and estimated_tokens:
+            self.tokens.adjust(-estimated_tokens)
+        retryable, retry_after = classify_error(error)
+        with self._lock:
+            if not retryable:
+                self.stats["terminal"] += 1
+                raise error
+            if attempt >= self.max_retries:
+                self.stats["exhausted"] += 1
+                raise RetryExhaustedError(f"gave up after {attempt + 1} attempt(s): {error}") from error
+            self.stats["retries"] += 1
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        return delay
@@ -0,0 +1,259 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+from src.utils.journal import is_error_result
+from config.settings import QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    SQLite work queue for one classification job shared by several machines.
+
+    The coordinator enqueues items and stores the job's options; workers
+    lease a few items at a time, classify them and write the results back.
+    A lease that is not completed or renewed within lease_seconds (e.g. the
+    worker died) is handed to the next worker that asks. Result writes are
+    idempotent: once an item is done, later results for it are ignored, and
+    an error result only counts if it comes from the worker currently
+    holding the lease. Errored items are requeued until they have been
+    attempted max_attempts times.
+
+    The file only has to be reachable by every machine (a network share is
+    enough); no other service is involved. WAL is not used because it does
+    not work across machines on a network file system.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = QUEUE_LEASE_SECONDS,
+        max_attempts: int = QUEUE_MAX_ATTEMPTS,
+    ):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Transactions are managed explicitly so that leases can take the write lock up front.
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS tasks (
+                seq           INTEGER PRIMARY KEY,
+                custom_id     TEXT NOT NULL UNIQUE,
+                verbatim_text TEXT NOT NULL,
+                status        TEXT NOT NULL DEFAULT 'pending',
+                worker        TEXT,
+                lease_expires REAL,
+                attempts      INTEGER NOT NULL DEFAULT 0,
+                topics        TEXT,
+                updated_at    REAL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, seq);
+            CREATE TABLE IF NOT EXISTS workers (
+                worker_id  TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                last_seen  REAL NOT NULL,
+                done       INTEGER NOT NULL DEFAULT 0,
+                errors     INTEGER NOT NULL DEFAULT 0
+            );
+            """
+        )
+
+    # ------------------------------------------------------------------
+    # Coordinator side
+    # ------------------------------------------------------------------
+
+    def set_options(self, options: dict) -> None:
+        self._set_meta("options", json.dumps(options))
+
+    def options(self) -> dict:
+        """Options stored by the coordinator; raises KeyError if there are none yet."""
+        value = self._get_meta("options")
+        if value is None:
+            raise KeyError(f"No job has been set up in {self.path}")
+        return json.loads(value)
+
+    def enqueue(self, items: Iterable[dict], batch_size: int = 1000) -> int:
+        """
+        Add items to the queue, skipping custom_ids already in it (so a
+        restarted coordinator can enqueue the same input again). Returns the
+        number of new items.
+        """
+        self._set_meta("enqueued", "0")
+        added = 0
+        batch = []
+        for item in items:
+            batch.append((item["custom_id"], item["verbatim_text"]))
+            if len(batch) >= batch_size:
+                added += self._insert(batch)
+                batch = []
+        if batch:
+            added += self._insert(batch)
+        self._set_meta("enqueued", "1")
+        return added
+
+    def finished(self) -> bool:
+        """True once everything has been enqueued and no item is pending or leased."""
+        if self._get_meta("enqueued") != "1":
+            return False
+        counts = self.counts()
+        return not (counts["pending"] or counts["leased"])
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {"pending": 0, "leased": 0, "done": 0, "error": 0, **dict(rows)}
+
+    def workers(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT worker_id, started_at, last_seen, done, errors FROM workers ORDER BY started_at"
+            ).fetchall()
+        now = time.time()
+        return [
+            {
+                "worker_id": worker_id,
+                "done": done,
+                "errors": errors,
+                "items_per_second": (done + errors) / max(last_seen - started_at, 1e-9),
+                "alive": now - last_seen < self.lease_seconds,
+            }
+            for worker_id, started_at, last_seen, done, errors in rows
+        ]
+
+    def results(self) -> Iterator[dict]:
+        """Yield finished results (done or out of attempts) in enqueue order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT custom_id, verbatim_text, topics FROM tasks "
+                "WHERE status IN ('done', 'error') ORDER BY seq"
+            ).fetchall()
+        for custom_id, verbatim_text, topics in rows:
+            yield {"custom_id": custom_id, "verbatim_text": verbatim_text, "topics": json.loads(topics)}
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def lease(self, worker_id: str, count: int) -> list[dict]:
+        """
+        Lease up to *count* pending items to *worker_id*, first returning any
+        expired leases to the queue.
+        """
+        now = time.time()
+        with self._lock, self._transaction():
+            # An item whose every attempt outlived its lease is given up on rather than requeued forever.
+            self._conn.execute(
+                "UPDATE tasks SET status = 'error', topics = ?, worker = NULL, updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (json.dumps(["Error: Lease Expired"]), now, now, self.max_attempts),
+            )
+            requeued = self._conn.execute(
+                "UPDATE tasks SET status = 'pending', worker = NULL "
+                "WHERE status = 'leased' AND lease_expires < ?",
+                (now,),
+            ).rowcount
+            rows = self._conn.execute(
+                "SELECT custom_id, verbatim_text FROM tasks WHERE status = 'pending' ORDER BY seq LIMIT ?",
+                (count,),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE custom_id = ?",
+                [(worker_id, now + self.lease_seconds, custom_id) for custom_id, _ in rows],
+            )
+            self._touch(worker_id, now)
+        if requeued:
+            print(f"\nQueue: requeued {requeued} item(s) from expired leases.")
+        return [{"custom_id": custom_id, "verbatim_text": text} for custom_id, text in rows]
+
+    def iter_leases(self, worker_id: str, count: int) -> Iterator[dict]:
+        """Yield leased items, leasing *count* more whenever the last lease is used up, until none are left."""
+        while items := self.lease(worker_id, count):
+            yield from items
+
+    def complete(self, worker_id: str, results: list[dict]) -> None:
+        """Record *results* from *worker_id* and renew the leases it still holds."""
+        now = time.time()
+        done = errors = 0
+        with self._lock, self._transaction():
+            for result in results:
+                topics = json.dumps(result["topics"])
+                if not is_error_result(result):
+                    done += self._conn.execute(
+                        "UPDATE tasks SET status = 'done', topics = ?, worker = ?, updated_at = ? "
+                        "WHERE custom_id = ? AND status != 'done'",
+                        (topics, worker_id, now, result["custom_id"]),
+                    ).rowcount
+                    continue
+                errors += self._conn.execute(
+                    "UPDATE tasks SET topics = ?, updated_at = ?, "
+                    "status = CASE WHEN attempts < ? THEN 'pending' ELSE 'error' END "
+                    "WHERE custom_id = ? AND status = 'leased' AND worker = ?",
+                    (topics, now, self.max_attempts, result["custom_id"], worker_id),
+                ).rowcount
+            self._conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE status = 'leased' AND worker = ?",
+                (now + self.lease_seconds, worker_id),
+            )
+            self._touch(worker_id, now, done, errors)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _transaction(self):
+        """Take the database write lock up front so concurrent leases cannot claim the same rows."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _insert(self, rows: list[tuple[str, str]]) -> int:
+        with self._lock, self._transaction():
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tasks (custom_id, verbatim_text) VALUES (?, ?)", rows
+            )
+            return self._conn.total_changes - before
+
+    def _touch(self, worker_id: str, now: float, done: int = 0, errors: int = 0) -> None:
+        self._conn.execute(
+            "INSERT INTO workers VALUES (?, ?, ?, ?, ?) ON CONFLICT (worker_id) DO UPDATE SET "
+            "last_seen = excluded.last_seen, done = done + excluded.done, errors = errors + excluded.errors",
+            (worker_id, now, now, done, errors),
+        )
+
+    def _set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def _get_meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
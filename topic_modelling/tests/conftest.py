@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The package is run from topic_modelling/ (python main.py), so src and config are top-level.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import pytest
+
+import src.classifiers.async_ollama_classifier as async_module
+from src.classifiers.async_ollama_classifier import AsyncOllamaClassifier
+from src.classifiers.base import make_items
+from src.utils.concurrency import AIMDLimiter
+from src.utils.journal import RunJournal
+
+
+class FakeAsyncClient:
+    """Stands in for ollama.AsyncClient; answers every chat with one topic."""
+
+    calls = 0
+
+    def __init__(self, host=None):
+        self.host = host
+        self.loops = set()
+
+    async def chat(self, **kwargs):
+        FakeAsyncClient.calls += 1
+        self.loops.add(id(asyncio.get_running_loop()))
+        return {"message": {"content": json.dumps({"topics": ["Teaching"]})}, "eval_count": 5}
+
+
+class CountingLimiter(AIMDLimiter):
+    instances: list["CountingLimiter"] = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.slots = 0
+        CountingLimiter.instances.append(self)
+
+    def slot(self):
+        self.slots += 1
+        return super().slot()
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    FakeAsyncClient.calls = 0
+    CountingLimiter.instances = []
+    monkeypatch.setattr(async_module, "AsyncClient", FakeAsyncClient)
+    monkeypatch.setattr(async_module, "AIMDLimiter", CountingLimiter)
+
+
+def test_classify_iter_uses_the_adaptive_limiter(fakes, tmp_path):
+    journal = RunJournal(path=str(tmp_path / "runs.sqlite3"))
+    journal.start({})
+    items = make_items([f"verbatim {n}" for n in range(12)])
+    journal.record({**items[0], "topics": ["Teaching"]})
+
+    classifier = AsyncOllamaClassifier("stub-model", hosts=["http://127.0.0.1:9"], min_concurrency=1, max_concurrency=4)
+    results = list(classifier.classify_iter(items, max_in_flight=5, pending=journal.pending))
+    classifier.close()
+    journal.close()
+
+    assert [r["custom_id"] for r in results] == [item["custom_id"] for item in items[1:]]
+    assert FakeAsyncClient.calls == 11
+    # One limiter per chunk ([1..4], [5..9], [10, 11]), and every request went through it.
+    assert [limiter.slots for limiter in CountingLimiter.instances] == [4, 5, 2]
+
+
+def test_host_pool_gets_a_fresh_async_client_per_event_loop(fakes):
+    classifier = AsyncOllamaClassifier("stub-model", hosts=["http://127.0.0.1:9", "http://127.0.0.1:10"])
+    created = []
+
+    def factory(host):
+        client = FakeAsyncClient(host)
+        created.append(client)
+        return client
+
+    classifier.client._async_client_factory = factory
+    results = list(classifier.classify_iter(make_items(["a", "b", "c", "d"]), max_in_flight=2))
+    classifier.close()
+
+    assert len(results) == 4
+    # Each chunk runs in its own event loop; a client must never be reused on a later one.
+    assert all(len(client.loops) == 1 for client in created)
+    assert sum(limiter.slots for limiter in CountingLimiter.instances) == 4
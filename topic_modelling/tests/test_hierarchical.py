@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from src.classifiers.hierarchical_classifier import HierarchicalOllamaClassifier
+from src.classifiers.ollama_classifier import OllamaClassifier
+from src.prompts import NO_MATCH
+from src.utils.cache import ClassificationCache
+
+ITEM = {"custom_id": "verbatim_1", "verbatim_text": "The trainer was great"}
+TAXONOMY = {"Delivery": ["Teaching", "Pace"], "Logistics": ["Venue"]}
+HOSTS = ["http://127.0.0.1:9"]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ClassificationCache(str(tmp_path / "cache.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def scripted(cache, *answers, **kwargs):
+    """A hierarchical classifier whose chat requests return *answers* in order."""
+    classifier = HierarchicalOllamaClassifier("stub-model", taxonomy=TAXONOMY, cache=cache, hosts=HOSTS, **kwargs)
+    replies = iter(answers)
+    classifier._chat = lambda kwargs, sample=None: {"message": {"content": next(replies)}}
+    return classifier
+
+
+@pytest.mark.parametrize("answer", ["not json", "[]", json.dumps({}), json.dumps({"categories": "Delivery"})])
+def test_unusable_categories_are_errors_and_not_cached(cache, answer):
+    classifier = scripted(cache, answer)
+    result = classifier._request_one(ITEM)
+    assert result["topics"] == ["Error: Invalid categories"]
+    assert cache.get(classifier.cache_scope, ITEM["verbatim_text"]) is None
+
+
+@pytest.mark.parametrize("categories", [[], [NO_MATCH]])
+def test_zero_categories_mean_no_match(cache, categories):
+    classifier = scripted(cache, json.dumps({"categories": categories}))
+    assert classifier._request_one(ITEM)["topics"] == [NO_MATCH]
+    assert cache.get(classifier.cache_scope, ITEM["verbatim_text"]) == [NO_MATCH]
+
+
+def test_subset_answer_is_cached(cache):
+    classifier = scripted(cache, json.dumps({"categories": ["Delivery"]}), json.dumps({"topics": ["Teaching", "Venue"]}))
+    assert classifier._request_one(ITEM)["topics"] == ["Teaching"]
+    assert cache.get(classifier.cache_scope, ITEM["verbatim_text"]) == ["Teaching"]
+
+
+def test_cache_scope_is_separate_from_flat_runs(cache):
+    flat = OllamaClassifier("stub-model", cache=cache, hosts=HOSTS)
+    hierarchical = HierarchicalOllamaClassifier("stub-model", taxonomy=TAXONOMY, cache=cache, hosts=HOSTS)
+    cache.put(flat.cache_scope, ITEM["verbatim_text"], ["Venue"])
+    assert cache.get(hierarchical.cache_scope, ITEM["verbatim_text"]) is None
+
+    other = HierarchicalOllamaClassifier("stub-model", taxonomy={"Delivery": ["Teaching"]}, cache=cache, hosts=HOSTS)
+    assert len({flat.cache_scope, hierarchical.cache_scope, other.cache_scope}) == 3
@@ -0,0 +1,78 @@
+import asyncio
+
+from src.classifiers.ollama_classifier import OllamaClassifier
+from src.utils.host_pool import HostPool
+
+
+class StubClient:
+    def __init__(self, host=None):
+        self.host = host
+
+    def chat(self, **kwargs):
+        return {"host": self.host}
+
+
+class StubAsyncClient:
+    """Answers after a per-host delay, so one host reliably loses every hedge."""
+
+    delays = {"http://fast": 0.01, "http://slow": 0.5}
+
+    def __init__(self, host=None):
+        self.host = host
+
+    async def chat(self, **kwargs):
+        await asyncio.sleep(self.delays[self.host])
+        return {"host": self.host}
+
+
+def make_pool(**kwargs) -> HostPool:
+    return HostPool(
+        ["http://fast", "http://slow"],
+        client_factory=StubClient,
+        async_client_factory=StubAsyncClient,
+        probe_interval=3600,
+        **kwargs,
+    )
+
+
+def test_lost_hedges_do_not_evict_a_slow_host():
+    pool = make_pool(hedge_percentile=50, hedge_min_samples=1, max_failures=2)
+    slow = next(h for h in pool.hosts if h.url == "http://slow")
+
+    async def run():
+        answers = []
+        for _ in range(5):
+            pool._recent_latencies.extend([0.01] * 5)
+            # Route the primary request to the slow host so the fast hedge wins.
+            slow.in_flight -= 1
+            try:
+                answers.append(await pool.achat(model="m"))
+            finally:
+                slow.in_flight += 1
+        await asyncio.sleep(0.01)  # let the cancelled requests release their hosts
+        return answers
+
+    answers = asyncio.run(run())
+    pool.close()
+
+    assert [a["host"] for a in answers] == ["http://fast"] * 5
+    stats = {s["host"]: s for s in pool.stats()}
+    assert stats["http://slow"]["healthy"]
+    assert stats["http://slow"]["failures"] == 0
+    assert stats["http://slow"]["in_flight"] == 0
+    assert stats["http://fast"]["hedges"] == 5
+
+
+def test_close_stops_the_probe_thread_and_hedge_executor():
+    pool = make_pool(hedge_percentile=95)
+    pool.close()
+    pool._prober.join(timeout=1)
+    assert not pool._prober.is_alive()
+    assert pool._hedge_executor._shutdown
+
+
+def test_classifier_close_closes_its_host_pool():
+    classifier = OllamaClassifier("stub-model", hosts=["http://127.0.0.1:9", "http://127.0.0.1:10"])
+    classifier.close()
+    classifier.client._prober.join(timeout=1)
+    assert not classifier.client._prober.is_alive()
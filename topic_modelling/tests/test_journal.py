@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+
+import src.classifiers.openai_classifier as openai_module
+from src.classifiers.base import BaseClassifier, make_items
+from src.classifiers.openai_classifier import OpenAIBatchClassifier
+from src.utils.journal import RunJournal
+
+
+class ChunkRecorder(BaseClassifier):
+    stream_chunk_size = 3
+
+    def __init__(self):
+        self.chunks = []
+
+    def classify_items(self, items):
+        self.chunks.append([item["custom_id"] for item in items])
+        return [{**item, "topics": ["Teaching"]} for item in items]
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "runs.sqlite3")
+
+
+@pytest.fixture
+def journal(journal_path):
+    journal = RunJournal(path=journal_path)
+    journal.start({})
+    yield journal
+    journal.close()
+
+
+def test_resume_keeps_chunk_boundaries(journal):
+    items = make_items(list("abcdef"))
+    journal.record({**items[1], "topics": ["Teaching"]})
+    journal.record({**items[2], "topics": ["Error: API Call Failed"]})
+
+    classifier = ChunkRecorder()
+    results = list(classifier.classify_iter(items, pending=journal.pending))
+
+    # Chunks are cut from the full input, then filtered: verbatim_2 is done, the errored verbatim_3 is retried.
+    assert classifier.chunks == [["verbatim_1", "verbatim_3"], ["verbatim_4", "verbatim_5", "verbatim_6"]]
+    assert len(results) == 5
+
+
+def job_keys(journal, items, retries=0) -> list[str]:
+    classifier = OpenAIBatchClassifier(model="stub", client=object(), journal=journal, max_requests_per_file=2)
+    return [shard.job_key for shard in classifier._create_batch_inputs(items, "test", retries=retries)]
+
+
+def test_batch_job_keys(journal, journal_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(openai_module, "INPUT_DIR", str(tmp_path / "inputs"))
+    items = make_items(["a", "b", "c"])
+    first = job_keys(journal, items)
+
+    # A resumed run that never saw results rebuilds the same keys, so in-flight jobs are reattached.
+    resumed = RunJournal(journal.run_id, path=journal_path)
+    assert job_keys(resumed, items) == first
+
+    # Once a job's items are journalled as errors, retrying them must not reuse that job.
+    resumed.record({**items[0], "topics": ["Error: API Call Failed"]})
+    resumed.record({**items[1], "topics": ["Error: API Call Failed"]})
+    after_errors = job_keys(resumed, items)
+    assert after_errors[0] != first[0]
+    assert after_errors[1] == first[1]
+
+    # A retry round never collides with the round it retries.
+    assert job_keys(resumed, items, retries=1)[1] != first[1]
+    resumed.close()
+
+
+def test_old_runs_are_pruned(journal, journal_path):
+    journal.record({"custom_id": "verbatim_1", "verbatim_text": "a", "topics": ["Teaching"]})
+    journal.record_batch_job("key", "batch_1", "completed")
+    with sqlite3.connect(journal_path) as conn:
+        conn.execute("UPDATE runs SET created_at = 0")
+
+    current = RunJournal(path=journal_path, max_age_days=30)
+    with sqlite3.connect(journal_path) as conn:
+        counts = [conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ("runs", "items", "batch_jobs")]
+    current.close()
+    assert counts == [0, 0, 0]
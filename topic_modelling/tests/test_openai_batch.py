@@ -0,0 +1,94 @@
+import json
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+import src.classifiers.openai_classifier as openai_module
+from src.classifiers.base import NO_RESULT, make_items
+from src.classifiers.openai_classifier import OpenAIBatchClassifier
+from src.utils.cache import ClassificationCache
+
+
+class FakeBatchClient:
+    """Files and batches API whose jobs complete at once, answering every request with ["Teaching"]."""
+
+    def __init__(self, drop=()):
+        self.drop = set(drop)
+        self.contents: dict[str, list[str]] = {}
+        self.jobs: dict[str, SimpleNamespace] = {}
+        self.files = SimpleNamespace(
+            create=self._create_file,
+            with_streaming_response=SimpleNamespace(content=self._content),
+        )
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=lambda job_id: self.jobs[job_id])
+
+    def _create_file(self, file, purpose):
+        file_id = f"file_{len(self.contents)}"
+        self.contents[file_id] = file.read().decode("utf-8").splitlines()
+        return SimpleNamespace(id=file_id)
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        output = []
+        for line in self.contents[input_file_id]:
+            request = json.loads(line)
+            if request["custom_id"] in self.drop:
+                continue
+            verbatim = request["body"]["messages"][-1]["content"]
+            answer = {"verbatim_text": verbatim, "topics": ["Teaching"]}
+            body = {"choices": [{"message": {"content": json.dumps(answer)}}], "usage": {}}
+            output.append(json.dumps({"custom_id": request["custom_id"], "response": {"body": body}}))
+        output_id = f"file_{len(self.contents)}"
+        self.contents[output_id] = output
+        job = SimpleNamespace(id=f"batch_{len(self.jobs)}", status="completed", output_file_id=output_id,
+                              error_file_id=None, errors=None)
+        self.jobs[job.id] = job
+        return job
+
+    @contextmanager
+    def _content(self, file_id):
+        yield SimpleNamespace(iter_lines=lambda: iter(self.contents[file_id]))
+
+
+@pytest.fixture(autouse=True)
+def batch_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(openai_module, "INPUT_DIR", str(tmp_path / "inputs"))
+    monkeypatch.setattr(openai_module, "OUTPUT_DIR", str(tmp_path / "outputs"))
+
+
+def classifier(client, **kwargs):
+    return OpenAIBatchClassifier(model="stub", client=client, poll_interval=0, max_requests_per_file=2, **kwargs)
+
+
+def test_classify_iter_reads_results_back_shard_by_shard(tmp_path, monkeypatch):
+    items = make_items(["a", "b", "c", "d", "e"])
+    reads = []
+    real_iter_results = openai_module.iter_results
+    monkeypatch.setattr(openai_module, "iter_results", lambda path: reads.append(path) or real_iter_results(path))
+
+    results = list(classifier(FakeBatchClient(drop={"verbatim_4"})).classify_iter(items))
+
+    assert len(reads) == 3
+    assert [r["custom_id"] for r in results] == ["verbatim_1", "verbatim_2", "verbatim_3", "verbatim_5", "verbatim_4"]
+    assert results[-1]["topics"] == [NO_RESULT]
+    assert all(r["topics"] == ["Teaching"] for r in results[:-1])
+
+
+def test_download_results_returns_a_count():
+    client = FakeBatchClient()
+    batch = classifier(client)
+    shard = batch._run_batch_jobs(make_items(["a", "b"]), "test", pack_size=1)[0]
+    assert batch._download_results(shard.job, "completed", "again", shard.items, shard=shard) == 2
+
+
+def test_classify_items_is_in_input_order_and_cached(tmp_path):
+    cache = ClassificationCache(str(tmp_path / "cache.sqlite3"))
+    cache.put("stub", "c", ["Venue"])
+    items = make_items(["a", "b", "c", "d"])
+
+    results = classifier(FakeBatchClient(), cache=cache).classify_items(items)
+
+    assert [r["custom_id"] for r in results] == [item["custom_id"] for item in items]
+    assert results[2]["topics"] == ["Venue"]
+    assert cache.get("stub", "d") == ["Teaching"]
+    cache.close()
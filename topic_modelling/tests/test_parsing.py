@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from src.classifiers.ollama_classifier import OllamaClassifier
+from src.classifiers.packing import parse_packed
+from src.prompts import NO_MATCH
+from src.utils.cache import ClassificationCache
+
+ITEM = {"custom_id": "verbatim_1", "verbatim_text": "The trainer was great"}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ClassificationCache(str(tmp_path / "cache.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def classifier(cache, json_strategy="json_mode", output_mode="full"):
+    # A single host builds a plain ollama.Client, which connects lazily.
+    return OllamaClassifier(
+        "stub-model", json_strategy=json_strategy, output_mode=output_mode, cache=cache, hosts=["http://127.0.0.1:9"]
+    )
+
+
+def reply(content) -> dict:
+    return {"message": {"content": content if isinstance(content, str) else json.dumps(content)}}
+
+
+def test_no_json_is_an_error_and_not_cached(cache):
+    result = classifier(cache, json_strategy="regex")._handle_single(ITEM, reply("Sorry, I can't help with that."))
+    assert result["topics"] == ["Error: No JSON in response"]
+    assert cache.get("stub-model", ITEM["verbatim_text"]) is None
+
+
+@pytest.mark.parametrize("answer", [{"topics": []}, {"verbatim_text": "x"}, {"topics": None}])
+def test_empty_or_missing_topics_mean_no_match(cache, answer):
+    result = classifier(cache)._handle_single(ITEM, reply(answer))
+    assert result["topics"] == [NO_MATCH]
+    assert cache.get("stub-model", ITEM["verbatim_text"]) == [NO_MATCH]
+
+
+@pytest.mark.parametrize("answer", [{"topics": "Teaching"}, {"topics": [1, 2]}, ["Teaching"]])
+def test_malformed_topics_are_errors_and_not_cached(cache, answer):
+    result = classifier(cache)._handle_single(ITEM, reply(answer))
+    assert result["topics"][0].startswith("Error")
+    assert cache.get("stub-model", ITEM["verbatim_text"]) is None
+
+
+def test_compact_empty_topics_mean_no_match(cache):
+    result = classifier(cache, output_mode="compact")._handle_single(ITEM, reply({"topics": []}))
+    assert result["topics"] == [NO_MATCH]
+
+
+def test_packed_entries_are_validated():
+    items = [ITEM, {"custom_id": "verbatim_2", "verbatim_text": "b"}, {"custom_id": "verbatim_3", "verbatim_text": "c"}]
+    data = {"results": [
+        {"custom_id": "verbatim_1", "topics": []},
+        {"custom_id": "verbatim_2", "topics": [3]},
+        {"custom_id": "verbatim_3", "topics": ["Teaching"]},
+    ]}
+    assert parse_packed(data, items) == {"verbatim_1": [NO_MATCH], "verbatim_3": ["Teaching"]}
@@ -0,0 +1,51 @@
+import pytest
+
+import main
+from src.classifiers.base import BaseClassifier, make_items
+from src.utils.io import load_results
+from src.utils.journal import RunJournal
+
+
+class StubClassifier(BaseClassifier):
+    def __init__(self):
+        self.classified = []
+
+    def classify_items(self, items):
+        self.classified += [item["custom_id"] for item in items]
+        return [{**item, "topics": ["Teaching"]} for item in items]
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "runs.sqlite3")
+
+
+@pytest.mark.parametrize("extension", ["jsonl", "parquet"])
+def test_rerunning_into_the_same_output_rewrites_it(tmp_path, journal_path, extension):
+    output = str(tmp_path / f"results.{extension}")
+    items = make_items(["a", "b", "c"])
+    for _ in range(2):
+        journal = RunJournal(path=journal_path)
+        journal.start({})
+        main.classify_to_sink(StubClassifier(), items, output, journal)
+        journal.close()
+
+    assert [r["custom_id"] for r in load_results(output)] == ["verbatim_1", "verbatim_2", "verbatim_3"]
+
+
+def test_resume_rewrites_done_results_then_classifies_the_rest(tmp_path, journal_path):
+    output = str(tmp_path / "results.jsonl")
+    items = make_items(["a", "b", "c"])
+    journal = RunJournal(path=journal_path)
+    journal.start({})
+    journal.record({**items[0], "topics": ["Teaching"]})
+    journal.record({**items[1], "topics": ["Error: API Call Failed"]})
+    with open(output, "w") as f:
+        f.write('{"custom_id": "stale"}\n')
+
+    resumed = RunJournal(journal.run_id, path=journal_path)
+    classifier = StubClassifier()
+    main.classify_to_sink(classifier, items, output, resumed, resume=True)
+
+    assert classifier.classified == ["verbatim_2", "verbatim_3"]
+    assert sorted(r["custom_id"] for r in load_results(output)) == ["verbatim_1", "verbatim_2", "verbatim_3"]
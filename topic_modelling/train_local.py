@@ -0,0 +1,80 @@
+"""
+Topic Modelling — distil LLM labels into a local classifier.
+
+Trains the LocalClassifier (TF-IDF + linear head, NumPy weights) on results
+saved by main.py, evaluates it on a held-out split against the LLM labels,
+and saves it under models/ tagged with the current TOPICS version.
+
+Usage:
+    python train_local.py output/topic_model_batch_outputs/results_<run-id>.jsonl
+    python train_local.py run1.jsonl run2.json --holdout 0.2 --epochs 40
+"""
+
+import argparse
+import hashlib
+import json
+
+from src.classifiers.local_classifier import LocalClassifier, topics_version
+from src.utils.io import load_results
+from src.utils.journal import is_error_result
+
+
+def split_holdout(examples: list[dict], fraction: float) -> tuple[list[dict], list[dict]]:
+    """Deterministic train/held-out split on a hash of the verbatim text."""
+    train, held_out = [], []
+    for example in examples:
+        digest = hashlib.sha256(example["verbatim_text"].encode("utf-8")).hexdigest()
+        (held_out if int(digest[:8], 16) / 0xFFFFFFFF < fraction else train).append(example)
+    return train, held_out
+
+
+def print_evaluation(report: dict) -> None:
+    print(f"\n--- Held-out evaluation against LLM labels ({report['examples']} verbatims) ---")
+    print(f"  Exact match : {report['exact_match']:.1%}")
+    micro = report["micro"]
+    print(f"  Micro       : P {micro['precision']:.3f}  R {micro['recall']:.3f}  F1 {micro['f1']:.3f}")
+    print(f"  Macro F1    : {report['macro_f1']:.3f}")
+    for topic, s in report["per_topic"].items():
+        if s["support"]:
+            print(f"    {topic:<40} P {s['precision']:.3f}  R {s['recall']:.3f}  "
+                  f"F1 {s['f1']:.3f}  (n={s['support']})")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train the local topic classifier from LLM results")
+    parser.add_argument("results", nargs="+", help="Saved results files (JSON or JSONL)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share held out for evaluation (default: 0.2)")
+    parser.add_argument("--epochs", type=int, default=30, help="Training epochs (default: 30)")
+    parser.add_argument("--max-features", type=int, default=20_000, help="TF-IDF vocabulary size (default: 20000)")
+    parser.add_argument("--output", default=None, help="Model path (default: models/local_<topics version>_<timestamp>.npz)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    # Deduplicate on custom_id + text; later files win.
+    examples = {}
+    for path in args.results:
+        for result in load_results(path):
+            examples[(result["custom_id"], result["verbatim_text"])] = result
+    # "Error: ..." results are not labels; held out, they would be scored as "No Match".
+    usable = [result for result in examples.values() if not is_error_result(result)]
+    if len(usable) < len(examples):
+        print(f"Dropped {len(examples) - len(usable)} error result(s).")
+    train, held_out = split_holdout(usable, args.holdout)
+    print(f"{len(train)} training and {len(held_out)} held-out verbatim(s) "
+          f"[topics version {topics_version()}]")
+
+    model = LocalClassifier.train(train, epochs=args.epochs, max_features=args.max_features)
+    if held_out:
+        report = model.evaluate(held_out)
+        print_evaluation(report)
+        model.metadata["evaluation"] = {k: v for k, v in report.items() if k != "per_topic"}
+
+    model.save(args.output)
+    print(json.dumps(model.metadata, indent=4))
+
+
+if __name__ == "__main__":
+    main()
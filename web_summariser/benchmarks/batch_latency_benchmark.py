@@ -0,0 +1,182 @@
+"""
+Benchmark: batch latency with pooled keep-alive sessions vs a new connection per request.
+
+Starts local page servers (one per simulated host) and a stub Ollama
+/api/chat server, then summarises the same batch of URLs twice with
+OllamaSummariser: once with the pooled sessions get_summariser builds, and
+once with every request sent as "Connection: close", i.e. a fresh TCP
+connection per page and per chat call, as module-level requests.get/post
+did. Every new connection costs --handshake-ms on the server side, standing
+in for the TCP + TLS handshake a real remote host would need (the local
+servers are plain HTTP on loopback, where a handshake is nearly free).
+
+Reports wall time, per-URL latency (p50/p95) and connections opened.
+
+Usage (from web_summariser/):
+    python -m benchmarks.batch_latency_benchmark
+    python -m benchmarks.batch_latency_benchmark --urls 200 --hosts 5 --handshake-ms 60
+    python -m benchmarks.batch_latency_benchmark --concurrency 4 --fetch-workers 8 --output batch.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.pipeline import summarise_concurrently
+from src.scraper import make_session
+from src.summariser import OllamaSummariser
+
+_PAGE = (
+    "<html><head><title>Page {n}</title></head><body><h1>Story {n}</h1>"
+    + "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit. </p>" * 40
+    + "<script>var x = 1;</script></body></html>"
+)
+
+
+class _StubServer(ThreadingHTTPServer):
+    """Serves pages on GET and Ollama-style chat answers on POST /api/chat."""
+
+    daemon_threads = True
+
+    def __init__(self, handshake: float, page_latency: float, llm_latency: float):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.handshake = handshake
+        self.page_latency = page_latency
+        self.llm_latency = llm_latency
+        self.connections = 0
+        self._lock = threading.Lock()
+        self.url = f"http://127.0.0.1:{self.server_port}"
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def count_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: _StubServer
+
+    def setup(self):
+        super().setup()
+        self.server.count_connection()
+        time.sleep(self.server.handshake)
+
+    def do_GET(self):
+        time.sleep(self.server.page_latency)
+        self._send(_PAGE.format(n=self.path.strip("/")).encode("utf-8"), "text/html")
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.server.llm_latency)
+        body = {"message": {"role": "assistant", "content": "## Summary\n\nA stub summary."}, "done": True}
+        self._send(json.dumps(body).encode("utf-8"), "application/json")
+
+    def _send(self, payload: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def build_summariser(llm_url: str, pooled: bool) -> OllamaSummariser:
+    """An OllamaSummariser with the sessions get_summariser builds (auto_pull off, nothing to pull)."""
+    page_session = make_session(max_connections_per_host=16)
+    llm_session = make_session(max_connections_per_host=16, retry_methods=frozenset({"POST"}))
+    if not pooled:
+        for session in (page_session, llm_session):
+            session.headers["Connection"] = "close"
+    return OllamaSummariser(
+        model="stub",
+        api_base=f"{llm_url}/api/chat",
+        scraper_config={"session": page_session},
+        auto_pull=False,
+        session=llm_session,
+    )
+
+
+def run_mode(pooled: bool, urls: list[str], servers: list[_StubServer], args) -> dict:
+    for server in servers:
+        server.connections = 0
+    summariser = build_summariser(servers[-1].url, pooled)
+
+    latencies = []
+    started = time.perf_counter()
+    if args.concurrency:
+        # Per-URL latency is not observable inside the pipeline; use completion times instead.
+        for _ in summarise_concurrently(summariser, urls, args.fetch_workers or args.concurrency, args.concurrency):
+            latencies.append(time.perf_counter() - started)
+    else:
+        for url in urls:
+            begun = time.perf_counter()
+            summariser.summarise(url)
+            latencies.append(time.perf_counter() - begun)
+    wall = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "wall_seconds": round(wall, 3),
+        "urls_per_second": round(len(urls) / wall, 2),
+        "latency_p50": round(quantiles[49], 4),
+        "latency_p95": round(quantiles[94], 4),
+        "connections": sum(server.connections for server in servers),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Batch latency: pooled sessions vs a connection per request")
+    parser.add_argument("--urls", type=int, default=100, help="URLs in the batch (default: 100)")
+    parser.add_argument("--hosts", type=int, default=4, help="Simulated page hosts (default: 4)")
+    parser.add_argument("--handshake-ms", type=float, default=40.0,
+                        help="Server-side cost of each new connection (default: 40)")
+    parser.add_argument("--page-ms", type=float, default=5.0, help="Page response time (default: 5)")
+    parser.add_argument("--llm-ms", type=float, default=20.0, help="Chat response time (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Run as a pipeline with this many LLM workers (default: sequential)")
+    parser.add_argument("--fetch-workers", type=int, default=None)
+    parser.add_argument("--output", default=None, help="Save the results as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    timings = (args.handshake_ms / 1000, args.page_ms / 1000, args.llm_ms / 1000)
+    page_servers = [_StubServer(*timings) for _ in range(args.hosts)]
+    llm_server = _StubServer(*timings)
+    servers = page_servers + [llm_server]
+    urls = [f"{page_servers[n % args.hosts].url}/{n}" for n in range(args.urls)]
+
+    mode = f"pipeline {args.fetch_workers or args.concurrency}/{args.concurrency}" if args.concurrency else "sequential"
+    print(f"\n--- Batch latency [{args.urls} URLs, {args.hosts} host(s), {mode}, "
+          f"handshake {args.handshake_ms:.0f} ms, page {args.page_ms:.0f} ms, LLM {args.llm_ms:.0f} ms] ---")
+    print(f"  {'sessions':<22}{'wall s':>9}{'URLs/s':>9}{'p50 s':>9}{'p95 s':>9}{'conns':>8}")
+    report = {"python": platform.python_version(), "settings": vars(args), "modes": {}}
+    for name, pooled in (("connection per request", False), ("pooled keep-alive", True)):
+        result = run_mode(pooled, urls, servers, args)
+        report["modes"][name] = result
+        print(f"  {name:<22}{result['wall_seconds']:>9.2f}{result['urls_per_second']:>9.1f}"
+              f"{result['latency_p50']:>9.3f}{result['latency_p95']:>9.3f}{result['connections']:>8}")
+
+    unpooled, pooled = report["modes"].values()
+    print(f"\n  Pooled sessions: {1 - pooled['wall_seconds'] / unpooled['wall_seconds']:.0%} less wall time, "
+          f"{unpooled['connections'] - pooled['connections']} fewer connections.")
+
+    for server in servers:
+        server.shutdown()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nResults saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,12 @@ python cli.py batch tests/data/batch_urls.json
 
 # Batch with Ollama, save all summaries and a report
 python cli.py --provider ollama batch tests/data/batch_urls.json --save
+
+# Batch as a pipeline: 8 threads fetching pages, 2 calling the model
+python cli.py batch tests/data/batch_urls.json --concurrency 2 --fetch-workers 8
+
+# Download every page again, ignoring the page cache
+python cli.py --no-cache batch tests/data/batch_urls.json
 """
 
 from __future__ import annotations
@@ -25,11 +31,8 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
-from dotenv import load_dotenv
-
-# Explicitly load the .env that lives next to this file so the correct key
-# is always picked up regardless of which directory the CLI is run from.
-load_dotenv(dotenv_path=Path(__file__).parent / ".env", override=True)
+# Provider SDKs, the scraper and python-dotenv are imported only once a
+# sub-command needs them, so --help and argument errors return immediately.
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -38,6 +41,18 @@ load_dotenv(dotenv_path=Path(__file__).parent / ".env", override=True)
 _ROOT = Path(__file__).parent
 
 
+def _load_env() -> None:
+    """
+    Explicitly load the .env that lives next to this file so the correct key
+    is always picked up regardless of which directory the CLI is run from.
+    """
+    env_path = _ROOT / ".env"
+    if env_path.exists():
+        from dotenv import load_dotenv
+
+        load_dotenv(dotenv_path=env_path, override=True)
+
+
 def _load_config(config_path: Path | str = _ROOT / "config.json") -> dict:
     with open(config_path) as fh:
         return json.load(fh)
@@ -79,6 +94,7 @@ def _cmd_single(args: argparse.Namespace, config: dict) -> None:
 
 
 def _cmd_batch(args: argparse.Namespace, config: dict) -> None:
+    from src.pipeline import batch_report, summarise_batch
     from src.summariser import get_summariser
 
     input_path = Path(args.input_file)
@@ -96,36 +112,41 @@ def _cmd_batch(args: argparse.Namespace, config: dict) -> None:
     summariser = get_summariser(args.provider, config)
     print(f"Provider : {args.provider}")
     print(f"URLs     : {len(urls)}")
+    if args.concurrency:
+        fetch_workers = args.fetch_workers or args.concurrency
+        print(f"Workers  : {fetch_workers} fetch, {args.concurrency} LLM")
     print("=" * 60)
 
-    results: list[dict] = []
     output_dir = _ROOT / config["output"]["directory"]
 
-    for idx, url in enumerate(urls, 1):
-        print(f"\n[{idx}/{len(urls)}] {url}")
+    def report(done: int, index: int, result: dict) -> None:
+        position = f" (#{index + 1})" if args.concurrency else ""
+        print(f"\n[{done}/{len(urls)}] {result['url']}{position}")
         print("-" * 60)
-        try:
-            summary = summariser.summarise(url)
-            results.append({"url": url, "summary": summary, "status": "success"})
-            print(summary)
-            if args.save:
-                path = _save_summary(url, summary, output_dir)
-                print(f"\nSaved → {path}")
-        except Exception as exc:  # noqa: BLE001
-            msg = f"ERROR: {exc}"
-            print(msg, file=sys.stderr)
-            results.append({"url": url, "error": str(exc), "status": "failed"})
+        if result["status"] != "success":
+            print(f"ERROR: {result['error']}", file=sys.stderr)
+            return
+        print(result["summary"])
+        if args.save:
+            path = _save_summary(result["url"], result["summary"], output_dir)
+            print(f"\nSaved → {path}")
+
+    results = summarise_batch(
+        summariser, urls, args.concurrency, args.fetch_workers, on_result=report
+    )
 
     # Summary line
     success_count = sum(1 for r in results if r["status"] == "success")
     print("\n" + "=" * 60)
     print(f"Done: {success_count}/{len(urls)} succeeded.")
+    if summariser.http_cache is not None:
+        print(summariser.http_cache.summary())
 
     if args.save:
         output_dir.mkdir(parents=True, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_path = output_dir / f"batch_report_{timestamp}.json"
-        report_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        report_path.write_text(json.dumps(batch_report(summariser, results), indent=2), encoding="utf-8")
         print(f"Batch report → {report_path}")
 
 
@@ -153,6 +174,11 @@ def _build_parser(config: dict) -> argparse.ArgumentParser:
         default=str(_ROOT / "config.json"),
         help="Path to config.json (default: ./config.json)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Fetch every page, ignoring the on-disk page cache set up in config.json.",
+    )
 
     sub = parser.add_subparsers(dest="command", required=True)
 
@@ -176,6 +202,21 @@ def _build_parser(config: dict) -> argparse.ArgumentParser:
         action="store_true",
         help="Write each summary and a batch report to the output/ folder.",
     )
+    batch.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Run the batch as a pipeline with N LLM workers fed by page-fetching workers "
+             "through a bounded queue (default: one URL at a time).",
+    )
+    batch.add_argument(
+        "--fetch-workers",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Page-fetching workers for --concurrency (default: same as --concurrency).",
+    )
 
     return parser
 
@@ -189,7 +230,10 @@ def main() -> None:
     # Allow --config override to reload
     if args.config != str(_ROOT / "config.json"):
         config = _load_config(args.config)
+    if args.no_cache:
+        config.pop("cache", None)
 
+    _load_env()
     if args.command == "single":
         _cmd_single(args, config)
     elif args.command == "batch":
@@ -1,4 +1,20 @@
-from .scraper import Website
-from .summariser import get_summariser, OpenAISummariser, OllamaSummariser
+__all__ = ["Website", "HttpCache", "get_summariser", "OpenAISummariser", "OllamaSummariser", "summarise_concurrently"]
 
-__all__ = ["Website", "get_summariser", "OpenAISummariser", "OllamaSummariser"]
+# Exports are resolved on first access so that importing one submodule
+# (e.g. src.prompts) does not pull in requests, BeautifulSoup or openai.
+_EXPORTS = {
+    "Website": ".scraper",
+    "HttpCache": ".scraper",
+    "get_summariser": ".summariser",
+    "OpenAISummariser": ".summariser",
+    "OllamaSummariser": ".summariser",
+    "summarise_concurrently": ".pipeline",
+}
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    return getattr(import_module(_EXPORTS[name], __name__), name)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import queue
+import threading
+from contextlib import closing
+from typing import TYPE_CHECKING, Callable, Iterator
+
+if TYPE_CHECKING:
+    from .scraper import Website
+    from .summariser import BaseSummariser
+
+_DONE = object()
+
+
+def summarise_concurrently(
+    summariser: "BaseSummariser",
+    urls: list[str],
+    fetch_workers: int = 4,
+    llm_workers: int = 2,
+    queue_size: int | None = None,
+) -> Iterator[tuple[int, dict]]:
+    """Summarise *urls* with a two-stage fetch → LLM pipeline.
+
+    ``fetch_workers`` threads download and parse pages and hand them to
+    ``llm_workers`` threads through a queue holding at most ``queue_size``
+    parsed pages (default: twice ``llm_workers``). A slow model lets fetchers
+    run ahead until the queue is full; slow pages never hold up an idle LLM
+    worker while other pages are ready.
+
+    Args:
+        summariser:    Any BaseSummariser; its ``fetch`` and
+                       ``summarise_website`` methods are the two stages.
+        urls:          URLs to summarise.
+        fetch_workers: Threads fetching and parsing pages.
+        llm_workers:   Threads calling the model.
+        queue_size:    Parsed pages allowed to wait for an LLM worker.
+
+    Yields:
+        ``(index, result)`` pairs in completion order, where *index* is the
+        URL's position in *urls* and *result* is a batch report entry
+        (``status`` "success" with ``summary``, or "failed" with ``error``).
+        Entries for fetched pages also carry the page's ``cache_status``.
+    """
+    if fetch_workers < 1 or llm_workers < 1:
+        raise ValueError("fetch_workers and llm_workers must be at least 1")
+
+    pending = iter(enumerate(urls))
+    pending_lock = threading.Lock()
+    pages: queue.Queue = queue.Queue(maxsize=queue_size or 2 * llm_workers)
+    results: queue.Queue = queue.Queue()
+    stop = threading.Event()
+
+    def next_url() -> tuple[int, str] | None:
+        with pending_lock:
+            return next(pending, None)
+
+    def put(q: queue.Queue, entry) -> bool:
+        # Wait for room, but give up if the consumer has gone away.
+        while not stop.is_set():
+            try:
+                q.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetcher() -> None:
+        while not stop.is_set() and (job := next_url()) is not None:
+            index, url = job
+            try:
+                website = summariser.fetch(url)
+            except Exception as exc:  # noqa: BLE001
+                results.put((index, {"url": url, "error": str(exc), "status": "failed"}))
+                continue
+            if not put(pages, (index, url, website)):
+                return
+
+    def llm_worker() -> None:
+        while not stop.is_set():
+            try:
+                entry = pages.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if entry is _DONE:
+                return
+            index, url, website = entry
+            results.put((index, _summarise_page(summariser, url, website)))
+
+    fetchers = [threading.Thread(target=fetcher, name=f"fetch-{n}", daemon=True) for n in range(fetch_workers)]
+    workers = [threading.Thread(target=llm_worker, name=f"llm-{n}", daemon=True) for n in range(llm_workers)]
+    for thread in fetchers + workers:
+        thread.start()
+
+    def close_pages() -> None:
+        # Once every page is fetched, tell each LLM worker to finish.
+        for thread in fetchers:
+            thread.join()
+        for _ in workers:
+            put(pages, _DONE)
+
+    closer = threading.Thread(target=close_pages, name="fetch-closer", daemon=True)
+    closer.start()
+
+    try:
+        for _ in urls:
+            yield results.get()
+    finally:
+        stop.set()
+
+
+
+def summarise_batch(
+    summariser: "BaseSummariser",
+    urls: list[str],
+    concurrency: int | None = None,
+    fetch_workers: int | None = None,
+    on_result: Callable[[int, int, dict], None] | None = None,
+) -> list[dict]:
+    """Summarise *urls* and return their batch report entries in input order.
+
+    With *concurrency*, the batch runs through ``summarise_concurrently``
+    with that many LLM workers and *fetch_workers* (default: *concurrency*)
+    fetchers; otherwise the URLs are summarised one at a time.
+
+    Args:
+        summariser:    Any BaseSummariser.
+        urls:          URLs to summarise.
+        concurrency:   LLM workers for the pipeline; None or 0 for sequential.
+        fetch_workers: Page-fetching workers for the pipeline.
+        on_result:     Called as ``on_result(done, index, result)`` as each URL
+                       finishes, in completion order. If it raises, the
+                       pipeline's workers are stopped before the error
+                       propagates.
+
+    Returns:
+        One batch report entry per URL, in the order of *urls*.
+    """
+    results: list[dict | None] = [None] * len(urls)
+    if concurrency:
+        completed = summarise_concurrently(
+            summariser, urls, fetch_workers=fetch_workers or concurrency, llm_workers=concurrency
+        )
+    else:
+        completed = ((index, _summarise_one(summariser, url)) for index, url in enumerate(urls))
+    with closing(completed):
+        for done, (index, result) in enumerate(completed, 1):
+            results[index] = result
+            if on_result is not None:
+                on_result(done, index, result)
+    return results
+
+
+def batch_report(summariser: "BaseSummariser", results: list[dict]) -> dict:
+    """The saved batch report: the per-URL entries and the page cache's stats (None without a cache)."""
+    cache = summariser.http_cache
+    return {"results": results, "http_cache": cache.stats() if cache is not None else None}
+
+
+def _summarise_one(summariser: "BaseSummariser", url: str) -> dict:
+    try:
+        website = summariser.fetch(url)
+    except Exception as exc:  # noqa: BLE001
+        return {"url": url, "error": str(exc), "status": "failed"}
+    return _summarise_page(summariser, url, website)
+
+
+def _summarise_page(summariser: "BaseSummariser", url: str, website: "Website") -> dict:
+    # cache_status is "hit", "revalidated" or "miss", or None without a page cache.
+    try:
+        summary = summariser.summarise_website(website)
+    except Exception as exc:  # noqa: BLE001
+        return {"url": url, "error": str(exc), "status": "failed", "cache_status": website.cache_status}
+    return {"url": url, "summary": summary, "status": "success", "cache_status": website.cache_status}
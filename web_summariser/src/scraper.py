@@ -1,5 +1,16 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 _DEFAULT_USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -7,17 +18,298 @@ _DEFAULT_USER_AGENT = (
     "Chrome/117.0.0.0 Safari/537.36"
 )
 
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def make_session(
+    max_connections_per_host: int = 10,
+    max_hosts: int = 20,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    retry_methods: frozenset[str] = Retry.DEFAULT_ALLOWED_METHODS,
+) -> requests.Session:
+    """Return a ``requests.Session`` whose connections are kept alive and reused.
+
+    Args:
+        max_connections_per_host: Open connections kept per host. Threads
+                                  beyond this wait for a free connection
+                                  instead of opening throwaway ones.
+        max_hosts:                Hosts whose connection pools are kept.
+        retries:                  Retries for connection errors and 429/5xx
+                                  responses, with exponential backoff that
+                                  honours Retry-After.
+        backoff_factor:           Base of the backoff, in seconds.
+        retry_methods:            HTTP methods that may be retried. Read
+                                  timeouts are only retried for idempotent
+                                  methods, so a slow POST is never resent.
+    """
+    retry = Retry(
+        total=retries,
+        read=0 if "POST" in retry_methods else retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=_RETRY_STATUSES,
+        allowed_methods=retry_methods,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=max_hosts,
+        pool_maxsize=max_connections_per_host,
+        pool_block=True,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_shared_session: requests.Session | None = None
+_shared_session_lock = threading.Lock()
+
+
+def shared_session() -> requests.Session:
+    """The default session used by every ``Website`` not given one."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = make_session()
+        return _shared_session
+
+
+def _freshness(headers) -> float:
+    """Seconds a response may be reused without revalidating, from Cache-Control max-age less Age."""
+    directives = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        directives[name.lower()] = value.strip('"')
+    if "no-cache" in directives or "no-store" in directives:
+        return 0.0
+    try:
+        max_age = float(directives.get("max-age", 0))
+        age = float(headers.get("Age", 0))
+    except ValueError:
+        return 0.0
+    return max(0.0, max_age - age)
+
+
+class HttpCache:
+    """On-disk cache of fetched pages, reused until stale and then revalidated.
+
+    Each entry is one file holding a JSON line (URL, ETag, Last-Modified,
+    expiry and the parsed title and text) followed by the raw body. An entry
+    younger than its ``Cache-Control: max-age`` is served without a request;
+    an older one is refetched with If-None-Match / If-Modified-Since, and a
+    304 answer reuses the cached page. Responses marked ``no-store``, or with
+    neither validators nor a max-age, are not cached.
+
+    Entries not validated for *max_age* seconds are dropped, and the least
+    recently used entries are evicted once the cache exceeds *max_bytes*.
+    Safe to share between threads.
+
+    Args:
+        directory: Where cache files are kept (created if missing).
+        max_bytes: Size limit for all entries together.
+        max_age:   Seconds after which an entry is dropped even if it
+                   could still be revalidated.
+    """
+
+    SUFFIX = ".http"
+
+    def __init__(self, directory: str | Path, max_bytes: int = 100 * 1024 * 1024, max_age: float = 7 * 24 * 3600):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(("hits", "revalidated", "misses", "stored", "evicted"), 0)
+        # key -> [size, validated at, last used]; the file's mtime is when it was last validated.
+        self._index: dict[str, list[float]] = {}
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            self._index[path.stem] = [stat.st_size, stat.st_mtime, stat.st_mtime]
+        with self._lock:
+            self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.SUFFIX}"
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> dict | None:
+        """Return the cached entry for *url* (without its body), or None."""
+        key = self._key(url)
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url or time.time() - entry["validated_at"] > self.max_age:
+            return None
+        with self._lock:
+            if key in self._index:
+                self._index[key][2] = time.time()
+        return entry
+
+    @staticmethod
+    def is_fresh(entry: dict) -> bool:
+        return time.time() < entry["expires_at"]
+
+    @staticmethod
+    def validators(entry: dict) -> dict[str, str]:
+        """Conditional request headers for revalidating *entry*."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, response: requests.Response, title: str | None, text: str) -> None:
+        """Store a 200 response and its parsed page, if the response allows it."""
+        headers = response.headers
+        if "no-store" in headers.get("Cache-Control", "").lower():
+            return
+        freshness = _freshness(headers)
+        if not (headers.get("ETag") or headers.get("Last-Modified") or freshness):
+            return
+        now = time.time()
+        entry = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "validated_at": now,
+            "expires_at": now + freshness,
+            "title": title,
+            "text": text,
+        }
+        self._write(url, entry, response.content)
+        with self._lock:
+            self._stats["stored"] += 1
+
+    def refresh(self, url: str, entry: dict, response: requests.Response) -> None:
+        """Mark *entry* as revalidated by a 304, taking any updated headers from it."""
+        key = self._key(url)
+        try:
+            with open(self._path(key), "rb") as f:
+                f.readline()
+                body = f.read()
+        except OSError:
+            return
+        headers = response.headers
+        now = time.time()
+        entry = dict(entry, validated_at=now, expires_at=now + _freshness(headers))
+        entry["etag"] = headers.get("ETag", entry["etag"])
+        entry["last_modified"] = headers.get("Last-Modified", entry["last_modified"])
+        self._write(url, entry, body)
+
+    def _write(self, url: str, entry: dict, body: bytes) -> None:
+        key = self._key(url)
+        path = self._path(key)
+        data = json.dumps(entry).encode("utf-8") + b"\n" + body
+        # Write then rename, so readers never see a partial entry.
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+        with self._lock:
+            now = time.time()
+            self._index[key] = [len(data), now, now]
+            self._evict()
+
+    def _evict(self) -> None:
+        # Called with the lock held.
+        now = time.time()
+        expired = [key for key, (_, validated, _) in self._index.items() if now - validated > self.max_age]
+        total = sum(size for size, _, _ in self._index.values())
+        by_use = sorted(self._index, key=lambda key: self._index[key][2])
+        for key in expired + by_use:
+            if key not in self._index:
+                continue
+            if key not in expired and total <= self.max_bytes:
+                break
+            total -= self._index.pop(key)[0]
+            self._stats["evicted"] += 1
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def record(self, outcome: str) -> None:
+        """Count a lookup as ``"hit"`` (fresh), ``"revalidated"`` (304) or ``"miss"``."""
+        name = {"hit": "hits", "revalidated": "revalidated", "miss": "misses"}[outcome]
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._index)
+            stats["bytes"] = int(sum(size for size, _, _ in self._index.values()))
+        lookups = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["revalidated"]) / lookups if lookups else 0.0
+        return stats
+
+    def summary(self) -> str:
+        """One line for batch reports: hit rate, how hits were served, and cache size."""
+        s = self.stats()
+        lookups = s["hits"] + s["revalidated"] + s["misses"]
+        return (
+            f"HTTP cache: {s['hits'] + s['revalidated']}/{lookups} page(s) from cache ({s['hit_rate']:.1%}): "
+            f"{s['hits']} fresh, {s['revalidated']} revalidated (304), {s['misses']} downloaded; "
+            f"{s['entries']} entries, {s['bytes'] / 1024 / 1024:.1f} MB, {s['evicted']} evicted"
+        )
+
 
 class Website:
-    """Fetches and parses a webpage, exposing its title and cleaned body text."""
+    """Fetches and parses a webpage, exposing its title and cleaned body text.
 
-    def __init__(self, url: str, user_agent: str = _DEFAULT_USER_AGENT, timeout: int = 30):
+    Pages are fetched through *session* (default: ``shared_session()``), so
+    repeated fetches reuse open connections instead of paying a new TCP and
+    TLS handshake each time. *timeout* bounds each read; *connect_timeout*
+    (default: *timeout*) bounds connecting.
+
+    With a *cache*, a page still fresh under its max-age is not fetched at
+    all, and a stale one is revalidated with a conditional request; on a 304
+    the cached title and text are used without parsing. ``cache_status`` is
+    then ``"hit"``, ``"revalidated"`` or ``"miss"`` (None without a cache).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        user_agent: str = _DEFAULT_USER_AGENT,
+        timeout: float = 30,
+        connect_timeout: float | None = None,
+        session: requests.Session | None = None,
+        cache: HttpCache | None = None,
+    ):
         self.url = url
-        response = requests.get(
+        self.cache_status: str | None = None
+        entry = cache.get(url) if cache is not None else None
+        if entry is not None and cache.is_fresh(entry):
+            self.title, self.text = entry["title"], entry["text"]
+            self.cache_status = "hit"
+            cache.record("hit")
+            return
+
+        headers = {"User-Agent": user_agent}
+        if entry is not None:
+            headers.update(cache.validators(entry))
+        response = (session or shared_session()).get(
             url,
-            headers={"User-Agent": user_agent},
-            timeout=timeout,
+            headers=headers,
+            timeout=(connect_timeout or timeout, timeout),
         )
+        if entry is not None and response.status_code == 304:
+            cache.refresh(url, entry, response)
+            self.title, self.text = entry["title"], entry["text"]
+            self.cache_status = "revalidated"
+            cache.record("revalidated")
+            return
         response.raise_for_status()
 
         soup = BeautifulSoup(response.content, "html.parser")
@@ -30,5 +322,10 @@ class Website:
         else:
             self.text = ""
 
+        if cache is not None:
+            cache.put(url, response, self.title, self.text)
+            self.cache_status = "miss"
+            cache.record("miss")
+
     def __repr__(self) -> str:
         return f"Website(url={self.url!r}, title={self.title!r})"
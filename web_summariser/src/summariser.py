@@ -2,33 +2,62 @@ from __future__ import annotations
 
 import subprocess
 from abc import ABC, abstractmethod
+from pathlib import Path
 
 import requests
-from openai import OpenAI
 
-from .scraper import Website
+from .scraper import HttpCache, Website, make_session
 from .prompts import messages_for
 
 
 class BaseSummariser(ABC):
-    """Abstract base class for all summariser backends."""
+    """Abstract base class for all summariser backends.
+
+    Summarising is split into two stages so batch runs can pipeline them:
+    ``fetch`` (network and HTML parsing) and ``summarise_website`` (the LLM
+    call).
+    """
+
+    _scraper_cfg: dict
+
+    @property
+    def http_cache(self) -> HttpCache | None:
+        """The page cache ``fetch`` uses, if one is configured."""
+        return self._scraper_cfg.get("cache")
+
+    def fetch(self, url: str) -> Website:
+        """Download and parse the page at *url*."""
+        return Website(url, **self._scraper_cfg)
 
     @abstractmethod
+    def summarise_website(self, website: Website) -> str:
+        """Return a markdown summary of an already fetched page."""
+        ...
+
     def summarise(self, url: str) -> str:
         """Fetch the page at *url* and return a markdown summary."""
-        ...
+        return self.summarise_website(self.fetch(url))
 
 
 class OpenAISummariser(BaseSummariser):
     """Uses the OpenAI chat-completions API (GPT models)."""
 
-    def __init__(self, model: str = "gpt-4o-mini", scraper_config: dict | None = None):
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        scraper_config: dict | None = None,
+        timeout: float = 600,
+        max_retries: int = 2,
+    ):
         self.model = model
         self._scraper_cfg = scraper_config or {}
-        self._client = OpenAI()
+        # Imported here so the Ollama provider never loads the OpenAI SDK.
+        from openai import OpenAI
 
-    def summarise(self, url: str) -> str:
-        website = Website(url, **self._scraper_cfg)
+        # The SDK keeps its own pool of keep-alive connections per client.
+        self._client = OpenAI(timeout=timeout, max_retries=max_retries)
+
+    def summarise_website(self, website: Website) -> str:
         response = self._client.chat.completions.create(
             model=self.model,
             messages=messages_for(website),
@@ -45,11 +74,18 @@ class OllamaSummariser(BaseSummariser):
         api_base: str = "http://localhost:11434/api/chat",
         scraper_config: dict | None = None,
         auto_pull: bool = True,
+        session: requests.Session | None = None,
+        timeout: float = 120,
+        connect_timeout: float | None = None,
     ):
         self.model = model
         self.api_base = api_base
         self._scraper_cfg = scraper_config or {}
         self._headers = {"Content-Type": "application/json"}
+        # One keep-alive session for every chat request; connection errors and
+        # 429/5xx responses are retried, read timeouts are not.
+        self._session = session or make_session(retry_methods=frozenset({"POST"}))
+        self._timeout = (connect_timeout or timeout, timeout)
 
         if auto_pull:
             self._ensure_model()
@@ -78,14 +114,13 @@ class OllamaSummariser(BaseSummariser):
     # Public interface
     # ------------------------------------------------------------------
 
-    def summarise(self, url: str) -> str:
-        website = Website(url, **self._scraper_cfg)
+    def summarise_website(self, website: Website) -> str:
         payload = {
             "model": self.model,
             "messages": messages_for(website),
             "stream": False,
         }
-        response = requests.post(self.api_base, json=payload, headers=self._headers, timeout=120)
+        response = self._session.post(self.api_base, json=payload, headers=self._headers, timeout=self._timeout)
         response.raise_for_status()
         return response.json()["message"]["content"]
 
@@ -97,6 +132,13 @@ class OllamaSummariser(BaseSummariser):
 def get_summariser(provider: str, config: dict) -> BaseSummariser:
     """Return the correct BaseSummariser subclass for *provider*.
 
+    Page fetches and Ollama requests each go through a pooled keep-alive
+    session built from the optional ``http`` section of the config
+    (``max_connections_per_host``, ``max_hosts``, ``retries``,
+    ``backoff_factor``, ``connect_timeout`` and ``llm_timeout``). An
+    optional ``cache`` section (``directory``, relative to web_summariser/,
+    ``max_mb`` and ``max_age_hours``) turns on the on-disk page cache.
+
     Args:
         provider:  One of ``"openai"`` or ``"ollama"``.
         config:    The parsed ``config.json`` dict.
@@ -111,21 +153,45 @@ def get_summariser(provider: str, config: dict) -> BaseSummariser:
         )
 
     model_cfg = config["models"][provider]
-    scraper_cfg: dict = {}
+    http_cfg: dict = config.get("http", {})
+    pool_cfg = {
+        key: http_cfg[key]
+        for key in ("max_connections_per_host", "max_hosts", "retries", "backoff_factor")
+        if key in http_cfg
+    }
+    scraper_cfg: dict = {"session": make_session(**pool_cfg)}
     if "scraper" in config:
         if "user_agent" in config["scraper"]:
             scraper_cfg["user_agent"] = config["scraper"]["user_agent"]
         if "timeout" in config["scraper"]:
             scraper_cfg["timeout"] = config["scraper"]["timeout"]
+    if "connect_timeout" in http_cfg:
+        scraper_cfg["connect_timeout"] = http_cfg["connect_timeout"]
+    if config.get("cache"):
+        cache_cfg = config["cache"]
+        scraper_cfg["cache"] = HttpCache(
+            Path(__file__).resolve().parents[1] / cache_cfg.get("directory", ".http_cache"),
+            max_bytes=int(cache_cfg.get("max_mb", 100) * 1024 * 1024),
+            max_age=cache_cfg.get("max_age_hours", 168) * 3600,
+        )
+
+    llm_cfg: dict = {}
+    if "llm_timeout" in http_cfg:
+        llm_cfg["timeout"] = http_cfg["llm_timeout"]
 
     if provider == "openai":
-        return OpenAISummariser(model=model_cfg["model"], scraper_config=scraper_cfg)
+        if "retries" in http_cfg:
+            llm_cfg["max_retries"] = http_cfg["retries"]
+        return OpenAISummariser(model=model_cfg["model"], scraper_config=scraper_cfg, **llm_cfg)
 
     if provider == "ollama":
         return OllamaSummariser(
             model=model_cfg["model"],
             api_base=model_cfg["api_base"],
             scraper_config=scraper_cfg,
+            session=make_session(**pool_cfg, retry_methods=frozenset({"POST"})),
+            connect_timeout=http_cfg.get("connect_timeout"),
+            **llm_cfg,
         )
 
     raise ValueError(f"Provider '{provider}' is defined in config but has no implementation.")
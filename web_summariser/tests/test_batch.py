@@ -19,6 +19,9 @@ Run from the web_summariser/ directory:
 
     # Save results to output/ (individual .md files + batch_report_*.json)
     python tests/test_batch.py --save
+
+    # Pipeline: 8 page-fetching workers feeding 2 LLM workers
+    python tests/test_batch.py --concurrency 2 --fetch-workers 8
 """
 
 from __future__ import annotations
@@ -36,6 +39,7 @@ from dotenv import load_dotenv
 
 load_dotenv(dotenv_path=_ROOT / ".env", override=True)
 
+from src.pipeline import batch_report, summarise_batch  # noqa: E402
 from src.summariser import get_summariser  # noqa: E402
 
 
@@ -58,7 +62,13 @@ def _save_summary(url: str, summary: str, output_dir: Path) -> Path:
     return path
 
 
-def run(input_file: str, provider: str, save: bool = False) -> list[dict]:
+def run(
+    input_file: str,
+    provider: str,
+    save: bool = False,
+    concurrency: int | None = None,
+    fetch_workers: int | None = None,
+) -> list[dict]:
     config = _load_config()
     input_path = Path(input_file)
 
@@ -81,34 +91,38 @@ def run(input_file: str, provider: str, save: bool = False) -> list[dict]:
     print(f"Provider : {provider}")
     print(f"Input    : {input_path}")
     print(f"URLs     : {len(urls)}")
+    if concurrency:
+        fetch_workers = fetch_workers or concurrency
+        print(f"Workers  : {fetch_workers} fetch, {concurrency} LLM")
     print("=" * 60)
 
-    results: list[dict] = []
-
-    for idx, url in enumerate(urls, 1):
-        print(f"\n[{idx}/{len(urls)}] {url}")
+    def report(done: int, index: int, result: dict) -> None:
+        position = f" (#{index + 1})" if concurrency else ""
+        print(f"\n[{done}/{len(urls)}] {result['url']}{position}")
         print("-" * 60)
-        try:
-            summary = summariser.summarise(url)
-            results.append({"url": url, "summary": summary, "status": "success"})
-            print(summary)
-            if save:
-                path = _save_summary(url, summary, output_dir)
-                print(f"\nSaved → {path}")
-        except Exception as exc:  # noqa: BLE001
-            print(f"ERROR: {exc}", file=sys.stderr)
-            results.append({"url": url, "error": str(exc), "status": "failed"})
+        if result["status"] != "success":
+            print(f"ERROR: {result['error']}", file=sys.stderr)
+            return
+        print(result["summary"])
+        if save:
+            path = _save_summary(result["url"], result["summary"], output_dir)
+            print(f"\nSaved → {path}")
+
+    # Results are reported as they complete; the report keeps input order.
+    results = summarise_batch(summariser, urls, concurrency, fetch_workers, on_result=report)
 
     # Final stats
     success_count = sum(1 for r in results if r["status"] == "success")
     print("\n" + "=" * 60)
     print(f"Completed: {success_count}/{len(urls)} succeeded.")
+    if summariser.http_cache is not None:
+        print(summariser.http_cache.summary())
 
     if save:
         output_dir.mkdir(parents=True, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_path = output_dir / f"batch_report_{timestamp}.json"
-        report_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        report_path.write_text(json.dumps(batch_report(summariser, results), indent=2), encoding="utf-8")
         print(f"Batch report → {report_path}")
 
     return results
@@ -140,8 +154,22 @@ def main() -> None:
         action="store_true",
         help="Write each summary and a batch_report.json to the output/ folder.",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Pipeline the batch with N LLM workers fed by page-fetching workers (default: sequential).",
+    )
+    parser.add_argument(
+        "--fetch-workers",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Page-fetching workers for --concurrency (default: same as --concurrency).",
+    )
     args = parser.parse_args()
-    run(args.input, args.provider, args.save)
+    run(args.input, args.provider, args.save, args.concurrency, args.fetch_workers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+"""Pipeline tests with a stub summariser; no network or model calls.
+
+Run from the web_summariser/ directory:
+
+    python -m pytest -q tests/test_pipeline.py
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.pipeline import batch_report, summarise_batch, summarise_concurrently
+
+
+class StubSummariser:
+    """Fetches "pages" after a per-URL delay; summaries can be held back with *release*."""
+
+    http_cache = None
+
+    def __init__(self, delays: dict[str, float] | None = None, release: threading.Event | None = None):
+        self.delays = delays or {}
+        self.release = release
+        self.fetched: list[str] = []
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str) -> SimpleNamespace:
+        time.sleep(self.delays.get(url, 0))
+        if url.startswith("bad"):
+            raise ValueError(f"cannot fetch {url}")
+        with self._lock:
+            self.fetched.append(url)
+        return SimpleNamespace(url=url, cache_status="hit" if url.startswith("cached") else "miss")
+
+    def summarise_website(self, website: SimpleNamespace) -> str:
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        return f"summary of {website.url}"
+
+    def summarise(self, url: str) -> str:
+        return self.summarise_website(self.fetch(url))
+
+
+def _pipeline_threads() -> list[threading.Thread]:
+    return [t for t in threading.enumerate() if t.name.startswith(("fetch-", "llm-"))]
+
+
+@pytest.mark.parametrize("concurrency", [None, 3])
+def test_results_are_in_input_order(concurrency):
+    urls = ["slow", "bad", "fast"]
+    summariser = StubSummariser({"slow": 0.2})
+    seen = []
+
+    results = summarise_batch(
+        summariser, urls, concurrency, on_result=lambda done, index, result: seen.append(index)
+    )
+
+    assert [r["url"] for r in results] == urls
+    assert [r["status"] for r in results] == ["success", "failed", "success"]
+    assert results[0]["summary"] == "summary of slow"
+    assert "cannot fetch" in results[1]["error"]
+    assert sorted(seen) == [0, 1, 2]
+    if concurrency:
+        assert seen[-1] == 0  # the slow page finished last
+
+
+def test_fetchers_stop_at_the_bounded_queue():
+    release = threading.Event()
+    summariser = StubSummariser(release=release)
+    urls = [f"url-{n}" for n in range(20)]
+
+    pipeline = summarise_concurrently(summariser, urls, fetch_workers=4, llm_workers=1, queue_size=1)
+    first = threading.Thread(target=next, args=(pipeline,))
+    first.start()
+    time.sleep(0.3)
+    # One page being summarised, one queued, and one held by each blocked fetcher.
+    assert len(summariser.fetched) <= 1 + 1 + 4
+
+    release.set()
+    first.join(timeout=5)
+    assert len(list(pipeline)) == len(urls) - 1
+
+
+def test_early_exit_stops_the_workers():
+    summariser = StubSummariser({f"url-{n}": 0.02 for n in range(50)})
+    urls = [f"url-{n}" for n in range(50)]
+
+    def stop(done, index, result):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        summarise_batch(summariser, urls, concurrency=2, fetch_workers=4, on_result=stop)
+
+    deadline = time.monotonic() + 5
+    while _pipeline_threads() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _pipeline_threads()
+    assert len(summariser.fetched) < len(urls)
+
+
+@pytest.mark.parametrize("concurrency", [None, 2])
+def test_report_carries_cache_status_and_stats(concurrency):
+    summariser = StubSummariser()
+    results = summarise_batch(summariser, ["cached-page", "new-page", "bad-page"], concurrency)
+
+    assert [r.get("cache_status") for r in results] == ["hit", "miss", None]
+    assert batch_report(summariser, results) == {"results": results, "http_cache": None}
+
+    summariser.http_cache = SimpleNamespace(stats=lambda: {"hits": 1, "misses": 1})
+    assert batch_report(summariser, results)["http_cache"] == {"hits": 1, "misses": 1}